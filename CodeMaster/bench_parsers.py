@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Сравнение движков разбора HTML на страницах товаров tests/fixtures/product_<сайт>_<id>.html
+Проверяет, что все движки извлекают одинаковые полные данные товара, и измеряет время разбора
+"""
+
+import sys
+import os
+import glob
+import time
+import argparse
+from dataclasses import asdict
+
+# Добавляем текущую директорию в путь для импортов
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scraper.html_backends import BACKENDS, is_available
+from scraper.html_parser import HtmlProductParser
+
+FIXTURES_PATTERN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'fixtures', 'product_*.html')
+BASELINE = 'html.parser'
+
+def load_pages(pattern: str):
+    """Загрузка страниц: (сайт, ID товара, имя файла, HTML)"""
+    pages = []
+    for file_path in sorted(glob.glob(pattern)):
+        # <префикс>_<сайт>_<id>[_...].html
+        parts = os.path.splitext(os.path.basename(file_path))[0].split('_')
+        if len(parts) < 3:
+            continue
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            pages.append((parts[1], parts[2], os.path.basename(file_path), f.read()))
+    return pages
+
+def run_backend(backend: str, pages, repeat: int):
+    """Извлечение данных со всех страниц; возвращает (результаты, среднее время на страницу)"""
+    # Сравниваются движки DOM, поэтому быстрый путь по JSON-LD отключен
+    parser = HtmlProductParser(backend, structured_data=False)
+    outputs = {}
+    timings = {}
+
+    for site, product_id, name, html in pages:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            product = parser.parse(product_id, site, name, html)
+        timings[name] = (time.perf_counter() - start) / repeat
+        outputs[name] = asdict(product) if product else None
+
+    return outputs, timings
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Бенчмарк движков разбора HTML")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Повторов на страницу")
+    arg_parser.add_argument('--pattern', default=FIXTURES_PATTERN, help="Маска файлов страниц")
+    args = arg_parser.parse_args()
+
+    pages = load_pages(args.pattern)
+    if not pages:
+        print(f"Страницы не найдены: {args.pattern}")
+        return 1
+
+    backends = [backend for backend in BACKENDS if is_available(backend)]
+    if BASELINE not in backends:
+        print("Для сравнения требуется beautifulsoup4 (html.parser)")
+        return 1
+
+    print(f"Страниц: {len(pages)}, повторов: {args.repeat}, движки: {', '.join(backends)}")
+
+    results = {backend: run_backend(backend, pages, args.repeat) for backend in backends}
+    baseline_outputs, baseline_timings = results[BASELINE]
+    mismatches = 0
+
+    # Совпадение пустых результатов ничего не доказывает: нужны страницы с полным товаром
+    incomplete = [
+        name for _, _, name, _ in pages
+        if not baseline_outputs[name] or baseline_outputs[name].get('price') is None
+    ]
+
+    print()
+    print(f"{'Страница':<55} {'Движок':<12} {'мс/стр':>9} {'Ускорение':>10}  Данные")
+    for site, product_id, name, html in pages:
+        for backend in backends:
+            outputs, timings = results[backend]
+            same = outputs[name] == baseline_outputs[name]
+            if not same:
+                mismatches += 1
+            speedup = baseline_timings[name] / timings[name] if timings[name] else 0.0
+            print(f"{name[:55]:<55} {backend:<12} {timings[name] * 1000:>9.1f} {speedup:>9.1f}x  "
+                  f"{'совпадают' if same else 'РАЗЛИЧАЮТСЯ'}")
+
+            if not same:
+                print(f"    {BASELINE}: {baseline_outputs[name]}")
+                print(f"    {backend}: {outputs[name]}")
+
+    print()
+    total_baseline = sum(baseline_timings.values())
+    for backend in backends:
+        total = sum(results[backend][1].values())
+        print(f"{backend:<12} всего {total * 1000:8.1f} мс  ({total_baseline / total:.1f}x)")
+
+    if mismatches:
+        print(f"\nОбнаружены расхождения: {mismatches}")
+        return 1
+
+    if incomplete:
+        print(f"\nСтраницы без названия или цены (сравнение неполное): {', '.join(incomplete)}")
+        return 1
+
+    print("\nВсе движки извлекли одинаковые данные")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
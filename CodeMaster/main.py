@@ -6,6 +6,7 @@
 import sys
 import os
 import threading
+import multiprocessing
 import tkinter as tk
 from tkinter import messagebox
 import customtkinter as ctk
@@ -203,4 +204,6 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Поддержка пула процессов парсинга в собранном исполняемом файле (Windows)
+    multiprocessing.freeze_support()
+    main()
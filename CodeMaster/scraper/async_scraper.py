@@ -0,0 +1,467 @@
+"""
+Асинхронный скрейпер на asyncio/aiohttp для массовой обработки товаров
+Держит сотни одновременных запросов в одном event loop
+"""
+
+import time
+import queue
+import asyncio
+import threading
+import concurrent.futures
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from scraper.base_scraper import ScrapingResult, ScrapingStatus, ScrapingMethod
+from scraper.cloudscraper_scraper import CloudScraperScraper
+from scraper.circuit_breaker import SiteCircuitBreakers
+from scraper.retry import RetryPolicy, parse_retry_after
+
+class AsyncScraper(CloudScraperScraper):
+    """Асинхронный скрейпер, использующий парсеры CloudScraperScraper"""
+
+    def __init__(self, max_concurrency: int = 100, max_per_host: int = 0,
+                 circuit_breakers: Optional[SiteCircuitBreakers] = None,
+                 attempt_callback: Optional[Callable[[str, ScrapingResult], None]] = None, **kwargs):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_per_host = max_per_host
+        self.circuit_breakers = circuit_breakers
+
+        # Вызывается для каждой выполненной попытки, включая повторяемые
+        self.attempt_callback = attempt_callback
+        super().__init__(**kwargs)
+
+        # Работающие event loop и их воркеры (для отмены из другого потока).
+        # HybridScraper вызывает scrape_product из нескольких потоков сразу,
+        # поэтому у каждого запуска свой loop и свой список задач
+        self._runs: Dict[int, Tuple[asyncio.AbstractEventLoop, List[asyncio.Task]]] = {}
+        self._runs_lock = threading.Lock()
+
+        # Постоянный event loop и сессия для загрузки по одному товару:
+        # запросы из всех потоков идут через общий пул keep-alive соединений
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    def _setup_scraper(self):
+        """Сессия aiohttp создается внутри event loop, в котором используется"""
+        self.session_pool = None
+
+    def _create_session(self) -> "aiohttp.ClientSession":
+        """Создание HTTP сессии с общим пулом соединений"""
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrency,
+            limit_per_host=self.max_per_host,
+            ttl_dns_cache=300
+        )
+
+        headers = dict(self.DEFAULT_HEADERS)
+        # aiohttp не распаковывает brotli без дополнительных пакетов
+        headers['Accept-Encoding'] = 'gzip, deflate'
+
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+
+    def scrape_product(self, product_id: str, site: str) -> ScrapingResult:
+        """
+        Скрейпинг одного товара одной попыткой в постоянном event loop скрейпера
+        (вызывающий поток ждет результата). Выключатели сайта, учет попыток и
+        повторы здесь не применяются: при вызове по одному товару ими управляет
+        вызывающий (HybridScraper).
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("Для асинхронного режима требуется пакет aiohttp")
+
+        # Отправка под блокировкой: close() не остановит loop раньше, чем задача в него попадет
+        with self._loop_lock:
+            future = asyncio.run_coroutine_threadsafe(
+                self._scrape_single(product_id, site), self._get_loop()
+            )
+
+        try:
+            return future.result()
+        except (asyncio.CancelledError, concurrent.futures.CancelledError):
+            # Загрузка отменена остановкой или закрытием скрейпера
+            result = ScrapingResult(method_used=ScrapingMethod.ASYNC)
+            result.status = ScrapingStatus.STOPPED
+            return result
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        """Постоянный event loop в фоновом потоке (вызывается под _loop_lock)"""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(
+                target=self._loop.run_forever, name="async-scraper-loop", daemon=True
+            )
+            self._loop_thread.start()
+        return self._loop
+
+    async def _scrape_single(self, product_id: str, site: str) -> ScrapingResult:
+        """Одна попытка загрузки товара (задача регистрируется для отмены из stop())"""
+        tasks = [asyncio.current_task()]
+        run_id = id(tasks)
+        with self._runs_lock:
+            self._runs[run_id] = (asyncio.get_running_loop(), tasks)
+
+        try:
+            # Сессия создается при первом запросе и используется только в потоке loop
+            if self._session is None or self._session.closed:
+                self._session = self._create_session()
+            return await self._fetch_product(self._session, product_id, site)
+        finally:
+            with self._runs_lock:
+                self._runs.pop(run_id, None)
+
+    def close(self):
+        """
+        Закрытие постоянной сессии и остановка ее event loop. Незавершенные
+        загрузки отменяются; следующий scrape_product запустит их заново.
+        """
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            self._loop = self._loop_thread = None
+        if loop is None:
+            return
+
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown_loop(), loop).result(timeout=10)
+        except Exception as e:
+            self._log(f"Ошибка закрытия асинхронной сессии: {e}", "WARNING")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(10)
+        if not thread.is_alive():
+            loop.close()
+
+    async def _shutdown_loop(self):
+        """Отмена загрузок и закрытие сессии (выполняется в постоянном event loop)"""
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def iter_products(self, products: Iterable[Tuple[str, str]],
+                      retry_policy: Optional[RetryPolicy] = None) -> Iterator[Tuple[str, str, ScrapingResult]]:
+        """
+        Синхронный итератор результатов (product_id, site, result) по мере готовности.
+        Event loop работает в отдельном потоке, результаты передаются через
+        ограниченную очередь, поэтому медленный потребитель притормаживает загрузку.
+        """
+        results: "queue.Queue" = queue.Queue(maxsize=self.max_concurrency)
+        cancelled = threading.Event()
+        done = object()
+        # Event loop и задача этого запуска (для отмены при выходе потребителя)
+        run = {}
+
+        async def produce():
+            run['loop'] = asyncio.get_running_loop()
+            run['task'] = asyncio.current_task()
+            if cancelled.is_set():
+                return
+            async for item in self.iter_products_async(products, retry_policy):
+                if cancelled.is_set():
+                    break
+                if results.full():
+                    await asyncio.to_thread(results.put, item)
+                else:
+                    results.put_nowait(item)
+
+        def run_loop():
+            try:
+                asyncio.run(produce())
+            except asyncio.CancelledError:
+                # Потребитель вышел до завершения - результаты не нужны
+                pass
+            except Exception as e:
+                results.put(e)
+            finally:
+                results.put(done)
+
+        thread = threading.Thread(target=run_loop, daemon=True)
+        thread.start()
+
+        try:
+            while True:
+                item = results.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Потребитель прекратил чтение - отмена задачи освобождает поток event loop
+            # (воркеры отменяются в finally асинхронного генератора)
+            cancelled.set()
+            loop, task = run.get('loop'), run.get('task')
+            if loop is not None and task is not None:
+                try:
+                    loop.call_soon_threadsafe(task.cancel)
+                except RuntimeError:
+                    pass
+            while thread.is_alive():
+                try:
+                    results.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+    async def iter_products_async(self, products: Iterable[Tuple[str, str]],
+                                  retry_policy: Optional[RetryPolicy] = None
+                                  ) -> AsyncIterator[Tuple[str, str, ScrapingResult]]:
+        """
+        Асинхронный итератор результатов (product_id, site, result) по мере готовности.
+        max_concurrency корутин-воркеров лениво читают общий источник товаров,
+        поэтому одновременно в памяти находятся только обрабатываемые товары.
+        При заданной retry_policy временные ошибки повторяются отложенными
+        задачами, воркер тем временем переходит к следующему товару.
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise RuntimeError("Для асинхронного режима требуется пакет aiohttp")
+
+        source = iter(products)
+        results: "asyncio.Queue" = asyncio.Queue(maxsize=self.max_concurrency)
+        slots = asyncio.Semaphore(self.max_concurrency)
+        task_done = object()
+        tasks: List[asyncio.Task] = []
+        active = 0
+
+        def spawn(coro):
+            """Запуск задачи, завершение которой учитывается потребителем"""
+            nonlocal active
+            active += 1
+            tasks.append(asyncio.create_task(run_task(coro)))
+
+        async def run_task(coro):
+            try:
+                await coro
+            finally:
+                # Повторная отмена во время ожидания места в очереди не должна
+                # потерять сигнал завершения задачи
+                await asyncio.shield(results.put(task_done))
+
+        async with self._create_session() as session:
+            async def process(product_id: str, site: str, retry_number: int = 0, prior_attempts: int = 0):
+                # Пока сайт блокирует запросы, товары не загружаются
+                if (self.circuit_breakers is not None and
+                        not self.circuit_breakers.allow(site, ScrapingMethod.ASYNC)):
+                    result = ScrapingResult(status=ScrapingStatus.ERROR, blocked=True,
+                                            error_message=f"Сайт {site} временно блокирует запросы")
+                    delay = None
+                else:
+                    async with slots:
+                        result = await self._fetch_product(session, product_id, site)
+                    if self.attempt_callback:
+                        self.attempt_callback(site, result)
+
+                    delay = None
+                    if retry_policy is not None and not self.is_stopped:
+                        delay = retry_policy.next_delay(result, retry_number + 1)
+
+                if delay is not None:
+                    self._log(f"Повтор {product_id} ({site}) через {delay:.1f} сек: {result.error_message}", "WARNING")
+                    spawn(retry_later(product_id, site, retry_number + 1,
+                                      prior_attempts + result.attempts, delay))
+                    return
+
+                result.attempts += prior_attempts
+                await results.put((product_id, site, result))
+
+            async def retry_later(product_id: str, site: str, retry_number: int,
+                                  prior_attempts: int, delay: float):
+                await asyncio.sleep(delay)
+                await process(product_id, site, retry_number, prior_attempts)
+
+            async def worker():
+                # Общий итератор безопасен: между вызовами next() нет await
+                for product_id, site in source:
+                    await process(product_id, site)
+
+            for _ in range(self.max_concurrency):
+                spawn(worker())
+            run_id = id(tasks)
+            with self._runs_lock:
+                self._runs[run_id] = (asyncio.get_running_loop(), tasks)
+
+            # Остановка могла прийти до регистрации воркеров
+            if self.is_stopped:
+                self._cancel_workers(tasks)
+
+            try:
+                while active:
+                    item = await results.get()
+                    if item is task_done:
+                        active -= 1
+                        continue
+                    yield item
+
+                # Проброс исключений источника товаров (отмена воркеров - не ошибка)
+                outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+                for outcome in outcomes:
+                    if isinstance(outcome, Exception):
+                        raise outcome
+            finally:
+                with self._runs_lock:
+                    self._runs.pop(run_id, None)
+                for task in tasks:
+                    task.cancel()
+
+    def stop(self):
+        """Остановка: отмена воркеров прерывает выполняющиеся HTTP запросы"""
+        super().stop()
+        with self._runs_lock:
+            runs = list(self._runs.values())
+        # Задачи каждого запуска отменяются в их собственном event loop
+        for loop, tasks in runs:
+            try:
+                loop.call_soon_threadsafe(self._cancel_workers, tasks)
+            except RuntimeError:
+                # Event loop уже закрыт
+                pass
+
+    @staticmethod
+    def _cancel_workers(tasks: List[asyncio.Task]):
+        """Отмена воркеров одного запуска (выполняется в потоке его event loop)"""
+        for task in list(tasks):
+            task.cancel()
+
+    async def _fetch_product(self, session: "aiohttp.ClientSession",
+                             product_id: str, site: str) -> ScrapingResult:
+        """Загрузка и парсинг одного товара"""
+        start_time = time.time()
+        result = ScrapingResult(method_used=ScrapingMethod.ASYNC)
+
+        if self.is_stopped:
+            result.status = ScrapingStatus.STOPPED
+            return result
+
+        if not self.validate_product_id(product_id):
+            result.status = ScrapingStatus.ERROR
+            result.error_message = "Некорректный ID товара"
+            return result
+
+        try:
+            product_url = self.format_product_url(product_id, site)
+            if not product_url:
+                result.status = ScrapingStatus.ERROR
+                result.error_message = f"Неподдерживаемый сайт: {site}"
+                return result
+
+            # Чтение кэша с диска выполняется вне event loop
+            cache_entry = None
+            if self.http_cache:
+                cache_entry = await asyncio.to_thread(self.http_cache.get, product_url)
+
+            response_headers = None
+            clearance = None
+            if cache_entry is not None and self.http_cache.is_fresh(cache_entry):
+                self._log(f"Страница взята из кэша: {product_url}", "DEBUG")
+                status_code, html_content = 200, cache_entry.body
+            else:
+                if not await self.rate_limiter.acquire_async(site, self._stop_event):
+                    result.status = ScrapingStatus.STOPPED
+                    return result
+
+                self._log(f"Асинхронная загрузка страницы: {product_url}", "DEBUG")
+
+                headers = {'User-Agent': self.get_random_user_agent()}
+                if self.http_cache:
+                    headers.update(self.http_cache.conditional_headers(cache_entry))
+
+                # Допуск, полученный браузером, передается вместе с его User-Agent
+                cookies = None
+                clearance = self.clearance_store.get(site) if self.clearance_store else None
+                if clearance is not None:
+                    headers['User-Agent'] = clearance.user_agent
+                    cookies = clearance.cookie_dict()
+                else:
+                    # Cookies HTTP сессии сайта, сохраненные CloudScraper
+                    site_session = self.clearance_store.get_session(site) if self.clearance_store else None
+                    if site_session is not None:
+                        headers['User-Agent'] = site_session.user_agent
+                        cookies = site_session.cookie_dict()
+
+                async with session.get(product_url, headers=headers, cookies=cookies) as response:
+                    html_content = await response.text(errors='replace')
+                    status_code = response.status
+                    response_headers = response.headers
+
+                if status_code == 304 and cache_entry is not None:
+                    self._log(f"Страница не изменилась, используется кэш: {product_url}", "DEBUG")
+                    await asyncio.to_thread(self.http_cache.refresh, product_url, cache_entry, response_headers)
+                    status_code, html_content = 200, cache_entry.body
+                    response_headers = None
+
+            result.http_status = status_code
+            verdict = self._detect_block(html_content, status_code, response_headers)
+            result.blocked = verdict.blocked
+            result.block_reason = verdict.reason
+            if verdict.blocked and clearance is not None:
+                self.clearance_store.invalidate(site, clearance.version)
+            if status_code == 200:
+                if verdict.blocked:
+                    result.status = ScrapingStatus.ERROR
+                    result.error_message = f"Страница заблокирована: {verdict.describe()}"
+                    self._log(f"Обнаружена блокировка в асинхронном режиме: {verdict.describe()}", "WARNING")
+                else:
+                    # В кэш попадают только полученные от сайта незаблокированные страницы
+                    if self.http_cache and response_headers is not None:
+                        await asyncio.to_thread(self.http_cache.store, product_url, html_content, response_headers)
+
+                    # Парсинг выполняется вне event loop, чтобы не блокировать другие запросы
+                    if self.parse_pool is not None:
+                        product = await self.parse_pool.parse_async(
+                            product_id, site, product_url, html_content,
+                            self.html_parser.backend, self.html_parser.structured_data
+                        )
+                    else:
+                        loop = asyncio.get_running_loop()
+                        product = await loop.run_in_executor(
+                            None, self.html_parser.parse,
+                            product_id, site, product_url, html_content
+                        )
+
+                    if product:
+                        result.product = product
+                        result.status = ScrapingStatus.SUCCESS
+                    else:
+                        result.status = ScrapingStatus.ERROR
+                        result.error_message = "Не удалось извлечь данные товара"
+            else:
+                if status_code in self.RECYCLE_STATUS_CODES and response_headers is not None:
+                    result.retry_after = parse_retry_after(response_headers.get('Retry-After'))
+                result.status = ScrapingStatus.ERROR
+                result.error_message = f"HTTP ошибка: {status_code}"
+                self._log(f"HTTP ошибка: {status_code}", "ERROR")
+
+        except asyncio.TimeoutError:
+            result.transient = True
+            result.status = ScrapingStatus.ERROR
+            result.error_message = "Превышено время ожидания ответа"
+
+        except aiohttp.ClientError as e:
+            result.transient = True
+            result.status = ScrapingStatus.ERROR
+            result.error_message = f"Ошибка соединения: {str(e)}"
+            self._log(f"Ошибка соединения: {e}", "ERROR")
+
+        except Exception as e:
+            result.status = ScrapingStatus.ERROR
+            result.error_message = f"Ошибка асинхронной загрузки: {str(e)}"
+            self._log(f"Ошибка: {e}", "ERROR")
+
+        finally:
+            result.response_time = time.time() - start_time
+            result.attempts = 1
+
+        return result
@@ -3,19 +3,24 @@
 Определяет общий интерфейс и функциональность
 """
 
-import time
 import random
 import logging
+import threading
 from abc import ABC, abstractmethod
 from typing import Dict, List, Optional, Callable
 from dataclasses import dataclass
 from enum import Enum
+from urllib.parse import quote_plus
+
+from scraper.rate_limiter import SiteRateLimiter
+from scraper.block_detector import BlockReason
 
 class ScrapingMethod(Enum):
     """Методы скрейпинга"""
     CLOUDSCRAPER = "cloudscraper"
     SELENIUM = "selenium"
     HYBRID = "hybrid"
+    ASYNC = "async"
 
 class ScrapingStatus(Enum):
     """Статусы скрейпинга"""
@@ -29,7 +34,7 @@ class ScrapingStatus(Enum):
 class ProductInfo:
     """Информация о товаре"""
     id: str
-    name: str
+    name: str = ""
     price: Optional[float] = None
     old_price: Optional[float] = None
     availability: str = "Неизвестно"
@@ -52,22 +57,35 @@ class ScrapingResult:
     method_used: Optional[ScrapingMethod] = None
     response_time: float = 0.0
     attempts: int = 0
+    blocked: bool = False  # Сайт ответил страницей защиты/капчей или статусом блокировки
+    block_reason: Optional[BlockReason] = None  # Причина блокировки (система защиты или HTTP статус)
+    transient: bool = False  # Временная ошибка (сеть, таймаут) - запрос можно повторить
+    http_status: int = 0
+    retry_after: Optional[float] = None  # Ожидание, запрошенное сайтом (Retry-After), сек
 
 class BaseScraper(ABC):
     """Базовый класс скрейпера"""
     
     def __init__(self, progress_callback: Optional[Callable] = None, 
-                 log_callback: Optional[Callable] = None):
+                 log_callback: Optional[Callable] = None,
+                 rate_limiter: Optional[SiteRateLimiter] = None):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.progress_callback = progress_callback
         self.log_callback = log_callback
         self.is_stopped = False
+        self._stop_event = threading.Event()
         
         # Настройки скрейпинга
         self.delay_range = (1, 3)  # Задержка между запросами
         self.max_retries = 3
         self.timeout = 30
         
+        # Лимитер частоты запросов: общий (передается HybridScraper) или собственный,
+        # со средней частотой, соответствующей delay_range
+        if rate_limiter is None:
+            rate_limiter = SiteRateLimiter(default_rate=2.0 / sum(self.delay_range), default_burst=1)
+        self.rate_limiter = rate_limiter
+        
         # User agents для ротации
         self.user_agents = [
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -85,17 +103,26 @@ class BaseScraper(ABC):
         """Получение случайного User-Agent"""
         return random.choice(self.user_agents)
     
-    def add_delay(self):
-        """Добавление случайной задержки"""
-        if not self.is_stopped:
-            delay = random.uniform(*self.delay_range)
-            time.sleep(delay)
+    def wait_for_slot(self, site: str) -> bool:
+        """
+        Ожидание разрешения лимитера на запрос к сайту.
+        Возвращает False, если скрейпинг остановлен.
+        """
+        if self.is_stopped:
+            return False
+        return self.rate_limiter.acquire(site, self._stop_event)
     
     def stop(self):
         """Остановка скрейпинга"""
         self.is_stopped = True
+        self._stop_event.set()
         self._log("Получен сигнал остановки скрейпинга")
     
+    def reset(self):
+        """Сброс сигнала остановки (для повторного использования скрейпера в новом запуске)"""
+        self.is_stopped = False
+        self._stop_event.clear()
+    
     def _log(self, message: str, level: str = "INFO"):
         """Логирование с callback"""
         if level.upper() == "INFO":
@@ -116,7 +143,8 @@ class BaseScraper(ABC):
             progress = (current / total * 100) if total > 0 else 0
             self.progress_callback(progress, message)
     
-    def clean_text(self, text: str) -> str:
+    @staticmethod
+    def clean_text(text: str) -> str:
         """Очистка текста от лишних символов"""
         if not text:
             return ""
@@ -129,7 +157,8 @@ class BaseScraper(ABC):
         
         return text.strip()
     
-    def parse_price(self, price_text: str) -> Optional[float]:
+    @staticmethod
+    def parse_price(price_text: str) -> Optional[float]:
         """Парсинг цены из текста"""
         if not price_text:
             return None
@@ -181,3 +210,19 @@ class BaseScraper(ABC):
         }
         
         return url_patterns.get(site.lower(), "")
+    
+    def format_search_url(self, product_code: str, site: str) -> str:
+        """Форматирование URL страницы поиска по коду товара"""
+        base_url = self.get_site_base_url(site)
+        if not base_url:
+            return ""
+        
+        code = quote_plus(product_code.strip())
+        url_patterns = {
+            'rozetka': f"{base_url}/ua/search/?text={code}",
+            'allo': f"{base_url}/ua/catalogsearch/result/?q={code}",
+            'comfy': f"{base_url}/ua/search/?q={code}",
+            'epicentr': f"{base_url}/ua/search/?q={code}"
+        }
+        
+        return url_patterns.get(site.lower(), "")
@@ -0,0 +1,156 @@
+"""
+Распознавание страниц защиты, капчи и блокировок
+Проверяются только заголовок, начало head и начало body (страницы защиты
+маленькие, а товарные страницы занимают сотни килобайт), все маркеры
+области ищутся за один проход общим регулярным выражением.
+"""
+
+import re
+from dataclasses import dataclass
+from enum import Enum
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+
+class BlockReason(Enum):
+    """Причина блокировки"""
+    CLOUDFLARE = "cloudflare"          # Проверка браузера / Turnstile Cloudflare
+    INCAPSULA = "incapsula"            # Imperva Incapsula ("Pardon Our Interruption")
+    DATADOME = "datadome"
+    PERIMETERX = "perimeterx"
+    CAPTCHA = "captcha"                # Капча без явного поставщика
+    JS_CHALLENGE = "js_challenge"      # Требуется выполнить JavaScript
+    ACCESS_DENIED = "access_denied"
+    RATE_LIMITED = "rate_limited"      # HTTP 429
+    FORBIDDEN = "forbidden"            # HTTP 403
+    UNAVAILABLE = "unavailable"        # HTTP 503
+
+@dataclass(frozen=True)
+class BlockVerdict:
+    """Результат проверки страницы"""
+    reason: Optional[BlockReason] = None
+    marker: str = ""                   # Сработавший маркер или HTTP статус
+
+    @property
+    def blocked(self) -> bool:
+        return self.reason is not None
+
+    def describe(self) -> str:
+        """Описание для сообщений об ошибке"""
+        if not self.blocked:
+            return ""
+        return f"{self.reason.value} ({self.marker})" if self.marker else self.reason.value
+
+NOT_BLOCKED = BlockVerdict()
+
+# Маркеры в заголовке страницы
+TITLE_MARKERS: Tuple[Tuple[str, BlockReason], ...] = (
+    ("just a moment", BlockReason.CLOUDFLARE),
+    ("attention required", BlockReason.CLOUDFLARE),
+    ("pardon our interruption", BlockReason.INCAPSULA),
+    ("access denied", BlockReason.ACCESS_DENIED),
+    ("captcha", BlockReason.CAPTCHA),
+    ("security check", BlockReason.CAPTCHA),
+    ("are you a robot", BlockReason.CAPTCHA)
+)
+
+# Маркеры конкретных систем защиты: на обычных страницах в начале head/body не встречаются
+VENDOR_MARKERS: Tuple[Tuple[str, BlockReason], ...] = (
+    ("_cf_chl_opt", BlockReason.CLOUDFLARE),
+    ("cf-browser-verification", BlockReason.CLOUDFLARE),
+    ("cf-chl-", BlockReason.CLOUDFLARE),
+    ("_incapsula_resource", BlockReason.INCAPSULA),
+    ("incapsula incident id", BlockReason.INCAPSULA),
+    ("captcha-delivery.com", BlockReason.DATADOME),
+    ("px-captcha", BlockReason.PERIMETERX)
+)
+
+# Общие фразы: учитываются только на коротких страницах, т.к. похожий текст
+# встречается в noscript и формах обычных страниц
+GENERIC_MARKERS: Tuple[Tuple[str, BlockReason], ...] = (
+    ("checking your browser", BlockReason.JS_CHALLENGE),
+    ("verify you are human", BlockReason.CAPTCHA),
+    ("enable javascript and cookies", BlockReason.JS_CHALLENGE),
+    ("javascript is required", BlockReason.JS_CHALLENGE),
+    ("request unsuccessful", BlockReason.ACCESS_DENIED),
+    ("access denied", BlockReason.ACCESS_DENIED),
+    ("captcha", BlockReason.CAPTCHA)
+)
+
+# HTTP статусы блокировки
+STATUS_REASONS: Dict[int, BlockReason] = {
+    403: BlockReason.FORBIDDEN,
+    429: BlockReason.RATE_LIMITED,
+    503: BlockReason.UNAVAILABLE
+}
+
+_TITLE_PATTERN = re.compile(r'<title[^>]*>(.*?)</title', re.IGNORECASE | re.DOTALL)
+_BODY_PATTERN = re.compile(r'<body\b', re.IGNORECASE)
+
+def _compile(markers: Iterable[Tuple[str, BlockReason]]):
+    """Одно регулярное выражение на все маркеры области и таблица причин"""
+    reasons = {marker: reason for marker, reason in markers}
+    # Длинные маркеры первыми, чтобы побеждало наиболее конкретное совпадение
+    pattern = re.compile('|'.join(re.escape(marker) for marker in sorted(reasons, key=len, reverse=True)))
+    return pattern, reasons
+
+class BlockDetector:
+    """Однопроходная проверка страницы на блокировку"""
+
+    # Сколько символов начала документа и начала body просматривается
+    HEAD_WINDOW = 8192
+    BODY_WINDOW = 8192
+    # Страницы защиты занимают единицы килобайт
+    SHORT_PAGE_LIMIT = 30000
+
+    _title = _compile(TITLE_MARKERS)
+    _vendor = _compile(VENDOR_MARKERS)
+    _generic = _compile(GENERIC_MARKERS)
+
+    @staticmethod
+    def _search(compiled, text: str) -> BlockVerdict:
+        pattern, reasons = compiled
+        match = pattern.search(text)
+        if match is None:
+            return NOT_BLOCKED
+        return BlockVerdict(reasons[match.group(0)], match.group(0))
+
+    def check_parts(self, title: str, head: str, body_start: str,
+                    short_page: bool = False) -> BlockVerdict:
+        """Проверка уже выделенных частей страницы (например, полученных из браузера)"""
+        title = (title or '').lower()
+        if title:
+            verdict = self._search(self._title, title)
+            if verdict.blocked:
+                return verdict
+
+        window = f"{head or ''}\n{body_start or ''}".lower()
+        verdict = self._search(self._vendor, window)
+        if verdict.blocked or not short_page:
+            return verdict
+        return self._search(self._generic, window)
+
+    def detect(self, html_content: str, status_code: int = 200,
+               headers: Optional[Mapping[str, str]] = None) -> BlockVerdict:
+        """Проверка HTTP ответа: статус, заголовки и начало документа"""
+        if headers is not None and headers.get('cf-mitigated', '').lower() == 'challenge':
+            return BlockVerdict(BlockReason.CLOUDFLARE, "cf-mitigated")
+
+        html_content = html_content or ''
+        head = html_content[:self.HEAD_WINDOW]
+
+        title_match = _TITLE_PATTERN.search(head)
+        body_match = _BODY_PATTERN.search(html_content)
+        # Если body начинается внутри окна head, просматривается продолжение документа
+        start = max(body_match.start(), self.HEAD_WINDOW) if body_match is not None else self.HEAD_WINDOW
+        body_start = html_content[start:start + self.BODY_WINDOW]
+
+        verdict = self.check_parts(
+            title_match.group(1) if title_match else '', head, body_start,
+            short_page=len(html_content) < self.SHORT_PAGE_LIMIT
+        )
+        if verdict.blocked:
+            return verdict
+
+        reason = STATUS_REASONS.get(status_code)
+        if reason is not None:
+            return BlockVerdict(reason, str(status_code))
+        return NOT_BLOCKED
@@ -0,0 +1,155 @@
+"""
+Автоматический выключатель (circuit breaker) для пар сайт/метод
+После серии блокировок запросы к сайту приостанавливаются на время
+охлаждения, затем одиночный пробный запрос проверяет, снята ли блокировка
+"""
+
+import time
+import threading
+from enum import Enum
+from typing import Dict, Iterable, Optional, Tuple
+
+from scraper.base_scraper import ScrapingMethod, ScrapingResult, ScrapingStatus
+from utils.config import Config
+
+class CircuitState(Enum):
+    """Состояния выключателя"""
+    CLOSED = "closed"        # Запросы выполняются
+    OPEN = "open"            # Сайт блокирует, запросы не выполняются
+    HALF_OPEN = "half_open"  # Выполняется пробный запрос
+
+class CircuitBreaker:
+    """Выключатель одной пары сайт/метод"""
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 60.0,
+                 max_cooldown: float = 600.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.cooldown = cooldown
+        self.opened_at = 0.0
+
+    def retry_in(self) -> float:
+        """Время (сек) до разрешения следующего запроса; 0 - можно сейчас"""
+        if self.state == CircuitState.CLOSED:
+            return 0.0
+        if self.state == CircuitState.HALF_OPEN:
+            # Ждем результата пробного запроса
+            return self.cooldown
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> bool:
+        """Разрешение на запрос (после охлаждения пропускается один пробный)"""
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN and self.retry_in() <= 0:
+            self.state = CircuitState.HALF_OPEN
+            return True
+        return False
+
+    def record(self, blocked: bool) -> Optional[CircuitState]:
+        """Учет результата запроса. Возвращает новое состояние, если оно изменилось"""
+        previous = self.state
+
+        if not blocked:
+            self.state = CircuitState.CLOSED
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+        elif self.state == CircuitState.HALF_OPEN:
+            # Блокировка сохраняется - увеличиваем охлаждение
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open()
+        elif self.state == CircuitState.CLOSED:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self._open()
+
+        return self.state if self.state != previous else None
+
+    def abandon_probe(self):
+        """Пробный запрос не состоялся: следующий запрос снова будет пробным"""
+        if self.state == CircuitState.HALF_OPEN:
+            self.state = CircuitState.OPEN
+
+    def expire_cooldown(self):
+        """Досрочное окончание охлаждения: следующий запрос будет пробным"""
+        if self.state == CircuitState.OPEN:
+            self.opened_at = time.monotonic() - self.cooldown
+
+    def _open(self):
+        self.state = CircuitState.OPEN
+        self.opened_at = time.monotonic()
+
+class SiteCircuitBreakers:
+    """Набор выключателей по сайтам и методам"""
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 60.0,
+                 max_cooldown: float = 600.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+
+        self._breakers: Dict[Tuple[str, ScrapingMethod], CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "SiteCircuitBreakers":
+        """Создание из секции [advanced]"""
+        return cls(
+            failure_threshold=config.getint('advanced', 'circuit_failure_threshold', 3),
+            cooldown=config.getfloat('advanced', 'circuit_cooldown', 60.0),
+            max_cooldown=config.getfloat('advanced', 'circuit_max_cooldown', 600.0)
+        )
+
+    def _breaker(self, site: str, method: ScrapingMethod) -> CircuitBreaker:
+        """Получение (или создание) выключателя; вызывается под блокировкой"""
+        key = (site.lower(), method)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.cooldown, self.max_cooldown)
+            self._breakers[key] = breaker
+        return breaker
+
+    def allow(self, site: str, method: ScrapingMethod) -> bool:
+        """Разрешение на запрос к сайту указанным методом"""
+        with self._lock:
+            return self._breaker(site, method).allow()
+
+    def retry_in(self, site: str, methods: Iterable[ScrapingMethod]) -> float:
+        """Время до момента, когда сайт примет запрос хотя бы одним из методов"""
+        with self._lock:
+            return min(self._breaker(site, method).retry_in() for method in methods)
+
+    def record(self, site: str, method: ScrapingMethod, result: ScrapingResult) -> Optional[CircuitState]:
+        """
+        Учет результата (остановленные попытки не учитываются).
+        Возвращает новое состояние выключателя, если оно изменилось.
+        """
+        with self._lock:
+            breaker = self._breaker(site, method)
+            if result.status == ScrapingStatus.STOPPED:
+                # Прерванный пробный запрос не дал ответа - пробуем снова
+                breaker.abandon_probe()
+                return None
+            return breaker.record(result.blocked)
+
+    def expire_cooldown(self, site: str, method: ScrapingMethod):
+        """Разрешение пробного запроса до окончания охлаждения (условия на сайте изменились)"""
+        with self._lock:
+            self._breaker(site, method).expire_cooldown()
+
+    def cooldown_of(self, site: str, method: ScrapingMethod) -> float:
+        """Текущая длительность охлаждения выключателя"""
+        with self._lock:
+            return self._breaker(site, method).cooldown
+
+    def snapshot(self) -> Dict[str, Dict[str, str]]:
+        """Текущие состояния выключателей"""
+        with self._lock:
+            snapshot = {}
+            for (site, method), breaker in self._breakers.items():
+                snapshot.setdefault(site, {})[method.value] = breaker.state.value
+            return snapshot
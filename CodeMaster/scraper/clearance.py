@@ -0,0 +1,345 @@
+"""
+Состояние сессий по сайтам: cookies допуска из браузера и cookies HTTP сессий
+Когда Selenium проходит проверку Cloudflare/Incapsula, сайт выдает cookies
+допуска, привязанные к User-Agent браузера. Они сохраняются вместе с этим
+User-Agent и подставляются в запросы HTTP скрейперов к тому же сайту до
+истечения срока действия.
+Cookies и User-Agent собственных HTTP сессий каждого сайта хранятся там же.
+Все сохраняется на диск, поэтому следующий запуск начинает работу с уже
+прогретыми сессиями и пройденной защитой.
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from utils.config import Config
+
+# Cookies, выдаваемые после прохождения проверки (точные имена и префиксы)
+CLEARANCE_COOKIES = ('cf_clearance', '__cf_bm', 'datadome', 'reese84', '_px3', '_pxvid')
+CLEARANCE_COOKIE_PREFIXES = ('incap_ses_', 'visid_incap_', 'nlbi_')
+
+def is_clearance_cookie(name: str) -> bool:
+    """Является ли cookie допуском системы защиты"""
+    return name in CLEARANCE_COOKIES or name.startswith(CLEARANCE_COOKIE_PREFIXES)
+
+def live_cookies(cookies: Iterable[Dict]) -> List[Dict]:
+    """Cookies (в формате WebDriver) без истекших"""
+    now = time.time()
+    return [cookie for cookie in cookies if not cookie.get('expiry') or cookie['expiry'] > now]
+
+def set_session_cookies(session, cookies: Iterable[Dict]):
+    """Запись cookies в cookie jar сессии requests/cloudscraper"""
+    for cookie in live_cookies(cookies):
+        # Cookie без домена отправлялась бы на все сайты
+        if not cookie.get('domain'):
+            continue
+        session.cookies.set(
+            cookie['name'], cookie['value'],
+            domain=cookie['domain'],
+            path=cookie.get('path', '/'),
+            secure=bool(cookie.get('secure', False)),
+            expires=cookie.get('expiry')
+        )
+
+def jar_cookies(session, host: str) -> List[Dict]:
+    """Cookies сессии requests для хоста сайта в формате WebDriver"""
+    cookies = []
+    for cookie in session.cookies:
+        domain = cookie.domain.lstrip('.')
+        if not domain or not (host == domain or host.endswith('.' + domain) or domain.endswith('.' + host)):
+            continue
+        item = {
+            'name': cookie.name,
+            'value': cookie.value,
+            'domain': cookie.domain,
+            'path': cookie.path or '/',
+            'secure': bool(cookie.secure)
+        }
+        if cookie.expires:
+            item['expiry'] = cookie.expires
+        cookies.append(item)
+    return live_cookies(cookies)
+
+@dataclass
+class Clearance:
+    """Cookies допуска сайта и User-Agent браузера, который их получил"""
+    site: str
+    cookies: List[Dict]                  # Cookies в формате WebDriver.get_cookies()
+    user_agent: str
+    expires_at: float                    # time.time(), после которого допуск не используется
+    version: int = 0                     # Растет при каждом обновлении допуска сайта
+    obtained_at: float = field(default_factory=time.time)
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+    def cookie_dict(self) -> Dict[str, str]:
+        """Cookies в виде имя -> значение (для aiohttp)"""
+        return {cookie['name']: cookie['value'] for cookie in self.cookies}
+
+    def cdp_cookies(self) -> List[Dict]:
+        """Cookies в формате DevTools Network.setCookies"""
+        cookies = []
+        for cookie in self.cookies:
+            if not cookie.get('domain'):
+                continue
+            cdp_cookie = {
+                'name': cookie['name'],
+                'value': cookie['value'],
+                'domain': cookie['domain'],
+                'path': cookie.get('path', '/'),
+                'secure': bool(cookie.get('secure', False)),
+                'httpOnly': bool(cookie.get('httpOnly', False))
+            }
+            if cookie.get('expiry'):
+                cdp_cookie['expires'] = cookie['expiry']
+            if cookie.get('sameSite') in ('Strict', 'Lax', 'None'):
+                cdp_cookie['sameSite'] = cookie['sameSite']
+            cookies.append(cdp_cookie)
+        return cookies
+
+    def apply_to_session(self, session):
+        """Запись cookies в cookie jar сессии requests/cloudscraper"""
+        set_session_cookies(session, self.cookies)
+
+@dataclass
+class SiteSession:
+    """Cookies HTTP сессии сайта и User-Agent, с которым они получены"""
+    site: str
+    cookies: List[Dict]                  # Cookies в формате WebDriver.get_cookies()
+    user_agent: str
+    expires_at: float
+    saved_at: float = field(default_factory=time.time)
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+    def cookie_dict(self) -> Dict[str, str]:
+        """Cookies в виде имя -> значение (для aiohttp)"""
+        return {cookie['name']: cookie['value'] for cookie in live_cookies(self.cookies)}
+
+class ClearanceStore:
+    """Потокобезопасное хранилище допусков и HTTP сессий по сайтам с сохранением на диск"""
+
+    # Минимальный интервал между записями файла при обновлении сессий (сек)
+    SAVE_INTERVAL = 30.0
+
+    def __init__(self, ttl: float = 1800.0, state_file: Optional[str] = None,
+                 handoff: bool = True, session_ttl: float = 86400.0):
+        # Срок жизни допуска без явного срока действия cookies (сек)
+        self.ttl = ttl
+        # Передача допусков из браузера HTTP скрейперам (сессии сохраняются в любом случае)
+        self.handoff = handoff
+        # Срок хранения cookies HTTP сессии после последнего успешного запроса (сек)
+        self.session_ttl = session_ttl
+        self.state_file = Path(state_file) if state_file else None
+        self._clearances: Dict[str, Clearance] = {}
+        self._versions: Dict[str, int] = {}
+        self._sessions: Dict[str, SiteSession] = {}
+        self._lock = threading.Lock()
+        # Файл записывается одним потоком за раз
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+
+        self.load()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "ClearanceStore":
+        """Создание из секции [advanced]"""
+        return cls(
+            ttl=config.getfloat('advanced', 'clearance_ttl', 1800.0),
+            state_file=config.get('advanced', 'session_state_file', 'session_state.json'),
+            handoff=config.getboolean('advanced', 'clearance_handoff', True),
+            session_ttl=config.getfloat('advanced', 'session_ttl', 86400.0)
+        )
+
+    def update(self, site: str, cookies: Iterable[Dict], user_agent: str) -> Optional[Clearance]:
+        """
+        Сохранение cookies браузера, если среди них есть допуск защиты.
+        Возвращает новый допуск или None, если допуска нет или он не изменился.
+        """
+        if not self.handoff:
+            return None
+        cookies = [cookie for cookie in cookies if cookie.get('name') and 'value' in cookie]
+        clearance_cookies = [cookie for cookie in cookies if is_clearance_cookie(cookie['name'])]
+        if not clearance_cookies or not user_agent:
+            return None
+
+        # Допуск действует, пока не истекла первая из cookies допуска
+        now = time.time()
+        expiries = [cookie['expiry'] for cookie in clearance_cookies if cookie.get('expiry')]
+        expires_at = min(expiries) if expiries else now + self.ttl
+        if expires_at <= now:
+            return None
+
+        site = site.lower()
+        with self._lock:
+            current = self._clearances.get(site)
+            if (current is not None and not current.expired and current.user_agent == user_agent
+                    and current.cookie_dict() == {c['name']: c['value'] for c in cookies}):
+                return None
+
+            version = self._versions.get(site, 0) + 1
+            self._versions[site] = version
+            clearance = Clearance(site, cookies, user_agent, expires_at, version)
+            self._clearances[site] = clearance
+            self._dirty = True
+
+        # Новый допуск сразу сохраняется: он пригодится, даже если запуск прервется
+        self.save()
+        return clearance
+
+    def get(self, site: str) -> Optional[Clearance]:
+        """Действующий допуск сайта (истекший удаляется)"""
+        if not self.handoff:
+            return None
+        site = site.lower()
+        with self._lock:
+            clearance = self._clearances.get(site)
+            if clearance is not None and clearance.expired:
+                del self._clearances[site]
+                self._dirty = True
+                return None
+            return clearance
+
+    def has(self, site: str) -> bool:
+        return self.get(site) is not None
+
+    def version(self, site: str) -> int:
+        """Номер последнего сохраненного допуска сайта (0 - допуска не было)"""
+        with self._lock:
+            return self._versions.get(site.lower(), 0)
+
+    def invalidate(self, site: str, version: Optional[int] = None):
+        """
+        Удаление допуска, который сайт перестал принимать. Если указана версия,
+        удаляется только она (более новый допуск из браузера сохраняется).
+        """
+        site = site.lower()
+        with self._lock:
+            clearance = self._clearances.get(site)
+            if clearance is None or (version is not None and clearance.version != version):
+                return
+            del self._clearances[site]
+            self._dirty = True
+        self.save()
+
+    def update_session(self, site: str, cookies: Iterable[Dict], user_agent: str) -> bool:
+        """
+        Запоминание cookies и User-Agent HTTP сессии сайта после успешного запроса.
+        Файл перезаписывается не чаще SAVE_INTERVAL. Возвращает True, если сессия изменилась.
+        """
+        cookies = live_cookies(cookies)
+        if not cookies or not user_agent:
+            return False
+
+        site = site.lower()
+        now = time.time()
+        with self._lock:
+            current = self._sessions.get(site)
+            changed = (current is None or current.user_agent != user_agent
+                       or current.cookie_dict() != {c['name']: c['value'] for c in cookies})
+            if not changed and current.expires_at - now > self.session_ttl / 2:
+                return False
+            self._sessions[site] = SiteSession(site, cookies, user_agent, now + self.session_ttl, now)
+            self._dirty = True
+            save_due = now - self._saved_at >= self.SAVE_INTERVAL
+
+        if save_due:
+            self.save()
+        return changed
+
+    def get_session(self, site: str) -> Optional[SiteSession]:
+        """Сохраненная HTTP сессия сайта (истекшая удаляется)"""
+        site = site.lower()
+        with self._lock:
+            session = self._sessions.get(site)
+            if session is not None and session.expired:
+                del self._sessions[site]
+                self._dirty = True
+                return None
+            return session
+
+    def sessions(self) -> List[SiteSession]:
+        """Все действующие сохраненные HTTP сессии"""
+        with self._lock:
+            return [session for session in self._sessions.values() if not session.expired]
+
+    def load(self):
+        """Загрузка допусков и сессий прошлых запусков (истекшие пропускаются)"""
+        if not self.state_file or not self.state_file.exists():
+            return
+
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            with self._lock:
+                for site, values in data.get('sessions', {}).items():
+                    session = SiteSession(
+                        site=site,
+                        cookies=live_cookies(values['cookies']),
+                        user_agent=str(values['user_agent']),
+                        expires_at=float(values['expires_at']),
+                        saved_at=float(values.get('saved_at', 0.0))
+                    )
+                    if not session.expired and session.cookies:
+                        self._sessions[site] = session
+
+                for site, values in data.get('clearances', {}).items():
+                    clearance = Clearance(
+                        site=site,
+                        cookies=list(values['cookies']),
+                        user_agent=str(values['user_agent']),
+                        expires_at=float(values['expires_at']),
+                        version=int(values.get('version', 0)),
+                        obtained_at=float(values.get('obtained_at', 0.0))
+                    )
+                    self._versions[site] = max(self._versions.get(site, 0), clearance.version)
+                    if not clearance.expired:
+                        self._clearances[site] = clearance
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"Ошибка загрузки сохраненных сессий: {e}")
+
+    def save(self) -> bool:
+        """Сохранение действующих допусков и сессий (атомарная замена файла)"""
+        if not self.state_file or not self._dirty:
+            return False
+
+        with self._save_lock:
+            with self._lock:
+                data = {
+                    'clearances': {
+                        site: asdict(clearance)
+                        for site, clearance in self._clearances.items() if not clearance.expired
+                    },
+                    'sessions': {
+                        site: asdict(session)
+                        for site, session in self._sessions.items() if not session.expired
+                    }
+                }
+                self._dirty = False
+                self._saved_at = time.time()
+
+            try:
+                directory = self.state_file.parent
+                directory.mkdir(parents=True, exist_ok=True)
+                # mkstemp создает файл с правами только для владельца - cookies не видны другим
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.state_file)
+                return True
+            except OSError as e:
+                self._dirty = True
+                print(f"Ошибка сохранения сессий: {e}")
+                return False
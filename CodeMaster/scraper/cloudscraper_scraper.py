@@ -4,91 +4,197 @@ CloudScraper скрейпер для быстрой обработки прос
 
 import time
 import random
+import threading
+import weakref
 from typing import Optional
+from urllib.parse import urlparse
 import cloudscraper
-from bs4 import BeautifulSoup
+import requests
 import trafilatura
 
 from scraper.base_scraper import BaseScraper, ScrapingResult, ScrapingStatus, ScrapingMethod, ProductInfo
+from scraper.session_pool import SessionPool
+from scraper.block_detector import BlockDetector, BlockVerdict
+from scraper.http_cache import HttpCache
+from scraper.retry import parse_retry_after
+from scraper.html_parser import HtmlProductParser, ParsePool
+from scraper.clearance import Clearance, ClearanceStore, jar_cookies, set_session_cookies
+from scraper.structured_data import extract_structured_product
 
 class CloudScraperScraper(BaseScraper):
     """CloudScraper для обхода защиты Cloudflare"""
     
-    def __init__(self, **kwargs):
+    # Базовые заголовки запросов (общие для синхронного и асинхронного движков)
+    DEFAULT_HEADERS = {
+        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+        'Accept-Language': 'uk-UA,uk;q=0.9,en;q=0.8,ru;q=0.7',
+        'Accept-Encoding': 'gzip, deflate, br',
+        'DNT': '1',
+        'Connection': 'keep-alive',
+        'Upgrade-Insecure-Requests': '1',
+        'Cache-Control': 'max-age=0'
+    }
+    
+    # HTTP статусы, после которых сессия считается "помеченной" сайтом
+    RECYCLE_STATUS_CODES = (403, 429, 503)
+    
+    def __init__(self, pool_size: int = 1, http_cache: Optional[HttpCache] = None,
+                 parse_pool: Optional[ParsePool] = None, html_backend: str = 'auto',
+                 structured_data: bool = True, clearance_store: Optional[ClearanceStore] = None,
+                 **kwargs):
         super().__init__(**kwargs)
-        self.scraper = None
+        self.pool_size = pool_size
+        self.http_cache = http_cache
+        
+        # Cookies допуска, полученные браузером (Selenium), и версии, записанные в каждую сессию;
+        # там же хранятся cookies и User-Agent HTTP сессий по сайтам
+        self.clearance_store = clearance_store
+        self._session_clearances = weakref.WeakKeyDictionary()
+        self._clearance_lock = threading.Lock()
+        
+        # Разбор HTML: в пуле процессов (если задан) или в потоке загрузки
+        self.parse_pool = parse_pool
+        self.html_parser = HtmlProductParser(html_backend, structured_data)
+        self.block_detector = BlockDetector()
+        self.session_pool = None
         self._setup_scraper()
     
     def _setup_scraper(self):
-        """Настройка CloudScraper"""
-        try:
-            self.scraper = cloudscraper.create_scraper(
-                browser={
-                    'browser': 'chrome',
-                    'platform': 'windows',
-                    'mobile': False
-                },
-                delay=random.uniform(1, 3)
-            )
-            
-            # Базовые заголовки
-            self.scraper.headers.update({
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'uk-UA,uk;q=0.9,en;q=0.8,ru;q=0.7',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Cache-Control': 'max-age=0'
-            })
-            
-            self._log("CloudScraper успешно настроен")
-            
-        except Exception as e:
-            self._log(f"Ошибка настройки CloudScraper: {e}", "ERROR")
+        """Настройка пула сессий CloudScraper"""
+        self.session_pool = SessionPool(self._create_session, self.pool_size)
+        self._log(f"CloudScraper настроен, размер пула сессий: {self.pool_size}")
+    
+    def _create_session(self) -> cloudscraper.CloudScraper:
+        """
+        Создание новой сессии CloudScraper.
+        User-Agent фиксируется на все время жизни сессии, keep-alive соединения
+        к каждому хосту сессия держит в собственном пуле. Сохраненные cookies
+        сайтов (в том числе из прошлого запуска) загружаются в новую сессию.
+        """
+        session = cloudscraper.create_scraper(
+            browser={
+                'browser': 'chrome',
+                'platform': 'windows',
+                'mobile': False
+            },
+            delay=random.uniform(1, 3)
+        )
+        
+        # Базовые заголовки
+        session.headers.update(self.DEFAULT_HEADERS)
+        session.headers['User-Agent'] = self.get_random_user_agent()
+        
+        if self.clearance_store is not None:
+            for site_session in self.clearance_store.sessions():
+                set_session_cookies(session, site_session.cookies)
+        
+        self._log("Создана новая сессия CloudScraper", "DEBUG")
+        return session
     
     def scrape_product(self, product_id: str, site: str) -> ScrapingResult:
         """Скрейпинг товара с помощью CloudScraper"""
-        start_time = time.time()
-        result = ScrapingResult(method_used=ScrapingMethod.CLOUDSCRAPER)
-        
         if not self.validate_product_id(product_id):
+            result = ScrapingResult(method_used=ScrapingMethod.CLOUDSCRAPER)
             result.status = ScrapingStatus.ERROR
             result.error_message = "Некорректный ID товара"
             return result
         
-        if not self.scraper:
-            self._setup_scraper()
-            if not self.scraper:
-                result.status = ScrapingStatus.ERROR
-                result.error_message = "Не удалось настроить CloudScraper"
-                return result
+        # Получение URL товара
+        product_url = self.format_product_url(product_id, site)
+        if not product_url:
+            result = ScrapingResult(method_used=ScrapingMethod.CLOUDSCRAPER)
+            result.status = ScrapingStatus.ERROR
+            result.error_message = f"Неподдерживаемый сайт: {site}"
+            return result
+        
+        return self.scrape_url(product_id, site, product_url)
+    
+    def scrape_url(self, product_id: str, site: str, product_url: str,
+                   structured_only: bool = False) -> ScrapingResult:
+        """
+        Загрузка страницы product_url и извлечение товара product_id.
+        structured_only=True - только из структурированных данных с совпадающим ID
+        (для страниц поиска, где DOM правила страницы товара неприменимы).
+        """
+        start_time = time.time()
+        result = ScrapingResult(method_used=ScrapingMethod.CLOUDSCRAPER)
+        
+        session = None
+        response = None
+        recycle_session = False
+        clearance = None
         
         try:
-            # Получение URL товара
-            product_url = self.format_product_url(product_id, site)
-            if not product_url:
-                result.status = ScrapingStatus.ERROR
-                result.error_message = f"Неподдерживаемый сайт: {site}"
-                return result
-            
-            self._log(f"Загрузка страницы через CloudScraper: {product_url}")
-            
-            # Установка случайного User-Agent
-            self.scraper.headers['User-Agent'] = self.get_random_user_agent()
-            
-            # Выполнение запроса
-            response = self.scraper.get(product_url, timeout=self.timeout)
-            
-            if response.status_code == 200:
+            # Свежая запись кэша не требует запроса к сайту
+            cache_entry = self.http_cache.get(product_url) if self.http_cache else None
+            if cache_entry is not None and self.http_cache.is_fresh(cache_entry):
+                self._log(f"Страница взята из кэша: {product_url}", "DEBUG")
+                status_code, html_content = 200, cache_entry.body
+            else:
+                if not self.wait_for_slot(site):
+                    result.status = ScrapingStatus.STOPPED
+                    return result
+                
+                self._log(f"Загрузка страницы через CloudScraper: {product_url}")
+                
+                # Выполнение запроса на сессии, выданной только этому потоку;
+                # устаревшая запись кэша перепроверяется условным запросом
+                session = self.session_pool.checkout()
+                headers = dict(self.http_cache.conditional_headers(cache_entry)) if self.http_cache else {}
+                
+                # Допуск, полученный браузером, действует только с его User-Agent
+                clearance = self.clearance_store.get(site) if self.clearance_store else None
+                if clearance is not None:
+                    self._apply_clearance(session, clearance)
+                    headers['User-Agent'] = clearance.user_agent
+                else:
+                    # Сохраненные cookies сайта отправляются с тем же User-Agent, с которым получены
+                    site_session = self.clearance_store.get_session(site) if self.clearance_store else None
+                    if site_session is not None:
+                        headers['User-Agent'] = site_session.user_agent
+                response = session.get(product_url, headers=headers, timeout=self.timeout)
+                status_code = response.status_code
+                
+                if status_code == 304 and cache_entry is not None:
+                    self._log(f"Страница не изменилась, используется кэш: {product_url}", "DEBUG")
+                    self.http_cache.refresh(product_url, cache_entry, response.headers)
+                    status_code, html_content = 200, cache_entry.body
+                else:
+                    html_content = response.text
+            
+            result.http_status = status_code
+            verdict = self._detect_block(html_content, status_code, response.headers if response is not None else None)
+            if verdict.blocked:
+                recycle_session = True
+                result.blocked = True
+                result.block_reason = verdict.reason
+                if clearance is not None:
+                    # Сайт больше не принимает допуск - до нового прохождения в браузере
+                    self.clearance_store.invalidate(site, clearance.version)
+                    self._log(f"Допуск браузера для {site} больше не действует", "WARNING")
+            if status_code in self.RECYCLE_STATUS_CODES and response is not None:
+                result.retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            
+            if status_code == 200:
                 # Проверка на блокировку
-                if self._is_blocked(response.text):
+                if verdict.blocked:
                     result.status = ScrapingStatus.ERROR
-                    result.error_message = "Страница заблокирована или требует JavaScript"
-                    self._log("Обнаружена блокировка CloudScraper", "WARNING")
+                    result.error_message = f"Страница заблокирована: {verdict.describe()}"
+                    self._log(f"Обнаружена блокировка CloudScraper: {verdict.describe()}", "WARNING")
                 else:
+                    # В кэш попадают только полученные от сайта незаблокированные страницы
+                    if self.http_cache and response is not None and response.status_code == 200:
+                        self.http_cache.store(product_url, html_content, response.headers)
+                    if response is not None:
+                        self._remember_session(session, site, headers.get('User-Agent'))
+                    
                     # Парсинг данных
-                    product = self._parse_product_data(product_id, site, product_url, response.text)
+                    if structured_only:
+                        product = extract_structured_product(
+                            html_content, product_id, site, product_url, require_id_match=True
+                        )
+                    else:
+                        product = self._parse_product_data(product_id, site, product_url, html_content)
                     
                     if product:
                         result.product = product
@@ -99,236 +205,67 @@ class CloudScraperScraper(BaseScraper):
                         result.error_message = "Не удалось извлечь данные товара"
             else:
                 result.status = ScrapingStatus.ERROR
-                result.error_message = f"HTTP ошибка: {response.status_code}"
-                self._log(f"HTTP ошибка: {response.status_code}", "ERROR")
+                result.error_message = f"HTTP ошибка: {status_code}"
+                self._log(f"HTTP ошибка: {status_code}", "ERROR")
+        
+        except (requests.RequestException, TimeoutError) as e:
+            # Сетевые ошибки и таймауты запроса считаются временными
+            recycle_session = True
+            result.transient = True
+            result.status = ScrapingStatus.ERROR
+            result.error_message = f"Ошибка CloudScraper: {str(e)}"
+            self._log(f"Ошибка: {e}", "ERROR")
         
         except Exception as e:
+            # Остальные ошибки (проверка защиты, разбор ответа) повтором не исправить
             result.status = ScrapingStatus.ERROR
             result.error_message = f"Ошибка CloudScraper: {str(e)}"
             self._log(f"Ошибка: {e}", "ERROR")
         
         finally:
+            if session is not None:
+                self.session_pool.release(session, recycle=recycle_session)
             result.response_time = time.time() - start_time
             result.attempts = 1
-            
-            # Добавление задержки между запросами
-            self.add_delay()
         
         return result
     
-    def _is_blocked(self, html_content: str) -> bool:
-        """Проверка на блокировку или защиту"""
-        blocking_indicators = [
-            "checking your browser",
-            "captcha",
-            "protection",
-            "verify you are human",
-            "blocked",
-            "access denied",
-            "pardon our interruption",
-            "incapsula",
-            "cloudflare",
-            "bot detection",
-            "challenge",
-            "javascript is required"
-        ]
-        
-        content_lower = html_content.lower()
-        for indicator in blocking_indicators:
-            if indicator in content_lower:
-                return True
-        
-        return False
-    
-    def _parse_product_data(self, product_id: str, site: str, url: str, html_content: str) -> Optional[ProductInfo]:
-        """Парсинг данных товара из HTML"""
-        try:
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            if site.lower() == 'rozetka':
-                return self._parse_rozetka_product(product_id, url, soup)
-            elif site.lower() == 'allo':
-                return self._parse_allo_product(product_id, url, soup)
-            elif site.lower() == 'comfy':
-                return self._parse_comfy_product(product_id, url, soup)
-            elif site.lower() == 'epicentr':
-                return self._parse_epicentr_product(product_id, url, soup)
-            
-            return None
-            
-        except Exception as e:
-            self._log(f"Ошибка парсинга данных: {e}", "ERROR")
-            return None
-    
-    def _parse_rozetka_product(self, product_id: str, url: str, soup: BeautifulSoup) -> Optional[ProductInfo]:
-        """Парсинг товара Rozetka"""
-        try:
-            product = ProductInfo(id=product_id, url=url, site="rozetka")
-            
-            # Название товара
-            title_selectors = [
-                "h1[data-testid='product-title']",
-                ".product-title",
-                "h1.product__title",
-                "h1"
-            ]
-            
-            for selector in title_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    product.name = self.clean_text(element.get_text())
-                    break
-            
-            # Цена
-            price_selectors = [
-                "[data-testid='price'] .price__value",
-                ".price .price__value",
-                ".price-value",
-                ".product-price__big"
-            ]
-            
-            for selector in price_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    price_text = element.get_text()
-                    product.price = self.parse_price(price_text)
-                    break
-            
-            # Старая цена
-            old_price_element = soup.select_one(".price__old, .old-price")
-            if old_price_element:
-                product.old_price = self.parse_price(old_price_element.get_text())
-            
-            # Доступность
-            status_element = soup.select_one(".status-label, .availability-status")
-            if status_element:
-                product.availability = self.clean_text(status_element.get_text())
-            
-            # Изображение
-            img_element = soup.select_one(".product-photo img, .gallery img")
-            if img_element:
-                product.image_url = img_element.get('src', '')
-            
-            return product if product.name else None
-            
-        except Exception as e:
-            self._log(f"Ошибка парсинга Rozetka: {e}", "ERROR")
-            return None
+    def _apply_clearance(self, session, clearance: Clearance):
+        """Запись cookies допуска в сессию (один раз на каждую версию допуска)"""
+        with self._clearance_lock:
+            applied = self._session_clearances.setdefault(session, {})
+            if applied.get(clearance.site) == clearance.version:
+                return
+            applied[clearance.site] = clearance.version
+        clearance.apply_to_session(session)
     
-    def _parse_allo_product(self, product_id: str, url: str, soup: BeautifulSoup) -> Optional[ProductInfo]:
-        """Парсинг товара Allo"""
-        try:
-            product = ProductInfo(id=product_id, url=url, site="allo")
-            
-            # Название
-            title_selectors = [
-                "h1.p-view__title",
-                ".product-title",
-                "h1"
-            ]
-            
-            for selector in title_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    product.name = self.clean_text(element.get_text())
-                    break
-            
-            # Цена
-            price_selectors = [
-                ".p-view__price .sum",
-                ".price .sum",
-                ".price-current"
-            ]
-            
-            for selector in price_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    product.price = self.parse_price(element.get_text())
-                    break
-            
-            # Доступность
-            status_element = soup.select_one(".p-view__status, .availability")
-            if status_element:
-                product.availability = self.clean_text(status_element.get_text())
-            else:
-                product.availability = "В наличии"
-            
-            return product if product.name else None
-            
-        except Exception as e:
-            self._log(f"Ошибка парсинга Allo: {e}", "ERROR")
-            return None
+    def _remember_session(self, session, site: str, user_agent: Optional[str] = None):
+        """Сохранение cookies сайта из сессии после успешного запроса"""
+        if self.clearance_store is None:
+            return
+        base_url = self.get_site_base_url(site)
+        host = (urlparse(base_url).hostname or '') if base_url else ''
+        if host.startswith('www.'):
+            host = host[4:]
+        if not host:
+            return
+        cookies = jar_cookies(session, host)
+        if cookies:
+            self.clearance_store.update_session(site, cookies, user_agent or session.headers.get('User-Agent', ''))
     
-    def _parse_comfy_product(self, product_id: str, url: str, soup: BeautifulSoup) -> Optional[ProductInfo]:
-        """Парсинг товара Comfy"""
-        try:
-            product = ProductInfo(id=product_id, url=url, site="comfy")
-            
-            # Название
-            title_selectors = [
-                ".product-title",
-                "h1"
-            ]
-            
-            for selector in title_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    product.name = self.clean_text(element.get_text())
-                    break
-            
-            # Цена
-            price_selectors = [
-                ".price-current",
-                ".price"
-            ]
-            
-            for selector in price_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    product.price = self.parse_price(element.get_text())
-                    break
-            
-            return product if product.name else None
-            
-        except Exception as e:
-            self._log(f"Ошибка парсинга Comfy: {e}", "ERROR")
-            return None
+    def _detect_block(self, html_content: str, status_code: int = 200, headers=None) -> BlockVerdict:
+        """Проверка ответа на блокировку или защиту"""
+        return self.block_detector.detect(html_content, status_code, headers)
     
-    def _parse_epicentr_product(self, product_id: str, url: str, soup: BeautifulSoup) -> Optional[ProductInfo]:
-        """Парсинг товара Epicentr"""
+    def _parse_product_data(self, product_id: str, site: str, url: str, html_content: str) -> Optional[ProductInfo]:
+        """Парсинг данных товара из HTML (в пуле процессов, если он задан)"""
         try:
-            product = ProductInfo(id=product_id, url=url, site="epicentr")
-            
-            # Название
-            title_selectors = [
-                "h1",
-                ".product-title"
-            ]
-            
-            for selector in title_selectors:
-                element = soup.select_one(selector)
-                if element:
-                    product.name = self.clean_text(element.get_text())
-                    break
-            
-            # Цена
-            price_selectors = [
-                "[class*='price']",
-                ".price"
-            ]
-            
-            for selector in price_selectors:
-                elements = soup.select(selector)
-                for element in elements:
-                    price_text = element.get_text()
-                    if price_text and any(char.isdigit() for char in price_text):
-                        product.price = self.parse_price(price_text)
-                        break
-                if product.price:
-                    break
-            
-            return product if product.name else None
-            
+            if self.parse_pool is not None:
+                return self.parse_pool.parse(
+                    product_id, site, url, html_content,
+                    self.html_parser.backend, self.html_parser.structured_data
+                )
+            return self.html_parser.parse(product_id, site, url, html_content)
         except Exception as e:
-            self._log(f"Ошибка парсинга Epicentr: {e}", "ERROR")
+            self._log(f"Ошибка парсинга данных: {e}", "ERROR")
             return None
@@ -0,0 +1,96 @@
+"""
+Объединение повторных запросов одного товара в рамках запуска
+Дубликат (product_id, site) не загружается повторно, а получает
+результат уже выполняющегося или завершенного запроса
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from scraper.base_scraper import ScrapingResult, ScrapingStatus
+
+class RequestCoalescer:
+    """Потокобезопасный учет выполняющихся и завершенных запросов"""
+
+    # Сколько успешных результатов помнить для дубликатов, встреченных позже
+    MAX_REMEMBERED = 10000
+
+    def __init__(self, max_remembered: int = MAX_REMEMBERED):
+        self.max_remembered = max_remembered
+        self._lock = threading.Lock()
+
+        # Ключ -> товары, ожидающие результата ведущего запроса
+        self._in_flight: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        self._completed: "OrderedDict[Tuple[str, str], ScrapingResult]" = OrderedDict()
+        self._ready: List[Tuple[str, str, ScrapingResult]] = []
+
+        self.coalesced_count = 0
+
+    @staticmethod
+    def make_key(product_id: str, site: str) -> Tuple[str, str]:
+        """Нормализованный ключ товара"""
+        return str(product_id).strip(), site.lower()
+
+    def admit(self, product_id: str, site: str) -> bool:
+        """
+        Регистрация товара из источника.
+        True - товар нужно загрузить; False - это дубликат, результат
+        будет выдан вместе с ведущим запросом (или уже готов).
+        """
+        key = self.make_key(product_id, site)
+        with self._lock:
+            if key in self._in_flight:
+                self._in_flight[key].append((product_id, site))
+                self.coalesced_count += 1
+                return False
+
+            result = self._completed.get(key)
+            if result is not None:
+                self._completed.move_to_end(key)
+                self._ready.append((product_id, site, result))
+                self.coalesced_count += 1
+                return False
+
+            self._in_flight[key] = []
+            return True
+
+    def filter(self, products: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, str]]:
+        """Ленивый источник товаров без дубликатов"""
+        for product_id, site in products:
+            if self.admit(product_id, site):
+                yield product_id, site
+
+    def complete(self, product_id: str, site: str,
+                 result: ScrapingResult) -> List[Tuple[str, str, ScrapingResult]]:
+        """
+        Завершение ведущего запроса.
+        Возвращает результат для него и всех присоединившихся дубликатов.
+        """
+        key = self.make_key(product_id, site)
+        with self._lock:
+            followers = self._in_flight.pop(key, [])
+
+            # Запоминаются только успехи: неудачный товар при повторе в списке
+            # получает еще одну попытку
+            if result.status == ScrapingStatus.SUCCESS:
+                self._completed[key] = result
+                self._completed.move_to_end(key)
+                while len(self._completed) > self.max_remembered:
+                    self._completed.popitem(last=False)
+
+        return [(product_id, site, result)] + [
+            (follower_id, follower_site, result) for follower_id, follower_site in followers
+        ]
+
+    def drain_ready(self) -> List[Tuple[str, str, ScrapingResult]]:
+        """Дубликаты, результат которых был известен в момент чтения из источника"""
+        with self._lock:
+            ready, self._ready = self._ready, []
+        return ready
+
+    @property
+    def waiting_count(self) -> int:
+        """Количество дубликатов, ожидающих ведущие запросы"""
+        with self._lock:
+            return sum(len(followers) for followers in self._in_flight.values())
@@ -0,0 +1,91 @@
+"""
+Поиск товара по коду сразу на нескольких сайтах
+Все выбранные сайты опрашиваются одновременно, частота запросов ограничивается
+отдельно для каждого сайта (SiteRateLimiter), а результаты выдаются по мере
+готовности. Поиск кода на нескольких магазинах занимает столько же, сколько
+поиск на самом медленном из них.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional
+
+from scraper.base_scraper import ScrapingResult, ScrapingStatus, ProductInfo
+from scraper.site_scrapers import HybridScraper
+
+# Где найден товар
+SOURCE_PRODUCT_PAGE = "product_page"
+SOURCE_SEARCH_PAGE = "search_page"
+
+@dataclass
+class CodeSearchHit:
+    """Результат поиска кода на одном сайте"""
+    code: str
+    site: str
+    result: ScrapingResult
+    source: Optional[str] = None         # SOURCE_PRODUCT_PAGE / SOURCE_SEARCH_PAGE, если найден
+
+    @property
+    def found(self) -> bool:
+        return self.result.status == ScrapingStatus.SUCCESS
+
+    @property
+    def product(self) -> Optional[ProductInfo]:
+        return self.result.product
+
+class CodeSearch:
+    """
+    Конвейер поиска по коду: для каждой пары код/сайт сначала открывается
+    страница товара (все методы HybridScraper с fallback), затем, если товар не
+    найден, страница поиска сайта.
+    """
+
+    def __init__(self, scraper: HybridScraper, search_pages: bool = True):
+        self.scraper = scraper
+        self.search_pages = search_pages
+        # Источник найденного товара по паре (код, сайт)
+        self._sources = {}
+
+    def iter_search(self, codes: Iterable[str], sites: Iterable[str],
+                    max_workers: Optional[int] = None) -> Iterator[CodeSearchHit]:
+        """
+        Поиск кодов на сайтах с выдачей результата каждой пары по готовности.
+        codes читаются лениво; по умолчанию одновременно обрабатывается по
+        два запроса на сайт.
+        """
+        sites = [site.lower() for site in sites]
+        if not sites:
+            return
+
+        pairs = ((str(code).strip(), site) for code in codes for site in sites)
+        max_workers = max_workers or len(sites) * 2
+
+        try:
+            for code, site, result in self.scraper.iter_scrape_items(pairs, max_workers, task=self._search_site):
+                # get, а не pop: повторы пары получают тот же результат
+                yield CodeSearchHit(code, site, result, self._sources.get((code, site)))
+        finally:
+            self._sources.clear()
+
+    def search_by_code(self, code: str, sites: Iterable[str]) -> List[CodeSearchHit]:
+        """Поиск одного кода на всех сайтах"""
+        return list(self.iter_search([code], sites))
+
+    def _search_site(self, code: str, site: str) -> ScrapingResult:
+        """Поиск кода на одном сайте (выполняется в пуле потоков HybridScraper)"""
+        result = self.scraper.scrape_product(code, site)
+        if result.status == ScrapingStatus.SUCCESS:
+            self._sources[(code, site)] = SOURCE_PRODUCT_PAGE
+            return result
+
+        # Блокировка сайта или остановка - страница поиска тоже не поможет
+        if (not self.search_pages or result.blocked or result.transient
+                or result.status == ScrapingStatus.STOPPED or self.scraper.is_stopped):
+            return result
+
+        search_result = self.scraper.scrape_search_page(code, site)
+        if search_result.status != ScrapingStatus.SUCCESS:
+            return result
+
+        self._sources[(code, site)] = SOURCE_SEARCH_PAGE
+        search_result.attempts += result.attempts
+        return search_result
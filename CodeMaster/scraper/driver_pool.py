@@ -0,0 +1,207 @@
+"""
+Пул экземпляров Chrome WebDriver
+Ограничивает число одновременно запущенных браузеров и переиспользует их между товарами.
+Браузер заменяется новым после заданного числа страниц или при превышении
+лимита памяти, а зависшие браузеры завершаются принудительно.
+"""
+
+import os
+import signal
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+from scraper.session_pool import SessionPool
+
+def call_with_timeout(func: Callable[[], Any], timeout: float) -> bool:
+    """
+    Вызов func в отдельном потоке. True, если вызов завершился без ошибки
+    за timeout секунд (зависший вызов остается в фоновом потоке).
+    """
+    outcome: List[bool] = []
+
+    def target():
+        try:
+            func()
+            outcome.append(True)
+        except Exception:
+            outcome.append(False)
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return bool(outcome and outcome[0])
+
+class WebDriverPool(SessionPool):
+    """Ограниченный пул WebDriver с проверкой работоспособности и заменой браузеров"""
+
+    def __init__(self, factory: Callable[[], Any], size: int = 1, max_pages: int = 0,
+                 max_memory_mb: int = 0, hang_timeout: float = 5.0,
+                 log_callback: Optional[Callable[[str, str], None]] = None):
+        super().__init__(factory, size)
+        # Лимиты до замены браузера (0 - без ограничения)
+        self.max_pages = max(0, max_pages)
+        self.max_memory_mb = max(0, max_memory_mb) if PSUTIL_AVAILABLE else 0
+        # Сколько ждать ответа браузера, прежде чем считать его зависшим
+        self.hang_timeout = hang_timeout
+        self.log_callback = log_callback
+
+        # Количество страниц, загруженных каждым браузером (по id)
+        self._pages: Dict[int, int] = {}
+
+        if max_memory_mb and not PSUTIL_AVAILABLE:
+            self._log("psutil не установлен - лимит памяти браузеров не применяется", "WARNING")
+
+    def _log(self, message: str, level: str = "INFO"):
+        if self.log_callback:
+            self.log_callback(message, level)
+
+    def prelaunch(self, count: Optional[int] = None) -> int:
+        """
+        Предварительный запуск браузеров (последовательно, по одному слоту за раз,
+        чтобы не задерживать потоки, которым браузер нужен прямо сейчас).
+        Возвращает количество запущенных браузеров.
+        """
+        count = self.size if count is None else min(count, self.size)
+        launched = 0
+
+        while self.created < count and not self._closed:
+            if not self._slots.acquire(blocking=False):
+                break
+
+            try:
+                if self.created >= count:
+                    break
+
+                driver = self.factory()
+                with self._lock:
+                    self._created += 1
+                self._idle.put(driver)
+                launched += 1
+            finally:
+                self._slots.release()
+
+        return launched
+
+    def release(self, driver: Any, recycle: bool = False, page_served: bool = False):
+        """
+        Возврат браузера в пул. При page_served=True учитывается загруженная
+        страница, и браузер заменяется, если достиг лимита страниц или памяти.
+        """
+        if page_served and not recycle:
+            reason = self._recycle_reason(driver)
+            if reason:
+                self._log(f"Замена браузера: {reason}", "DEBUG")
+                recycle = True
+        super().release(driver, recycle)
+
+    def _recycle_reason(self, driver: Any) -> Optional[str]:
+        """Причина замены браузера после очередной страницы или None"""
+        with self._lock:
+            pages = self._pages.get(id(driver), 0) + 1
+            self._pages[id(driver)] = pages
+
+        if self.max_pages and pages >= self.max_pages:
+            return f"загружено {pages} страниц"
+
+        if self.max_memory_mb:
+            memory_mb = self.memory_mb(driver)
+            if memory_mb >= self.max_memory_mb:
+                return f"используется {memory_mb:.0f} МБ памяти"
+
+        return None
+
+    def is_responsive(self, driver: Any) -> bool:
+        """Отвечает ли страница браузера за hang_timeout (зависший рендерер не отвечает)"""
+        return call_with_timeout(lambda: driver.execute_script("return 1"), self.hang_timeout)
+
+    def memory_mb(self, driver: Any) -> float:
+        """Суммарная память (RSS) процессов браузера и драйвера в МБ"""
+        total = 0
+        for process in self._processes(driver):
+            try:
+                total += process.memory_info().rss
+            except Exception:
+                continue
+        return total / (1024 * 1024)
+
+    @staticmethod
+    def _root_pids(driver: Any) -> List[int]:
+        """PID процесса chromedriver и самого браузера"""
+        pids = []
+        service_process = getattr(getattr(driver, 'service', None), 'process', None)
+        if service_process is not None and getattr(service_process, 'pid', None):
+            pids.append(service_process.pid)
+        # undetected-chromedriver запускает Chrome отдельно от chromedriver
+        browser_pid = getattr(driver, 'browser_pid', None)
+        if browser_pid:
+            pids.append(browser_pid)
+        return pids
+
+    def _processes(self, driver: Any) -> list:
+        """Процессы браузера вместе с дочерними (рендереры, GPU и т.д.)"""
+        if not PSUTIL_AVAILABLE:
+            return []
+
+        processes = {}
+        for pid in self._root_pids(driver):
+            try:
+                root = psutil.Process(pid)
+                processes[root.pid] = root
+                for child in root.children(recursive=True):
+                    processes[child.pid] = child
+            except psutil.Error:
+                continue
+        return list(processes.values())
+
+    def _is_reusable(self, driver: Any) -> bool:
+        """Браузер считается живым, если его страница отвечает на простую команду"""
+        return self.is_responsive(driver)
+
+    def _close_aborted(self, drivers: List[Any]):
+        """
+        Закрытие прерванных браузеров в фоновых потоках, по потоку на браузер:
+        abort() вызывается из потока интерфейса при остановке и не должен ждать,
+        пока каждый браузер завершится (до hang_timeout на браузер).
+        """
+        for driver in drivers:
+            threading.Thread(
+                target=self._close_session, args=(driver,),
+                name="webdriver-abort", daemon=True
+            ).start()
+
+    def _forget(self, driver: Any):
+        """Исключение браузера из учета пула вместе с его счетчиком страниц"""
+        with self._lock:
+            self._pages.pop(id(driver), None)
+        super()._forget(driver)
+
+    def _close_session(self, driver: Any):
+        """
+        Полное завершение процесса браузера. Если quit() не укладывается в
+        hang_timeout или процессы остались после него, они завершаются принудительно.
+        """
+        # Список процессов снимается до quit(), пока дерево процессов цело
+        processes = self._processes(driver)
+        root_pids = self._root_pids(driver)
+
+        if call_with_timeout(driver.quit, self.hang_timeout) and not processes:
+            return
+
+        if PSUTIL_AVAILABLE:
+            for process in processes:
+                try:
+                    process.kill()
+                except psutil.Error:
+                    continue
+        else:
+            for pid in root_pids:
+                try:
+                    os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+                except OSError:
+                    continue
@@ -0,0 +1,229 @@
+"""
+Декларативные правила извлечения данных товаров
+Для каждого сайта описываются поля, цепочки CSS селекторов (в порядке
+приоритета) и обработка значения. Правила один раз компилируются в план,
+который выполняется как на разобранном HTML документе, так и в живом WebDriver.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from scraper.base_scraper import BaseScraper, ProductInfo
+
+@dataclass(frozen=True)
+class FieldSpec:
+    """Правило извлечения одного поля ProductInfo"""
+    field: str                           # Имя поля ProductInfo
+    selectors: Tuple[str, ...]           # Селекторы в порядке приоритета
+    value: str = 'text'                  # 'text', 'price' или 'attr:<имя атрибута>'
+    require_digits: bool = False         # Перебирать все совпадения до первого с цифрами
+    default: Any = None                  # Значение, если ни один селектор не сработал
+
+@dataclass(frozen=True)
+class SiteSpec:
+    """Правила извлечения для сайта"""
+    site: str
+    fields: Tuple[FieldSpec, ...]
+    required_field: str = 'name'         # Без этого поля товар считается не найденным
+    ready_selectors: Tuple[str, ...] = ()  # Появление любого из них - страница в браузере готова
+
+# Правила сайтов (единственное место, где хранятся селекторы)
+SITE_SPECS: Dict[str, SiteSpec] = {
+    'rozetka': SiteSpec('rozetka', (
+        FieldSpec('name', (
+            "h1[data-testid='product-title']",
+            ".product-title",
+            "h1.product__title",
+            "h1"
+        )),
+        FieldSpec('price', (
+            "[data-testid='price'] .price__value",
+            ".price .price__value",
+            ".price-value",
+            ".product-price__big",
+            ".price"
+        ), value='price'),
+        FieldSpec('old_price', (".price__old", ".old-price"), value='price'),
+        FieldSpec('availability', (".status-label", ".availability-status")),
+        FieldSpec('image_url', (".product-photo img, .gallery img",), value='attr:src')
+    ), ready_selectors=("h1[data-testid='product-title']", ".product-title", "[data-testid='price']", ".price")),
+    'allo': SiteSpec('allo', (
+        FieldSpec('name', ("h1.p-view__title", ".product-title", "h1")),
+        FieldSpec('price', (".p-view__price .sum", ".price .sum", ".price-current"), value='price'),
+        FieldSpec('availability', (".p-view__status", ".availability"), default="В наличии")
+    ), ready_selectors=("h1.p-view__title", ".p-view__price", ".product-title", ".price")),
+    'comfy': SiteSpec('comfy', (
+        FieldSpec('name', (".product-title", "h1")),
+        FieldSpec('price', (".price-current", ".price"), value='price')
+    ), ready_selectors=(".product-title", ".price", "h1")),
+    'epicentr': SiteSpec('epicentr', (
+        FieldSpec('name', ("h1", ".product-title")),
+        FieldSpec('price', ("[class*='price']", ".price"), value='price', require_digits=True)
+    ), ready_selectors=("h1", ".product-title", "[class*='price']", ".price"))
+}
+
+# Выполнение плана в браузере: для каждого поля и каждого его селектора возвращает
+# текст (innerText, как WebElement.text) или атрибут первого подходящего элемента
+EXTRACT_SCRIPT = """
+    var fields = arguments[0];
+    var result = [];
+    for (var i = 0; i < fields.length; i++) {
+        var selectors = fields[i][0], attribute = fields[i][1], requireDigits = fields[i][2];
+        var values = [];
+        for (var j = 0; j < selectors.length; j++) {
+            var elements = requireDigits ? document.querySelectorAll(selectors[j])
+                                         : [document.querySelector(selectors[j])];
+            var value = null;
+            for (var k = 0; k < elements.length; k++) {
+                var element = elements[k];
+                if (!element) continue;
+                var raw;
+                if (attribute) {
+                    // Как WebElement.get_attribute: свойство (абсолютный URL), иначе атрибут
+                    raw = element[attribute];
+                    raw = (raw === undefined || raw === null) ? element.getAttribute(attribute) : String(raw);
+                } else {
+                    raw = element.innerText;
+                }
+                if (requireDigits && !/\\d/.test(raw || '')) continue;
+                value = raw;
+                break;
+            }
+            values.push(value);
+        }
+        result.push(values);
+    }
+    return result;
+"""
+
+class CompiledField:
+    """Поле плана: селекторы и готовая функция обработки значения"""
+
+    __slots__ = ('field', 'selectors', 'attribute', 'convert', 'require_digits', 'default')
+
+    def __init__(self, spec: FieldSpec):
+        self.field = spec.field
+        self.selectors = spec.selectors
+        self.require_digits = spec.require_digits
+        self.default = spec.default
+
+        # Разбор вида значения выполняется один раз, а не при каждом товаре
+        self.attribute: Optional[str] = None
+        if spec.value.startswith('attr:'):
+            self.attribute = spec.value[len('attr:'):]
+            self.convert: Callable[[str], Any] = lambda value: value or ''
+        elif spec.value == 'price':
+            self.convert = BaseScraper.parse_price
+        elif spec.value == 'text':
+            self.convert = BaseScraper.clean_text
+        else:
+            raise ValueError(f"Неизвестный вид значения поля {spec.field}: {spec.value}")
+
+    def accepts(self, raw: Optional[str]) -> bool:
+        """Подходит ли найденное значение (для перебора всех совпадений)"""
+        return not self.require_digits or bool(raw and any(char.isdigit() for char in raw))
+
+class ExtractionPlan:
+    """Скомпилированный план извлечения данных товара одного сайта"""
+
+    def __init__(self, spec: SiteSpec):
+        self.site = spec.site
+        self.required_field = spec.required_field
+        # По умолчанию страница готова, когда появилось обязательное поле
+        self.ready_selectors: Tuple[str, ...] = spec.ready_selectors or next(
+            (field.selectors for field in spec.fields if field.field == spec.required_field), ()
+        )
+        self.fields: Tuple[CompiledField, ...] = tuple(CompiledField(field) for field in spec.fields)
+        # Аргумент EXTRACT_SCRIPT: [селекторы, атрибут, нужны ли цифры] для каждого поля
+        self.script_fields: List[list] = [
+            [list(field.selectors), field.attribute, field.require_digits] for field in self.fields
+        ]
+
+    def _build(self, product_id: str, url: str, values: Dict[str, Any]) -> Optional[ProductInfo]:
+        """Создание ProductInfo; None, если обязательное поле не найдено"""
+        if not values.get(self.required_field):
+            return None
+        return ProductInfo(id=product_id, url=url, site=self.site, **values)
+
+    def _extract(self, product_id: str, url: str,
+                 query: Callable[[CompiledField, str], Any],
+                 read: Callable[[Any, Optional[str]], Optional[str]]) -> Optional[ProductInfo]:
+        """
+        Выполнение плана. query(field, selector) возвращает найденные элементы,
+        read(element, attribute) - текст элемента или значение атрибута.
+        """
+        values = {}
+        for field in self.fields:
+            value = field.default
+            for selector in field.selectors:
+                found = False
+                for element in query(field, selector):
+                    raw = read(element, field.attribute)
+                    if field.accepts(raw):
+                        value = field.convert(raw)
+                        found = True
+                        break
+                if found and (value or not field.require_digits):
+                    break
+            if value is not None:
+                values[field.field] = value
+
+        return self._build(product_id, url, values)
+
+    def extract_document(self, document, product_id: str, url: str) -> Optional[ProductInfo]:
+        """Извлечение из разобранного HTML (любой движок из html_backends)"""
+        def query(field: CompiledField, selector: str):
+            if field.require_digits:
+                return document.select(selector)
+            element = document.select_one(selector)
+            return (element,) if element is not None else ()
+
+        def read(element, attribute: Optional[str]) -> Optional[str]:
+            return element.get(attribute) if attribute else element.get_text()
+
+        return self._extract(product_id, url, query, read)
+
+    def extract_webdriver(self, driver, product_id: str, url: str) -> Optional[ProductInfo]:
+        """
+        Извлечение со страницы, открытой в браузере.
+        Весь план выполняется в браузере одним execute_script (один запрос к WebDriver
+        вместо запроса на каждый селектор, без неявных ожиданий при промахах).
+        """
+        raw_values = driver.execute_script(EXTRACT_SCRIPT, self.script_fields) or []
+        candidates = {}
+        for field, field_values in zip(self.fields, raw_values):
+            for selector, raw in zip(field.selectors, field_values or []):
+                candidates[(field.field, selector)] = raw
+
+        def query(field: CompiledField, selector: str):
+            raw = candidates.get((field.field, selector))
+            return (raw,) if raw is not None else ()
+
+        def read(raw: str, attribute: Optional[str]) -> Optional[str]:
+            return raw
+
+        return self._extract(product_id, url, query, read)
+
+def _compile_plans() -> Dict[str, ExtractionPlan]:
+    """Компиляция правил всех сайтов при импорте модуля"""
+    return {site: ExtractionPlan(spec) for site, spec in SITE_SPECS.items()}
+
+PLANS: Dict[str, ExtractionPlan] = _compile_plans()
+
+def get_plan(site: str) -> Optional[ExtractionPlan]:
+    """План извлечения для сайта"""
+    return PLANS.get(site.lower())
+
+def primary_selectors(site: str) -> Dict[str, str]:
+    """Основные (первые в цепочке) селекторы полей сайта"""
+    spec = SITE_SPECS.get(site.lower())
+    if spec is None:
+        return {}
+    return {field.field: field.selectors[0] for field in spec.fields}
+
+def selector_chains(site: str) -> Dict[str, List[str]]:
+    """Полные цепочки селекторов полей сайта"""
+    spec = SITE_SPECS.get(site.lower())
+    if spec is None:
+        return {}
+    return {field.field: list(field.selectors) for field in spec.fields}
@@ -0,0 +1,177 @@
+"""
+Сменные движки разбора HTML
+Все движки предоставляют одинаковый минимальный интерфейс, которым пользуются
+парсеры сайтов: select_one / select по CSS селектору, get_text() и get(attr)
+"""
+
+from functools import lru_cache
+from typing import Any, List, Optional, Protocol
+
+try:
+    from bs4 import BeautifulSoup
+    BS4_AVAILABLE = True
+except ImportError:
+    BS4_AVAILABLE = False
+
+try:
+    import lxml.html
+    from lxml.cssselect import CSSSelector
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    # Начиная с selectolax 1.0 поддерживается только движок Lexbor
+    from selectolax.lexbor import LexborHTMLParser as SelectolaxParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as SelectolaxParser
+        SELECTOLAX_AVAILABLE = True
+    except ImportError:
+        SELECTOLAX_AVAILABLE = False
+
+# Движки в порядке предпочтения для режима 'auto' (от быстрого к медленному)
+BACKENDS = ('selectolax', 'lxml', 'html.parser')
+
+# Элементы, текст которых BeautifulSoup не включает в get_text() родителя
+NON_TEXT_TAGS = ('script', 'style', 'template')
+NON_TEXT_SELECTOR = ', '.join(NON_TEXT_TAGS)
+
+class HtmlElement(Protocol):
+    """Элемент документа"""
+
+    def get_text(self) -> str: ...
+
+    def get(self, attr: str, default: Any = None) -> Any: ...
+
+class HtmlDocument(Protocol):
+    """Разобранный документ"""
+
+    def select_one(self, selector: str) -> Optional[HtmlElement]: ...
+
+    def select(self, selector: str) -> List[HtmlElement]: ...
+
+class LxmlElement:
+    """Элемент lxml с интерфейсом BeautifulSoup"""
+
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    def get_text(self) -> str:
+        # Без вложенных script/style text_content() совпадает с BeautifulSoup
+        if not _lxml_selector(NON_TEXT_SELECTOR)(self.node):
+            return self.node.text_content()
+        return _lxml_text(self.node)
+
+    def get(self, attr: str, default: Any = None) -> Any:
+        return self.node.get(attr, default)
+
+class LxmlDocument:
+    """Документ lxml.html с CSS селекторами (cssselect)"""
+
+    def __init__(self, html_content: str):
+        try:
+            self.root = lxml.html.document_fromstring(html_content)
+        except ValueError:
+            # Строка с XML объявлением кодировки принимается только в байтах
+            self.root = lxml.html.document_fromstring(html_content.encode('utf-8'))
+
+    def select_one(self, selector: str) -> Optional[LxmlElement]:
+        nodes = _lxml_selector(selector)(self.root)
+        return LxmlElement(nodes[0]) if nodes else None
+
+    def select(self, selector: str) -> List[LxmlElement]:
+        return [LxmlElement(node) for node in _lxml_selector(selector)(self.root)]
+
+class SelectolaxElement:
+    """Элемент selectolax с интерфейсом BeautifulSoup"""
+
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        self.node = node
+
+    def get_text(self) -> str:
+        if self.node.css_first(NON_TEXT_SELECTOR) is None:
+            return self.node.text(deep=True)
+        return _selectolax_text(self.node)
+
+    def get(self, attr: str, default: Any = None) -> Any:
+        value = self.node.attributes.get(attr)
+        return default if value is None else value
+
+class SelectolaxDocument:
+    """Документ selectolax (C-парсер Lexbor)"""
+
+    def __init__(self, html_content: str):
+        self.tree = SelectolaxParser(html_content)
+
+    def select_one(self, selector: str) -> Optional[SelectolaxElement]:
+        node = self.tree.css_first(selector)
+        return SelectolaxElement(node) if node is not None else None
+
+    def select(self, selector: str) -> List[SelectolaxElement]:
+        return [SelectolaxElement(node) for node in self.tree.css(selector)]
+
+def _lxml_text(node) -> str:
+    """Текст элемента lxml без содержимого вложенных script/style/template и комментариев"""
+    parts = [node.text or '']
+    for child in node:
+        # У комментариев и инструкций tag - не строка
+        if isinstance(child.tag, str) and child.tag not in NON_TEXT_TAGS:
+            parts.append(_lxml_text(child))
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+def _selectolax_text(node) -> str:
+    """Текст элемента selectolax без содержимого вложенных script/style/template и комментариев"""
+    parts = []
+    for child in node.iter(include_text=True):
+        if child.tag == '-text':
+            parts.append(child.text(deep=False))
+        elif not child.tag.startswith('-') and child.tag not in NON_TEXT_TAGS:
+            parts.append(_selectolax_text(child))
+    return ''.join(parts)
+
+@lru_cache(maxsize=256)
+def _lxml_selector(selector: str) -> "CSSSelector":
+    """Скомпилированный селектор (компиляция в XPath дороже самого поиска)"""
+    return CSSSelector(selector)
+
+def is_available(backend: str) -> bool:
+    """Установлен ли движок"""
+    if backend == 'selectolax':
+        return SELECTOLAX_AVAILABLE
+    if backend == 'lxml':
+        return LXML_AVAILABLE
+    if backend == 'html.parser':
+        return BS4_AVAILABLE
+    return False
+
+def available_backends() -> List[str]:
+    """Список установленных движков"""
+    return [backend for backend in BACKENDS if is_available(backend)]
+
+def resolve_backend(backend: str = 'auto') -> str:
+    """
+    Выбор движка: 'auto' - самый быстрый из установленных;
+    неизвестный или не установленный движок заменяется на html.parser
+    """
+    backend = (backend or 'auto').lower()
+    if backend == 'auto':
+        available = available_backends()
+        return available[0] if available else 'html.parser'
+    if is_available(backend):
+        return backend
+    return 'html.parser'
+
+def parse_document(html_content: str, backend: str = 'html.parser') -> HtmlDocument:
+    """Разбор HTML выбранным движком"""
+    if backend == 'selectolax':
+        return SelectolaxDocument(html_content)
+    if backend == 'lxml':
+        return LxmlDocument(html_content)
+    return BeautifulSoup(html_content, 'html.parser')
@@ -0,0 +1,184 @@
+"""
+Парсинг HTML страниц товаров
+Не зависит от HTTP клиента, поэтому выполняется как в потоке загрузки,
+так и в отдельных процессах пула парсинга
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+
+from scraper.base_scraper import BaseScraper, ProductInfo
+from scraper.extraction import get_plan
+from scraper.html_backends import parse_document, resolve_backend
+from scraper.structured_data import extract_structured_product
+from utils.config import Config
+
+class HtmlProductParser:
+    """Извлечение данных товара из HTML страницы"""
+    
+    clean_text = staticmethod(BaseScraper.clean_text)
+    parse_price = staticmethod(BaseScraper.parse_price)
+    
+    def __init__(self, backend: str = 'auto', structured_data: bool = True):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        
+        # Движок разбора HTML: html.parser, lxml или selectolax
+        self.backend = resolve_backend(backend)
+        # Сначала искать JSON-LD / встроенное состояние, и только затем обходить DOM
+        self.structured_data = structured_data
+    
+    def _log(self, message: str, level: str = "INFO"):
+        """Логирование (в процессе пула доступен только стандартный логгер)"""
+        self.logger.log(getattr(logging, level.upper(), logging.INFO), message)
+    
+    def parse(self, product_id: str, site: str, url: str, html_content: str) -> Optional[ProductInfo]:
+        """Парсинг данных товара из HTML по скомпилированному плану сайта"""
+        plan = get_plan(site)
+        if plan is None:
+            return None
+        
+        structured = None
+        if self.structured_data:
+            try:
+                structured = extract_structured_product(html_content, product_id, plan.site, url)
+            except Exception as e:
+                self._log(f"Ошибка разбора структурированных данных {site}: {e}", "WARNING")
+            
+            if structured and structured.price is not None:
+                # Быстрый путь: DOM дерево не строится
+                return structured
+        
+        try:
+            soup = parse_document(html_content, self.backend)
+            product = plan.extract_document(soup, product_id, url)
+            
+        except Exception as e:
+            self._log(f"Ошибка парсинга данных {site}: {e}", "ERROR")
+            product = None
+        
+        if product is None or structured is None:
+            return product or structured
+        
+        # Незаполненные селекторами поля дополняются из структурированных данных
+        defaults = ProductInfo(id=product_id)
+        for field in ('price', 'old_price', 'availability', 'image_url', 'description'):
+            if getattr(product, field) == getattr(defaults, field):
+                setattr(product, field, getattr(structured, field))
+        return product
+
+
+# Парсеры текущего процесса по настройкам (создаются при первом вызове в процессе пула)
+_process_parsers: Dict[Tuple[str, bool], HtmlProductParser] = {}
+
+def parse_product_html(product_id: str, site: str, url: str, html_content: str,
+                       backend: str = 'auto', structured_data: bool = True) -> Optional[ProductInfo]:
+    """
+    Точка входа для процессов пула: на вход только HTML,
+    обратно возвращается компактный ProductInfo
+    """
+    key = (backend, structured_data)
+    parser = _process_parsers.get(key)
+    if parser is None:
+        parser = HtmlProductParser(backend, structured_data)
+        _process_parsers[key] = parser
+    return parser.parse(product_id, site, url, html_content)
+
+class ParsePool:
+    """
+    Пул процессов для CPU-емкого разбора HTML.
+    Потоки и корутины загрузки передают страницу в пул и не держат GIL
+    во время разбора, поэтому пропускная способность растет с числом ядер.
+    """
+    
+    _shared: Dict[int, "ParsePool"] = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+    
+    @classmethod
+    def shared(cls, max_workers: Optional[int] = None) -> "ParsePool":
+        """Общий пул процессов (переиспользуется между запусками скрейпинга)"""
+        with cls._shared_lock:
+            key = max_workers or 0
+            pool = cls._shared.get(key)
+            if pool is None:
+                pool = cls(max_workers)
+                cls._shared[key] = pool
+            return pool
+    
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["ParsePool"]:
+        """Пул из секции [advanced]; None, если парсинг выполняется в потоках"""
+        if not config.getboolean('advanced', 'parse_in_processes', True):
+            return None
+        return cls.shared(config.getint('advanced', 'parse_workers', 0) or None)
+    
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """
+        Ленивый запуск процессов. Пул создается из потока скрейпинга, пока другие
+        потоки держат блокировки (логирование, лимитер, пулы сессий), поэтому
+        процессы запускаются через spawn: fork скопировал бы захваченные
+        блокировки, и дочерний процесс мог бы зависнуть.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+    
+    def _reset(self, executor: ProcessPoolExecutor):
+        """Замена пула, процесс которого аварийно завершился"""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+        self.logger.warning("Пул процессов парсинга перезапущен после сбоя")
+    
+    def submit(self, product_id: str, site: str, url: str, html_content: str,
+               backend: str = 'auto', structured_data: bool = True) -> Future:
+        """Отправка страницы на разбор"""
+        return self._get_executor().submit(parse_product_html, product_id, site, url, html_content, backend, structured_data)
+    
+    def parse(self, product_id: str, site: str, url: str, html_content: str,
+              backend: str = 'auto', structured_data: bool = True) -> Optional[ProductInfo]:
+        """Разбор страницы в пуле (блокирует вызывающий поток без удержания GIL)"""
+        executor = self._get_executor()
+        try:
+            return executor.submit(parse_product_html, product_id, site, url, html_content, backend, structured_data).result()
+        except BrokenProcessPool:
+            self._reset(executor)
+            return parse_product_html(product_id, site, url, html_content, backend, structured_data)
+    
+    async def parse_async(self, product_id: str, site: str, url: str, html_content: str,
+                          backend: str = 'auto', structured_data: bool = True) -> Optional[ProductInfo]:
+        """Разбор страницы в пуле без блокировки event loop"""
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                executor, parse_product_html, product_id, site, url, html_content, backend, structured_data
+            )
+        except BrokenProcessPool:
+            self._reset(executor)
+            return await loop.run_in_executor(
+                None, parse_product_html, product_id, site, url, html_content, backend, structured_data
+            )
+    
+    def shutdown(self):
+        """Остановка процессов пула"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
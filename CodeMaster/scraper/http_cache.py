@@ -0,0 +1,215 @@
+"""
+Дисковый кэш HTTP ответов
+Страницы хранятся по sha256 от URL, устаревшие записи перепроверяются
+условными запросами (ETag / Last-Modified)
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Dict, Mapping, Optional
+
+from utils.config import Config
+
+@dataclass
+class CacheEntry:
+    """Запись кэша"""
+    url: str
+    body: str
+    stored_at: float
+    etag: str = ""
+    last_modified: str = ""
+
+    def age(self) -> float:
+        """Возраст записи в секундах"""
+        return time.time() - self.stored_at
+
+class HttpCache:
+    """Потокобезопасный кэш страниц с TTL и ограничением размера"""
+
+    BODY_SUFFIX = '.html.gz'
+    META_SUFFIX = '.json'
+
+    def __init__(self, directory: str = 'cache', ttl: int = 3600, max_size_mb: int = 500):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        self.max_size = max(1, max_size_mb) * 1024 * 1024
+
+        self._lock = threading.Lock()
+        self._total_size: Optional[int] = None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["HttpCache"]:
+        """Создание кэша из секции [advanced]; None, если кэш выключен"""
+        if not config.getboolean('advanced', 'cache_enabled', False):
+            return None
+
+        return cls(
+            directory=config.get('advanced', 'cache_directory', 'cache'),
+            ttl=config.getint('advanced', 'cache_ttl', 3600),
+            max_size_mb=config.getint('advanced', 'cache_max_size_mb', 500)
+        )
+
+    def _paths(self, url: str):
+        """Пути файлов тела и метаданных для URL"""
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = self.directory / key[:2] / key
+        return base.with_name(key + self.BODY_SUFFIX), base.with_name(key + self.META_SUFFIX)
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Получение записи (в том числе устаревшей - для перепроверки)"""
+        body_path, meta_path = self._paths(url)
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with gzip.open(body_path, 'rt', encoding='utf-8') as f:
+                body = f.read()
+        except (OSError, ValueError, EOFError):
+            return None
+
+        # Время доступа используется для вытеснения давно не читавшихся записей
+        try:
+            os.utime(body_path)
+        except OSError:
+            pass
+
+        return CacheEntry(
+            url=url,
+            body=body,
+            stored_at=meta.get('stored_at', 0.0),
+            etag=meta.get('etag', ''),
+            last_modified=meta.get('last_modified', '')
+        )
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Запись не старше TTL"""
+        return entry.age() < self.ttl
+
+    def conditional_headers(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """Заголовки условного запроса для перепроверки записи"""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, url: str, body: str, headers: Optional[Mapping[str, str]] = None) -> bool:
+        """Сохранение успешного ответа; ошибки диска не прерывают скрейпинг"""
+        headers = headers or {}
+        body_path, meta_path = self._paths(url)
+
+        old_size = self._file_size(body_path)
+        data = gzip.compress(body.encode('utf-8'))
+
+        try:
+            body_path.parent.mkdir(exist_ok=True)
+            self._write_atomic(body_path, data)
+            self._write_meta(meta_path, url, headers.get('ETag', ''), headers.get('Last-Modified', ''))
+        except OSError:
+            return False
+
+        with self._lock:
+            if self._total_size is not None:
+                self._total_size += len(data) - old_size
+
+        self._evict_if_needed()
+        return True
+
+    def refresh(self, url: str, entry: CacheEntry, headers: Optional[Mapping[str, str]] = None):
+        """Продление записи после ответа 304 Not Modified"""
+        headers = headers or {}
+        _, meta_path = self._paths(url)
+
+        entry.stored_at = time.time()
+        entry.etag = headers.get('ETag', entry.etag)
+        entry.last_modified = headers.get('Last-Modified', entry.last_modified)
+
+        try:
+            self._write_meta(meta_path, url, entry.etag, entry.last_modified)
+        except OSError:
+            pass
+
+    def clear(self):
+        """Удаление всех записей"""
+        with self._lock:
+            for path in self.directory.glob('*/*'):
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+            self._total_size = 0
+
+    def _write_meta(self, meta_path: Path, url: str, etag: str, last_modified: str):
+        """Запись метаданных"""
+        meta = {
+            'url': url,
+            'stored_at': time.time(),
+            'etag': etag,
+            'last_modified': last_modified
+        }
+        self._write_atomic(meta_path, json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+
+    def _write_atomic(self, path: Path, data: bytes):
+        """Запись через временный файл, чтобы читатели не видели неполных данных"""
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def _file_size(self, path: Path) -> int:
+        """Размер файла или 0, если его нет"""
+        try:
+            return path.stat().st_size
+        except OSError:
+            return 0
+
+    def _evict_if_needed(self):
+        """Удаление давно не использовавшихся записей при превышении размера"""
+        with self._lock:
+            if self._total_size is None:
+                self._total_size = sum(
+                    self._file_size(path) for path in self.directory.glob('*/*' + self.BODY_SUFFIX)
+                )
+
+            if self._total_size <= self.max_size:
+                return
+
+            entries = []
+            for body_path in self.directory.glob('*/*' + self.BODY_SUFFIX):
+                try:
+                    stat = body_path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, body_path))
+
+            # Освобождаем место с запасом, чтобы не запускать вытеснение на каждой записи
+            target = self.max_size * 0.9
+            for _, size, body_path in sorted(entries):
+                if self._total_size <= target:
+                    break
+
+                meta_path = body_path.with_name(body_path.name[:-len(self.BODY_SUFFIX)] + self.META_SUFFIX)
+                for path in (body_path, meta_path):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+                self._total_size -= size
@@ -0,0 +1,160 @@
+"""
+Адаптивный выбор метода скрейпинга для каждого сайта
+Учитывает наблюдаемую успешность и время ответа методов и сохраняет
+накопленную статистику между запусками
+"""
+
+import os
+import json
+import random
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from scraper.base_scraper import ScrapingMethod, ScrapingResult, ScrapingStatus
+from utils.config import Config
+
+class MethodStats:
+    """Скользящие (EWMA) оценки успешности и времени ответа метода на сайте"""
+
+    def __init__(self, samples: int = 0, success_rate: float = 0.5, latency: float = 0.0):
+        self.samples = samples
+        self.success_rate = success_rate
+        self.latency = latency
+
+    def update(self, success: bool, response_time: float, alpha: float):
+        """Учет очередной попытки"""
+        if self.samples == 0:
+            self.success_rate = 1.0 if success else 0.0
+            self.latency = response_time
+        else:
+            self.success_rate += alpha * ((1.0 if success else 0.0) - self.success_rate)
+            self.latency += alpha * (response_time - self.latency)
+        self.samples += 1
+
+    def expected_cost(self) -> float:
+        """Ожидаемое время до успешного результата (сек)"""
+        return max(self.latency, 0.01) / max(self.success_rate, 0.05)
+
+    def to_dict(self) -> Dict:
+        return {
+            'samples': self.samples,
+            'success_rate': round(self.success_rate, 4),
+            'latency': round(self.latency, 3)
+        }
+
+class MethodRouter:
+    """Маршрутизатор методов по сайтам с редкими пробными запросами"""
+
+    # Минимум попыток каждого метода, после которого порядок может измениться
+    MIN_SAMPLES = 5
+
+    def __init__(self, state_file: Optional[str] = None, probe_rate: float = 0.05,
+                 alpha: float = 0.1):
+        self.state_file = Path(state_file) if state_file else None
+        self.probe_rate = probe_rate
+        self.alpha = alpha
+
+        self._stats: Dict[str, Dict[ScrapingMethod, MethodStats]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+
+        self.load()
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["MethodRouter"]:
+        """Создание маршрутизатора из секции [advanced]; None, если выключен"""
+        if not config.getboolean('advanced', 'adaptive_routing', True):
+            return None
+
+        return cls(
+            state_file=config.get('advanced', 'routing_state_file', 'method_routing.json'),
+            probe_rate=config.getfloat('advanced', 'routing_probe_rate', 0.05)
+        )
+
+    def order(self, site: str, methods: List[ScrapingMethod]) -> List[ScrapingMethod]:
+        """
+        Порядок попыток методов для сайта.
+        methods - порядок по настройкам; он сохраняется, пока статистики мало.
+        """
+        if len(methods) < 2:
+            return list(methods)
+
+        with self._lock:
+            site_stats = self._stats.get(site.lower(), {})
+            known = [site_stats.get(method) for method in methods]
+
+            if all(stats is not None and stats.samples >= self.MIN_SAMPLES for stats in known):
+                ordered = [method for _, method in sorted(
+                    zip(known, methods), key=lambda item: item[0].expected_cost()
+                )]
+            else:
+                ordered = list(methods)
+
+        # Изредка пробуем отодвинутый метод, чтобы заметить изменения на сайте
+        if random.random() < self.probe_rate:
+            ordered[0], ordered[1] = ordered[1], ordered[0]
+
+        return ordered
+
+    def record(self, site: str, method: ScrapingMethod, result: ScrapingResult):
+        """Учет результата попытки (остановленные попытки не учитываются)"""
+        if result.status == ScrapingStatus.STOPPED:
+            return
+
+        with self._lock:
+            stats = self._stats.setdefault(site.lower(), {}).setdefault(method, MethodStats())
+            stats.update(result.status == ScrapingStatus.SUCCESS, result.response_time, self.alpha)
+            self._dirty = True
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        """Текущая статистика по сайтам и методам"""
+        with self._lock:
+            return {
+                site: {method.value: stats.to_dict() for method, stats in site_stats.items()}
+                for site, site_stats in self._stats.items()
+            }
+
+    def load(self):
+        """Загрузка статистики прошлых запусков"""
+        if not self.state_file or not self.state_file.exists():
+            return
+
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+
+            with self._lock:
+                for site, site_stats in data.items():
+                    for method_value, values in site_stats.items():
+                        try:
+                            method = ScrapingMethod(method_value)
+                        except ValueError:
+                            continue
+                        self._stats.setdefault(site, {})[method] = MethodStats(
+                            samples=int(values.get('samples', 0)),
+                            success_rate=float(values.get('success_rate', 0.5)),
+                            latency=float(values.get('latency', 0.0))
+                        )
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Ошибка загрузки статистики методов: {e}")
+
+    def save(self) -> bool:
+        """Сохранение статистики (атомарная замена файла)"""
+        if not self.state_file or not self._dirty:
+            return False
+
+        data = self.snapshot()
+        try:
+            directory = self.state_file.parent
+            directory.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_file)
+            self._dirty = False
+            return True
+        except OSError as e:
+            print(f"Ошибка сохранения статистики методов: {e}")
+            return False
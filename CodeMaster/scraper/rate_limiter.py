@@ -0,0 +1,122 @@
+"""
+Ограничение частоты запросов к сайтам (token bucket)
+Общий лимитер для всех потоков, работающих с одним сайтом
+"""
+
+import time
+import asyncio
+import threading
+from typing import Dict, Optional, Tuple
+
+from utils.config import Config
+
+SUPPORTED_SITES = ('rozetka', 'allo', 'comfy', 'epicentr')
+
+class TokenBucket:
+    """Потокобезопасное ведро токенов"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = max(rate, 0.001)
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Пополнение токенов за прошедшее время"""
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def try_acquire(self) -> float:
+        """
+        Попытка забрать токен без ожидания.
+        Возвращает 0.0 при успехе, иначе время (сек) до появления токена.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+    def peek(self) -> float:
+        """Время (сек) до появления свободного токена, без его расхода"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1.0:
+                return 0.0
+            return (1.0 - self._tokens) / self.rate
+
+class SiteRateLimiter:
+    """Набор token bucket по сайтам"""
+
+    def __init__(self, default_rate: float = 1.0, default_burst: int = 2,
+                 site_limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self._site_limits = {site.lower(): limits for site, limits in (site_limits or {}).items()}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Config) -> "SiteRateLimiter":
+        """Создание лимитера из секций [scraping] и [sites]"""
+        default_rate = config.getfloat('scraping', 'requests_per_second', 1.0)
+        default_burst = config.getint('scraping', 'burst', 2)
+
+        site_limits = {}
+        for site in SUPPORTED_SITES:
+            site_limits[site] = (
+                config.getfloat('sites', f'{site}_requests_per_second', default_rate),
+                config.getint('sites', f'{site}_burst', default_burst)
+            )
+
+        return cls(default_rate, default_burst, site_limits)
+
+    def _bucket(self, site: str) -> TokenBucket:
+        """Получение (или создание) bucket для сайта"""
+        site = site.lower()
+        with self._lock:
+            bucket = self._buckets.get(site)
+            if bucket is None:
+                rate, burst = self._site_limits.get(site, (self.default_rate, self.default_burst))
+                bucket = TokenBucket(rate, burst)
+                self._buckets[site] = bucket
+            return bucket
+
+    def try_acquire(self, site: str) -> float:
+        """Неблокирующая попытка получить разрешение на запрос к сайту"""
+        return self._bucket(site).try_acquire()
+
+    def peek(self, site: str) -> float:
+        """Время до готовности сайта принять следующий запрос"""
+        return self._bucket(site).peek()
+
+    def acquire(self, site: str, stop_event: Optional[threading.Event] = None) -> bool:
+        """
+        Ожидание разрешения на запрос к сайту.
+        Возвращает False, если ожидание прервано сигналом остановки.
+        """
+        while True:
+            wait_time = self.try_acquire(site)
+            if wait_time <= 0:
+                return True
+
+            if stop_event is not None:
+                if stop_event.wait(wait_time):
+                    return False
+            else:
+                time.sleep(wait_time)
+
+    async def acquire_async(self, site: str, stop_event: Optional[threading.Event] = None) -> bool:
+        """Асинхронное ожидание разрешения на запрос к сайту"""
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return False
+
+            wait_time = self.try_acquire(site)
+            if wait_time <= 0:
+                return True
+            await asyncio.sleep(wait_time)
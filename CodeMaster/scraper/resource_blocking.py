@@ -0,0 +1,115 @@
+"""
+Блокировка ненужных ресурсов при загрузке страниц в браузере
+Изображения, шрифты, медиа и счетчики аналитики не нужны для извлечения
+данных, поэтому их загрузка запрещается через DevTools протокол
+(Network.setBlockedURLs). Для каждого сайта можно разрешить ресурсы,
+без которых страница не отрисовывается.
+"""
+
+import threading
+import weakref
+from typing import Dict, Iterable, List, Optional
+
+from utils.config import Config
+
+# Шаблоны URL по типам ресурсов (* - любая последовательность символов)
+RESOURCE_TYPE_PATTERNS: Dict[str, tuple] = {
+    'image': ('*.jpg*', '*.jpeg*', '*.png*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*'),
+    'font': ('*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'),
+    'media': ('*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*', '*.ogg*'),
+    'stylesheet': ('*.css*',)
+}
+
+# Аналитика, реклама и счетчики
+TRACKER_PATTERNS = (
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*googlesyndication.com*',
+    '*googleadservices.com*',
+    '*connect.facebook.net*',
+    '*analytics.tiktok.com*',
+    '*hotjar.com*',
+    '*clarity.ms*',
+    '*criteo.com*',
+    '*criteo.net*',
+    '*bat.bing.com*'
+)
+
+class ResourceBlocker:
+    """Набор блокируемых шаблонов URL с исключениями по сайтам"""
+
+    def __init__(self, resource_types: Iterable[str] = ('image', 'font', 'media'),
+                 block_trackers: bool = True, extra_patterns: Iterable[str] = (),
+                 allowlists: Optional[Dict[str, List[str]]] = None):
+        self.resource_types = [t for t in resource_types if t in RESOURCE_TYPE_PATTERNS]
+
+        patterns: List[str] = []
+        for resource_type in self.resource_types:
+            patterns.extend(RESOURCE_TYPE_PATTERNS[resource_type])
+        if block_trackers:
+            patterns.extend(TRACKER_PATTERNS)
+        patterns.extend(extra_patterns)
+        # Порядок сохраняется, повторы удаляются
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+
+        self.allowlists = {site.lower(): list(items) for site, items in (allowlists or {}).items()}
+        self._site_patterns: Dict[str, List[str]] = {}
+
+        # Шаблоны, уже примененные в каждом браузере
+        self._applied = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional["ResourceBlocker"]:
+        """Создание из настроек; None, если блокировать нечего"""
+        resource_types = config.getlist('advanced', 'block_resource_types', ['font', 'media'])
+        if config.getboolean('scraping', 'disable_images', True):
+            resource_types = ['image'] + resource_types
+
+        blocker = cls(
+            resource_types=resource_types,
+            block_trackers=config.getboolean('advanced', 'block_trackers', True),
+            extra_patterns=config.getlist('advanced', 'block_url_patterns', []),
+            allowlists=config.getdict('advanced', 'resource_allowlist', {})
+        )
+        return blocker if blocker.patterns else None
+
+    @property
+    def blocks_images(self) -> bool:
+        return 'image' in self.resource_types
+
+    def patterns_for(self, site: Optional[str]) -> List[str]:
+        """
+        Блокируемые шаблоны для сайта. Элемент списка исключений сайта снимает
+        блокировку со всех шаблонов, в которые он входит (например,
+        "googletagmanager.com" или "*.css*").
+        """
+        key = (site or '').lower()
+        patterns = self._site_patterns.get(key)
+        if patterns is None:
+            allowed = self.allowlists.get(key, [])
+            patterns = [p for p in self.patterns if not any(item in p for item in allowed)]
+            self._site_patterns[key] = patterns
+        return patterns
+
+    def chrome_prefs(self) -> Dict[str, int]:
+        """Настройки профиля Chrome: запрет изображений на уровне браузера"""
+        if not self.blocks_images:
+            return {}
+        return {'profile.managed_default_content_settings.images': 2}
+
+    def enable(self, driver):
+        """Включение блокировки в новом браузере (шаблоны без исключений сайтов)"""
+        driver.execute_cdp_cmd('Network.enable', {})
+        self.apply(driver, None)
+
+    def apply(self, driver, site: Optional[str]):
+        """Применение шаблонов сайта перед загрузкой страницы (повторно не отправляются)"""
+        patterns = self.patterns_for(site)
+        with self._lock:
+            if self._applied.get(driver) == patterns:
+                return
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+        with self._lock:
+            self._applied[driver] = patterns
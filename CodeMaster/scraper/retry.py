@@ -0,0 +1,80 @@
+"""
+Политика повторных попыток
+Классифицирует ошибки на временные и окончательные и вычисляет задержку
+перед повтором (экспоненциальный рост со случайным разбросом, Retry-After)
+"""
+
+import time
+import random
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from scraper.base_scraper import ScrapingResult, ScrapingStatus
+from utils.config import Config
+
+# HTTP статусы, после которых запрос имеет смысл повторить
+RETRYABLE_STATUS_CODES = (408, 425, 429, 500, 502, 503, 504)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Разбор заголовка Retry-After (секунды или HTTP дата) в секунды ожидания"""
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if retry_at is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+class RetryPolicy:
+    """Решение о повторе и расчет задержки"""
+
+    def __init__(self, max_retries: int = 3, base_delay: float = 2.0,
+                 max_delay: float = 60.0, max_retry_after: float = 300.0):
+        self.max_retries = max(0, max_retries)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    @classmethod
+    def from_config(cls, config: Config) -> "RetryPolicy":
+        """Создание политики из секции [scraping]"""
+        return cls(
+            max_retries=config.getint('scraping', 'max_retries', 3),
+            base_delay=config.getfloat('scraping', 'retry_base_delay', 2.0),
+            max_delay=config.getfloat('scraping', 'retry_max_delay', 60.0),
+            max_retry_after=config.getfloat('scraping', 'retry_max_retry_after', 300.0)
+        )
+
+    def is_retryable(self, result: ScrapingResult) -> bool:
+        """Временная ли ошибка (сеть, таймаут, перегрузка сайта)"""
+        if result.status != ScrapingStatus.ERROR:
+            return False
+        if result.retry_after is not None and result.retry_after > self.max_retry_after:
+            # Сайт просит подождать дольше, чем имеет смысл держать товар в очереди
+            return False
+        return result.transient or result.http_status in RETRYABLE_STATUS_CODES
+
+    def next_delay(self, result: ScrapingResult, retry_number: int) -> Optional[float]:
+        """
+        Задержка (сек) перед повтором номер retry_number (с 1)
+        или None, если повторять не нужно.
+        """
+        if retry_number > self.max_retries or not self.is_retryable(result):
+            return None
+
+        # Экспоненциальный рост с разбросом, чтобы повторы не приходили пачкой
+        delay = min(self.max_delay, self.base_delay * (2 ** (retry_number - 1)))
+        delay = random.uniform(delay / 2, delay)
+
+        if result.retry_after is not None:
+            delay = max(delay, result.retry_after)
+        return delay
@@ -3,13 +3,11 @@ Selenium скрейпер с поддержкой JavaScript и обходом 
 """
 
 import time
-import random
 import os
-from typing import Optional, Dict, List
+import threading
+import weakref
+from typing import Optional, Dict, List, Mapping
 from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import (
@@ -20,23 +18,103 @@ import undetected_chromedriver as uc
 from webdriver_manager.chrome import ChromeDriverManager
 
 from scraper.base_scraper import BaseScraper, ScrapingResult, ScrapingStatus, ScrapingMethod, ProductInfo
+from scraper.driver_pool import WebDriverPool
+from scraper.extraction import get_plan
+from scraper.block_detector import BlockDetector, BlockVerdict
+from scraper.resource_blocking import ResourceBlocker
+from scraper.clearance import ClearanceStore, is_clearance_cookie
+from utils.config import Config
+
+class PageBlockedError(Exception):
+    """Сайт показал страницу защиты или капчу вместо товара"""
+    
+    def __init__(self, verdict: BlockVerdict):
+        super().__init__(verdict.describe())
+        self.verdict = verdict
 
 class SeleniumScraper(BaseScraper):
     """Selenium скрейпер с undetected-chromedriver"""
     
-    def __init__(self, headless: bool = True, **kwargs):
+    # Заголовок, начало head и body и общий размер страницы для проверки на блокировку
+    BLOCK_CHECK_SCRIPT = """
+        var head = document.head ? document.head.outerHTML : '';
+        var body = document.body ? document.body.outerHTML : '';
+        return [document.title || '', head.slice(0, arguments[0]),
+                body.slice(0, arguments[1]), head.length + body.length];
+    """
+    
+    # Первый найденный селектор готовности и document.readyState
+    READY_CHECK_SCRIPT = """
+        var selectors = arguments[0];
+        for (var i = 0; i < selectors.length; i++) {
+            if (document.querySelector(selectors[i])) return [selectors[i], document.readyState];
+        }
+        return [null, document.readyState];
+    """
+    
+    # Период опроса готовности страницы (сек)
+    READY_POLL_INTERVAL = 0.1
+    
+    def __init__(self, headless: bool = True, pool_size: int = 1, page_load_timeout: int = 30,
+                 element_wait_timeout: int = 10, resource_blocker: Optional[ResourceBlocker] = None,
+                 max_pages_per_driver: int = 0, max_driver_memory_mb: int = 0,
+                 hang_timeout: float = 5.0, clearance_store: Optional[ClearanceStore] = None,
+                 **kwargs):
         super().__init__(**kwargs)
         self.headless = headless
-        self.driver = None
-        self.wait = None
+        # Блокировка изображений, шрифтов и счетчиков через DevTools протокол
+        self.resource_blocker = resource_blocker
+        
+        # Пул браузеров: каждый поток работает со своим экземпляром Chrome.
+        # Браузеры заменяются после max_pages_per_driver страниц или при превышении
+        # лимита памяти, чтобы долгие прогоны не накапливали память Chrome
+        self.driver_pool = WebDriverPool(
+            self._create_driver, pool_size,
+            max_pages=max_pages_per_driver,
+            max_memory_mb=max_driver_memory_mb,
+            hang_timeout=hang_timeout,
+            log_callback=self._log
+        )
+        # undetected-chromedriver патчит общий бинарник драйвера, поэтому
+        # браузеры запускаются строго по очереди
+        self._launch_lock = threading.Lock()
         
         # Настройки ожидания
-        self.page_load_timeout = 30
-        self.element_wait_timeout = 10
+        self.page_load_timeout = page_load_timeout
+        self.element_wait_timeout = element_wait_timeout
         self.js_wait_timeout = 5
+        
+        self.block_detector = BlockDetector()
+        
+        # Cookies допуска, полученные после прохождения защиты, передаются HTTP скрейперам,
+        # а сохраненные в прошлых запусках - загружаются в браузеры
+        self.clearance_store = clearance_store
+        # Версии допусков, уже находящиеся в каждом браузере (по сайтам)
+        self._driver_clearances = weakref.WeakKeyDictionary()
+        self._clearance_lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config: Config, headless: bool = True, **kwargs) -> "SeleniumScraper":
+        """Создание скрейпера с пулом, таймаутами и блокировкой ресурсов из настроек"""
+        return cls(
+            headless=headless,
+            pool_size=config.getint('advanced', 'selenium_pool_size', 2),
+            page_load_timeout=config.getint('scraping', 'page_timeout', 30),
+            element_wait_timeout=config.getint('scraping', 'element_timeout', 10),
+            resource_blocker=ResourceBlocker.from_config(config),
+            max_pages_per_driver=config.getint('advanced', 'driver_max_pages', 200),
+            max_driver_memory_mb=config.getint('advanced', 'driver_max_memory_mb', 1500),
+            hang_timeout=config.getfloat('advanced', 'driver_hang_timeout', 5.0),
+            **kwargs
+        )
     
-    def _setup_driver(self) -> bool:
-        """Настройка Chrome WebDriver"""
+    def _create_driver(self) -> uc.Chrome:
+        """Создание и настройка Chrome WebDriver"""
+        with self._launch_lock:
+            return self._launch_driver()
+    
+    def _launch_driver(self) -> uc.Chrome:
+        """Запуск Chrome с опциями обхода детекции"""
         try:
             self._log("Настройка Chrome WebDriver...")
             
@@ -56,12 +134,16 @@ class SeleniumScraper(BaseScraper):
             # Дополнительные опции для стабильности
             options.add_argument("--disable-extensions")
             options.add_argument("--disable-plugins")
-            options.add_argument("--disable-images")
             options.add_argument("--disable-javascript-harmony-shipping")
             options.add_argument("--disable-background-timer-throttling")
             options.add_argument("--disable-renderer-backgrounding")
             options.add_argument("--disable-backgrounding-occluded-windows")
             
+            # Флаг --disable-images не действует в новом headless режиме,
+            # изображения запрещаются настройкой профиля
+            if self.resource_blocker is not None and self.resource_blocker.chrome_prefs():
+                options.add_experimental_option("prefs", self.resource_blocker.chrome_prefs())
+            
             # Размер окна
             options.add_argument("--window-size=1920,1080")
             
@@ -69,36 +151,107 @@ class SeleniumScraper(BaseScraper):
             options.add_argument(f"--user-agent={self.get_random_user_agent()}")
             
             # Создание драйвера
-            self.driver = uc.Chrome(options=options, version_main=None)
+            driver = uc.Chrome(options=options, version_main=None)
             
             # Настройка таймаутов
-            self.driver.set_page_load_timeout(self.page_load_timeout)
-            self.driver.implicitly_wait(2)
+            driver.set_page_load_timeout(self.page_load_timeout)
+            # Готовность страницы ожидается явно (_wait_for_page_load), а извлечение
+            # выполняется одним скриптом - неявное ожидание только замедляло бы промахи
+            driver.implicitly_wait(0)
             
-            # Создание объекта ожидания
-            self.wait = WebDriverWait(self.driver, self.element_wait_timeout)
+            if self.resource_blocker is not None:
+                try:
+                    self.resource_blocker.enable(driver)
+                except Exception as e:
+                    self._log(f"Блокировка ресурсов недоступна: {e}", "WARNING")
             
             # Выполнение JavaScript для обхода детекции
-            self.driver.execute_script("""
+            driver.execute_script("""
                 Object.defineProperty(navigator, 'webdriver', {
                     get: () => undefined,
                 });
             """)
             
             self._log("Chrome WebDriver успешно настроен")
-            return True
+            return driver
             
         except Exception as e:
             self._log(f"Ошибка настройки WebDriver: {e}", "ERROR")
-            return False
+            raise
+    
+    def prelaunch(self, count: Optional[int] = None) -> int:
+        """Предварительный запуск браузеров пула"""
+        try:
+            return self.driver_pool.prelaunch(count)
+        except Exception as e:
+            self._log(f"Ошибка предварительного запуска браузеров: {e}", "WARNING")
+            return 0
+    
+    def warm_up(self, start_urls: Optional[Mapping[str, str]] = None, count: Optional[int] = None) -> int:
+        """
+        Фоновый прогрев: запуск браузеров пула и открытие стартовых страниц сайтов
+        (start_urls: сайт -> URL), чтобы первый товар не ждал запуска Chrome,
+        DNS и TLS соединений. Занятые браузеры не трогаются.
+        Возвращает количество запущенных браузеров.
+        """
+        launched = self.prelaunch(count)
+        if not start_urls or self.is_stopped:
+            return launched
+        
+        # Все свободные браузеры берутся сразу, чтобы каждый открыл свой сайт
+        drivers = []
+        while len(drivers) < self.driver_pool.created:
+            try:
+                drivers.append(self.driver_pool.checkout(timeout=0))
+            except Exception:
+                break
+        
+        sites = list(start_urls.items())
+        for index, driver in enumerate(drivers):
+            recycle = False
+            try:
+                if self.is_stopped:
+                    continue
+                site, url = sites[index % len(sites)]
+                if self.resource_blocker is not None:
+                    self.resource_blocker.apply(driver, site)
+                driver.get(url)
+                self._log(f"Браузер прогрет: {url}", "DEBUG")
+            except WebDriverException as e:
+                recycle = True
+                self._log(f"Ошибка прогрева браузера: {e}", "WARNING")
+            finally:
+                self.driver_pool.release(driver, recycle=recycle, page_served=not recycle)
+        
+        return launched
+    
+    def close(self):
+        """Закрытие всех браузеров"""
+        self._close_driver()
+    
+    def _checkout_driver(self):
+        """
+        Получение браузера из пула с периодической проверкой сигнала остановки.
+        Возвращает None, если скрейпинг остановлен.
+        """
+        while not self.is_stopped:
+            try:
+                return self.driver_pool.checkout(timeout=0.5)
+            except TimeoutError:
+                continue
+        return None
+    
+    def stop(self):
+        """Остановка: закрытие браузеров прерывает загрузку страниц"""
+        super().stop()
+        aborted = self.driver_pool.abort()
+        if aborted:
+            self._log(f"Прервана загрузка страниц в {aborted} браузерах", "WARNING")
     
     def _close_driver(self):
-        """Закрытие WebDriver"""
+        """Закрытие всех WebDriver пула"""
         try:
-            if self.driver:
-                self.driver.quit()
-                self.driver = None
-                self.wait = None
+            self.driver_pool.close()
         except Exception as e:
             self._log(f"Ошибка при закрытии WebDriver: {e}", "WARNING")
     
@@ -112,13 +265,11 @@ class SeleniumScraper(BaseScraper):
             result.error_message = "Некорректный ID товара"
             return result
         
+        driver = None
+        recycle_driver = False
+        page_served = False
+        
         try:
-            # Настройка драйвера если не настроен
-            if not self.driver and not self._setup_driver():
-                result.status = ScrapingStatus.ERROR
-                result.error_message = "Не удалось настроить WebDriver"
-                return result
-            
             # Получение URL товара
             product_url = self.format_product_url(product_id, site)
             if not product_url:
@@ -126,20 +277,49 @@ class SeleniumScraper(BaseScraper):
                 result.error_message = f"Неподдерживаемый сайт: {site}"
                 return result
             
+            if not self.wait_for_slot(site):
+                result.status = ScrapingStatus.STOPPED
+                return result
+            
+            # Браузер из пула (ожидание, если все браузеры заняты)
+            try:
+                driver = self._checkout_driver()
+            except Exception:
+                result.status = ScrapingStatus.ERROR
+                result.error_message = "Не удалось настроить WebDriver"
+                return result
+            
+            if driver is None:
+                result.status = ScrapingStatus.STOPPED
+                return result
+            
             self._log(f"Загрузка страницы: {product_url}")
             
+            if self.resource_blocker is not None:
+                try:
+                    self.resource_blocker.apply(driver, site)
+                except WebDriverException as e:
+                    self._log(f"Не удалось применить блокировку ресурсов: {e}", "WARNING")
+            
+            if self.clearance_store is not None and self.clearance_store.handoff:
+                self._restore_clearance(driver, site)
+            
             # Загрузка страницы
-            self.driver.get(product_url)
+            page_served = True
+            driver.get(product_url)
             
             # Ожидание загрузки и проверка на блокировку
-            if self._wait_for_page_load(site):
+            if self._wait_for_page_load(driver, site):
                 # Парсинг данных в зависимости от сайта
-                product = self._parse_product_data(product_id, site, product_url)
+                product = self._parse_product_data(driver, product_id, site, product_url)
                 
                 if product:
                     result.product = product
                     result.status = ScrapingStatus.SUCCESS
                     self._log(f"Товар успешно обработан: {product.name}")
+                    
+                    if self.clearance_store is not None and self.clearance_store.handoff:
+                        self._export_clearance(driver, site)
                 else:
                     result.status = ScrapingStatus.ERROR
                     result.error_message = "Не удалось извлечь данные товара"
@@ -147,374 +327,157 @@ class SeleniumScraper(BaseScraper):
                 result.status = ScrapingStatus.ERROR
                 result.error_message = "Страница заблокирована или не загрузилась"
             
+        except PageBlockedError as e:
+            result.blocked = True
+            result.block_reason = e.verdict.reason
+            result.status = ScrapingStatus.ERROR
+            result.error_message = f"Страница заблокирована: {e}"
+            
         except TimeoutException:
+            # Страница, не загрузившаяся за page_load_timeout, могла повесить
+            # рендерер - неотвечающий браузер заменяется
+            if driver is not None and not self.driver_pool.is_responsive(driver):
+                recycle_driver = True
+                self._log("Браузер не отвечает и будет заменен", "WARNING")
+            result.transient = True
             result.status = ScrapingStatus.ERROR
             result.error_message = "Превышено время ожидания загрузки страницы"
             self._log("Превышено время ожидания", "ERROR")
             
+        except WebDriverException as e:
+            # Браузер мог упасть или зависнуть - заменяем его
+            recycle_driver = True
+            result.transient = True
+            result.status = ScrapingStatus.ERROR
+            result.error_message = f"Ошибка WebDriver: {str(e)}"
+            self._log(f"Ошибка WebDriver: {e}", "ERROR")
+            
         except Exception as e:
             result.status = ScrapingStatus.ERROR
             result.error_message = f"Ошибка скрейпинга: {str(e)}"
             self._log(f"Ошибка: {e}", "ERROR")
         
         finally:
+            if driver is not None:
+                self.driver_pool.release(driver, recycle=recycle_driver, page_served=page_served)
+            
+            # Ошибки браузера, закрытого при остановке, не считаются ошибками товара
+            if self.is_stopped and result.status != ScrapingStatus.SUCCESS:
+                result.status = ScrapingStatus.STOPPED
             result.response_time = time.time() - start_time
             result.attempts = 1
         
         return result
     
-    def _wait_for_page_load(self, site: str) -> bool:
-        """Ожидание загрузки страницы и проверка на блокировку"""
+    def _wait_for_page_load(self, driver, site: str) -> bool:
+        """
+        Ожидание готовности страницы с единым сроком element_wait_timeout.
+        Возвращает True, как только появился любой из элементов товара;
+        при обнаружении защиты или капчи выбрасывает PageBlockedError.
+        """
+        plan = get_plan(site)
+        ready_selectors = list(plan.ready_selectors) if plan else []
+        deadline = time.monotonic() + self.element_wait_timeout
+        block_checked_at = None
+        
         try:
-            # Ожидание основного контента
-            time.sleep(random.uniform(2, 4))
-            
-            # Проверка на капчу или блокировку
-            blocking_indicators = [
-                "captcha", "blocked", "bot", "protection", 
-                "verify", "challenge", "incapsula", "cloudflare"
-            ]
-            
-            page_source = self.driver.page_source.lower()
-            for indicator in blocking_indicators:
-                if indicator in page_source:
-                    self._log(f"Обнаружена блокировка: {indicator}", "WARNING")
+            while True:
+                matched, ready_state = driver.execute_script(self.READY_CHECK_SCRIPT, ready_selectors)
+                
+                if matched or (not ready_selectors and ready_state == 'complete'):
+                    # Страница защиты тоже может содержать h1 - проверяем до парсинга
+                    self._raise_if_blocked(driver)
+                    return True
+                
+                now = time.monotonic()
+                if now >= deadline:
+                    self._raise_if_blocked(driver)
+                    self._log(f"Элементы товара не появились за {self.element_wait_timeout} сек", "WARNING")
+                    return False
+                
+                # Загруженная страница без товара - вероятно, защита; проверяется не чаще раза в секунду
+                if ready_state == 'complete' and (block_checked_at is None or now - block_checked_at >= 1.0):
+                    block_checked_at = now
+                    self._raise_if_blocked(driver)
+                
+                if self._stop_event.wait(min(self.READY_POLL_INTERVAL, deadline - now)):
                     return False
             
-            # Ожидание специфичных элементов для каждого сайта
-            if site.lower() == 'rozetka':
-                return self._wait_rozetka_load()
-            elif site.lower() == 'allo':
-                return self._wait_allo_load()
-            elif site.lower() == 'comfy':
-                return self._wait_comfy_load()
-            elif site.lower() == 'epicentr':
-                return self._wait_epicentr_load()
-            
-            return True
-            
+        except PageBlockedError:
+            raise
         except Exception as e:
             self._log(f"Ошибка ожидания загрузки: {e}", "ERROR")
             return False
     
-    def _wait_rozetka_load(self) -> bool:
-        """Ожидание загрузки Rozetka"""
-        try:
-            # Ожидание основных элементов товара
-            selectors_to_wait = [
-                "h1[data-testid='product-title']",
-                ".product-title",
-                "[data-testid='price']",
-                ".price"
-            ]
-            
-            for selector in selectors_to_wait:
-                try:
-                    self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    return True
-                except TimeoutException:
-                    continue
-            
-            return False
-            
-        except Exception:
-            return False
-    
-    def _wait_allo_load(self) -> bool:
-        """Ожидание загрузки Allo"""
-        try:
-            selectors_to_wait = [
-                "h1.p-view__title",
-                ".p-view__price",
-                ".product-title",
-                ".price"
-            ]
-            
-            for selector in selectors_to_wait:
-                try:
-                    self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    return True
-                except TimeoutException:
-                    continue
-            
-            return False
-            
-        except Exception:
-            return False
-    
-    def _wait_comfy_load(self) -> bool:
-        """Ожидание загрузки Comfy"""
-        try:
-            # Comfy может показывать страницу блокировки
-            if "pardon our interruption" in self.driver.page_source.lower():
-                return False
-            
-            selectors_to_wait = [
-                ".product-title",
-                ".price",
-                "h1"
-            ]
-            
-            for selector in selectors_to_wait:
-                try:
-                    self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    return True
-                except TimeoutException:
-                    continue
-            
-            return False
-            
-        except Exception:
-            return False
+    def _raise_if_blocked(self, driver):
+        """Выбрасывает PageBlockedError, если открыта страница защиты"""
+        verdict = self._detect_block(driver)
+        if verdict.blocked:
+            self._log(f"Обнаружена блокировка: {verdict.describe()}", "WARNING")
+            raise PageBlockedError(verdict)
     
-    def _wait_epicentr_load(self) -> bool:
-        """Ожидание загрузки Epicentr"""
-        try:
-            selectors_to_wait = [
-                "h1",
-                ".product-title",
-                "[class*='price']",
-                ".price"
-            ]
-            
-            for selector in selectors_to_wait:
-                try:
-                    self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, selector)))
-                    return True
-                except TimeoutException:
-                    continue
-            
-            return False
-            
-        except Exception:
-            return False
+    def _detect_block(self, driver) -> BlockVerdict:
+        """
+        Проверка открытой страницы на блокировку.
+        Из браузера забираются только заголовок и начало head/body, а не весь page_source.
+        """
+        title, head, body_start, length = driver.execute_script(
+            self.BLOCK_CHECK_SCRIPT, BlockDetector.HEAD_WINDOW, BlockDetector.BODY_WINDOW
+        )
+        return self.block_detector.check_parts(
+            title, head, body_start, short_page=length < BlockDetector.SHORT_PAGE_LIMIT
+        )
     
-    def _parse_product_data(self, product_id: str, site: str, url: str) -> Optional[ProductInfo]:
-        """Парсинг данных товара"""
+    def _export_clearance(self, driver, site: str):
+        """Сохранение cookies допуска и User-Agent браузера для HTTP скрейперов"""
         try:
-            if site.lower() == 'rozetka':
-                return self._parse_rozetka_product(product_id, url)
-            elif site.lower() == 'allo':
-                return self._parse_allo_product(product_id, url)
-            elif site.lower() == 'comfy':
-                return self._parse_comfy_product(product_id, url)
-            elif site.lower() == 'epicentr':
-                return self._parse_epicentr_product(product_id, url)
-            
-            return None
-            
-        except Exception as e:
-            self._log(f"Ошибка парсинга данных: {e}", "ERROR")
-            return None
+            cookies = driver.get_cookies()
+            if not any(is_clearance_cookie(cookie.get('name', '')) for cookie in cookies):
+                return
+            user_agent = driver.execute_script("return navigator.userAgent")
+            clearance = self.clearance_store.update(site, cookies, user_agent)
+            if clearance is not None:
+                self._mark_clearance(driver, clearance.site, clearance.version)
+                self._log(f"Допуск {site} передан HTTP сессиям")
+        except WebDriverException as e:
+            self._log(f"Не удалось получить cookies браузера: {e}", "DEBUG")
     
-    def _parse_rozetka_product(self, product_id: str, url: str) -> Optional[ProductInfo]:
-        """Парсинг товара Rozetka"""
+    def _restore_clearance(self, driver, site: str):
+        """
+        Загрузка в браузер сохраненного допуска сайта (например, из прошлого запуска):
+        cookies через DevTools Network.setCookies и User-Agent, с которым они получены
+        """
+        clearance = self.clearance_store.get(site)
+        if clearance is None:
+            return
+        with self._clearance_lock:
+            if self._driver_clearances.get(driver, {}).get(clearance.site) == clearance.version:
+                return
+        
         try:
-            product = ProductInfo(id=product_id, url=url, site="rozetka")
-            
-            # Название товара
-            title_selectors = [
-                "h1[data-testid='product-title']",
-                ".product-title",
-                "h1"
-            ]
-            
-            for selector in title_selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    product.name = self.clean_text(element.text)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            # Цена
-            price_selectors = [
-                "[data-testid='price'] .price__value",
-                ".price .price__value",
-                ".price-value",
-                ".price"
-            ]
-            
-            for selector in price_selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    price_text = element.text
-                    product.price = self.parse_price(price_text)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            # Старая цена
-            old_price_selectors = [
-                ".price__old",
-                ".old-price"
-            ]
-            
-            for selector in old_price_selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    old_price_text = element.text
-                    product.old_price = self.parse_price(old_price_text)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            # Доступность
-            availability_selectors = [
-                ".status-label",
-                ".availability-status"
-            ]
-            
-            for selector in availability_selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    product.availability = self.clean_text(element.text)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            # Изображение
-            try:
-                img_element = self.driver.find_element(By.CSS_SELECTOR, ".product-photo img, .gallery img")
-                product.image_url = img_element.get_attribute("src")
-            except NoSuchElementException:
-                pass
-            
-            return product if product.name else None
-            
-        except Exception as e:
-            self._log(f"Ошибка парсинга Rozetka: {e}", "ERROR")
-            return None
+            driver.execute_cdp_cmd('Network.setUserAgentOverride', {'userAgent': clearance.user_agent})
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': clearance.cdp_cookies()})
+            self._mark_clearance(driver, clearance.site, clearance.version)
+            self._log(f"Браузер использует сохраненную сессию {site}", "DEBUG")
+        except WebDriverException as e:
+            self._log(f"Не удалось загрузить cookies в браузер: {e}", "WARNING")
     
-    def _parse_allo_product(self, product_id: str, url: str) -> Optional[ProductInfo]:
-        """Парсинг товара Allo"""
-        try:
-            product = ProductInfo(id=product_id, url=url, site="allo")
-            
-            # Название
-            title_selectors = [
-                "h1.p-view__title",
-                ".product-title",
-                "h1"
-            ]
-            
-            for selector in title_selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    product.name = self.clean_text(element.text)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            # Цена
-            price_selectors = [
-                ".p-view__price .sum",
-                ".price .sum",
-                ".price-current"
-            ]
-            
-            for selector in price_selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    product.price = self.parse_price(element.text)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            # Доступность
-            try:
-                status_element = self.driver.find_element(By.CSS_SELECTOR, ".p-view__status, .availability")
-                product.availability = self.clean_text(status_element.text)
-            except NoSuchElementException:
-                product.availability = "В наличии"
-            
-            return product if product.name else None
-            
-        except Exception as e:
-            self._log(f"Ошибка парсинга Allo: {e}", "ERROR")
-            return None
+    def _mark_clearance(self, driver, site: str, version: int):
+        """Учет версии допуска, находящейся в браузере"""
+        with self._clearance_lock:
+            self._driver_clearances.setdefault(driver, {})[site] = version
     
-    def _parse_comfy_product(self, product_id: str, url: str) -> Optional[ProductInfo]:
-        """Парсинг товара Comfy"""
-        try:
-            product = ProductInfo(id=product_id, url=url, site="comfy")
-            
-            # Название
-            title_selectors = [
-                ".product-title",
-                "h1"
-            ]
-            
-            for selector in title_selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    product.name = self.clean_text(element.text)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            # Цена
-            price_selectors = [
-                ".price-current",
-                ".price"
-            ]
-            
-            for selector in price_selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    product.price = self.parse_price(element.text)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            return product if product.name else None
-            
-        except Exception as e:
-            self._log(f"Ошибка парсинга Comfy: {e}", "ERROR")
+    def _parse_product_data(self, driver, product_id: str, site: str, url: str) -> Optional[ProductInfo]:
+        """Парсинг данных товара по скомпилированному плану сайта"""
+        plan = get_plan(site)
+        if plan is None:
             return None
-    
-    def _parse_epicentr_product(self, product_id: str, url: str) -> Optional[ProductInfo]:
-        """Парсинг товара Epicentr"""
+        
         try:
-            product = ProductInfo(id=product_id, url=url, site="epicentr")
-            
-            # Название
-            title_selectors = [
-                "h1",
-                ".product-title"
-            ]
-            
-            for selector in title_selectors:
-                try:
-                    element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                    product.name = self.clean_text(element.text)
-                    break
-                except NoSuchElementException:
-                    continue
-            
-            # Цена
-            price_selectors = [
-                "[class*='price']",
-                ".price"
-            ]
-            
-            for selector in price_selectors:
-                try:
-                    elements = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for element in elements:
-                        price_text = element.text
-                        if price_text and any(char.isdigit() for char in price_text):
-                            product.price = self.parse_price(price_text)
-                            break
-                    if product.price:
-                        break
-                except NoSuchElementException:
-                    continue
-            
-            return product if product.name else None
+            return plan.extract_webdriver(driver, product_id, url)
             
         except Exception as e:
-            self._log(f"Ошибка парсинга Epicentr: {e}", "ERROR")
+            self._log(f"Ошибка парсинга данных {site}: {e}", "ERROR")
             return None
     
     def __del__(self):
@@ -0,0 +1,135 @@
+"""
+Потокобезопасный пул HTTP сессий
+Каждый одновременный запрос получает собственную сессию
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional, Set
+
+class SessionPool:
+    """Пул сессий с выдачей на время запроса и пересозданием проблемных сессий"""
+
+    def __init__(self, factory: Callable[[], Any], size: int = 5):
+        self.factory = factory
+        self.size = max(1, size)
+
+        self._idle: "queue.LifoQueue[Any]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+        # Выданные сессии (по id) и сессии, закрытые принудительно во время работы
+        self._in_use: Dict[int, Any] = {}
+        self._aborted: Set[int] = set()
+
+    def checkout(self, timeout: Optional[float] = None) -> Any:
+        """
+        Получение сессии из пула.
+        Блокирует, если все сессии заняты; новая сессия создается лениво.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("Нет свободных сессий в пуле")
+
+        try:
+            # LIFO: последняя возвращенная сессия имеет самые "теплые" соединения
+            while True:
+                try:
+                    session = self._idle.get_nowait()
+                except queue.Empty:
+                    break
+
+                if self._is_reusable(session):
+                    return self._mark_in_use(session)
+                self._discard(session)
+
+            session = self.factory()
+            with self._lock:
+                self._created += 1
+            return self._mark_in_use(session)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, session: Any, recycle: bool = False):
+        """
+        Возврат сессии в пул.
+        При recycle=True сессия закрывается, вместо нее позже будет создана новая.
+        """
+        with self._lock:
+            self._in_use.pop(id(session), None)
+            aborted = id(session) in self._aborted
+            self._aborted.discard(id(session))
+
+        try:
+            if aborted:
+                # Сессия уже закрыта в abort()
+                self._forget(session)
+            elif recycle or self._closed:
+                self._discard(session)
+            else:
+                self._idle.put(session)
+        finally:
+            self._slots.release()
+
+    def abort(self) -> int:
+        """
+        Принудительное закрытие всех выданных сессий; при возврате они будут пересозданы.
+        Закрытие сессии requests/cloudscraper не прерывает уже отправленный запрос:
+        он завершится в пределах своего таймаута. Прерывание выполняющихся операций
+        обеспечивают подклассы, чьи сессии это поддерживают (WebDriverPool).
+        """
+        with self._lock:
+            sessions = list(self._in_use.values())
+            self._aborted.update(id(session) for session in sessions)
+
+        self._close_aborted(sessions)
+        return len(sessions)
+
+    def _close_aborted(self, sessions: List[Any]):
+        """Закрытие принудительно прерванных сессий"""
+        for session in sessions:
+            self._close_session(session)
+
+    def _mark_in_use(self, session: Any) -> Any:
+        """Учет выданной сессии"""
+        with self._lock:
+            self._in_use[id(session)] = session
+        return session
+
+    def close(self):
+        """Закрытие всех свободных сессий пула"""
+        self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(session)
+
+    def _discard(self, session: Any):
+        """Закрытие сессии и исключение ее из учета пула"""
+        self._close_session(session)
+        self._forget(session)
+
+    def _forget(self, session: Any):
+        """Исключение закрытой сессии из учета пула"""
+        with self._lock:
+            self._created -= 1
+
+    def _is_reusable(self, session: Any) -> bool:
+        """Проверка свободной сессии перед повторной выдачей"""
+        return True
+
+    def _close_session(self, session: Any):
+        """Закрытие сессии с подавлением ошибок"""
+        try:
+            session.close()
+        except Exception:
+            pass
+
+    @property
+    def created(self) -> int:
+        """Количество существующих сессий"""
+        return self._created
@@ -3,90 +3,284 @@
 """
 
 import time
+import heapq
 import threading
-from typing import List, Dict, Optional, Callable, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict, deque
+from typing import List, Dict, Iterable, Iterator, Optional, Callable, Sized, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
 
 from scraper.base_scraper import BaseScraper, ScrapingResult, ScrapingStatus, ScrapingMethod, ProductInfo
 from scraper.cloudscraper_scraper import CloudScraperScraper
 from scraper.selenium_scraper import SeleniumScraper
+from scraper.async_scraper import AsyncScraper
+from scraper.rate_limiter import SiteRateLimiter
+from scraper.http_cache import HttpCache
+from scraper.coalescing import RequestCoalescer
+from scraper.method_router import MethodRouter
+from scraper.circuit_breaker import SiteCircuitBreakers, CircuitState
+from scraper.retry import RetryPolicy
+from scraper.html_parser import ParsePool
+from scraper.clearance import ClearanceStore
+from utils.config import Config
 
 class HybridScraper(BaseScraper):
     """Гибридный скрейпер с fallback стратегией"""
     
+    # Максимальная задержка реакции диспетчера на сигнал остановки (сек)
+    STOP_POLL_INTERVAL = 0.25
+    
     def __init__(self, preferred_method: ScrapingMethod = ScrapingMethod.CLOUDSCRAPER,
-                 use_selenium_fallback: bool = True, headless: bool = True, **kwargs):
+                 use_selenium_fallback: bool = True, headless: bool = True,
+                 config: Optional[Config] = None, selenium_scraper: Optional[SeleniumScraper] = None,
+                 **kwargs):
         super().__init__(**kwargs)
         
         self.preferred_method = preferred_method
         self.use_selenium_fallback = use_selenium_fallback
         self.headless = headless
+        self.config = config
+        
+        # Общий лимитер частоты запросов для всех дочерних скрейперов
+        if config is not None:
+            self.rate_limiter = SiteRateLimiter.from_config(config)
+        
+        # Дисковый кэш страниц для HTTP скрейперов (advanced.cache_enabled)
+        self.http_cache = HttpCache.from_config(config) if config is not None else None
+        
+        # Выбор порядка методов по сайтам на основе накопленной статистики
+        self.method_router = MethodRouter.from_config(config) if config is not None else None
+        
+        # Выключатели по сайтам и методам: при серии блокировок сайт приостанавливается
+        if config is not None:
+            self.circuit_breakers = SiteCircuitBreakers.from_config(config)
+        else:
+            self.circuit_breakers = SiteCircuitBreakers()
+        
+        # Повторы временных ошибок (scraping.max_retries)
+        self.retry_policy = RetryPolicy.from_config(config) if config is not None else RetryPolicy()
+        
+        # Пул процессов для разбора HTML (общий для HTTP скрейперов)
+        self.parse_pool = ParsePool.from_config(config) if config is not None else None
+        
+        # Cookies допуска из браузера для HTTP скрейперов (advanced.clearance_handoff)
+        self.clearance_store = ClearanceStore.from_config(config) if config is not None else ClearanceStore()
         
         # Инициализация скрейперов
         self.cloudscraper_scraper = None
         self.selenium_scraper = None
+        self._external_selenium = selenium_scraper is not None
+        if selenium_scraper is not None:
+            # Переданный извне (прогретый) Selenium скрейпер переживает этот запуск
+            selenium_scraper.reset()
+            selenium_scraper.rate_limiter = self.rate_limiter
+            selenium_scraper.clearance_store = self.clearance_store
+            self.selenium_scraper = selenium_scraper
+        self.async_scraper = None
+        self._scrapers_lock = threading.Lock()
         
         # Статистика
         self.success_count = 0
         self.error_count = 0
         self.method_stats = {
             ScrapingMethod.CLOUDSCRAPER: {"success": 0, "error": 0},
-            ScrapingMethod.SELENIUM: {"success": 0, "error": 0}
+            ScrapingMethod.SELENIUM: {"success": 0, "error": 0},
+            ScrapingMethod.ASYNC: {"success": 0, "error": 0}
         }
     
+    def _config_int(self, section: str, option: str, fallback: int) -> int:
+        """Получение целого значения из конфигурации (если она передана)"""
+        if self.config is None:
+            return fallback
+        return self.config.getint(section, option, fallback)
+    
+    def _config_bool(self, section: str, option: str, fallback: bool) -> bool:
+        """Получение логического значения из конфигурации (если она передана)"""
+        if self.config is None:
+            return fallback
+        return self.config.getboolean(section, option, fallback)
+    
+    def _config_str(self, section: str, option: str, fallback: str) -> str:
+        """Получение строкового значения из конфигурации (если она передана)"""
+        if self.config is None:
+            return fallback
+        return self.config.get(section, option, fallback)
+    
     def _get_cloudscraper(self) -> CloudScraperScraper:
         """Получение экземпляра CloudScraper"""
-        if not self.cloudscraper_scraper:
-            self.cloudscraper_scraper = CloudScraperScraper(
-                progress_callback=self.progress_callback,
-                log_callback=self.log_callback
-            )
+        with self._scrapers_lock:
+            if not self.cloudscraper_scraper:
+                self.cloudscraper_scraper = CloudScraperScraper(
+                    pool_size=self._config_int('advanced', 'cloudscraper_pool_size', 5),
+                    http_cache=self.http_cache,
+                    parse_pool=self.parse_pool,
+                    html_backend=self._config_str('scraping', 'html_parser_backend', 'auto'),
+                    structured_data=self._config_bool('scraping', 'structured_data', True),
+                    clearance_store=self.clearance_store,
+                    progress_callback=self.progress_callback,
+                    log_callback=self.log_callback,
+                    rate_limiter=self.rate_limiter
+                )
         return self.cloudscraper_scraper
     
     def _get_selenium_scraper(self) -> SeleniumScraper:
         """Получение экземпляра Selenium скрейпера"""
-        if not self.selenium_scraper:
-            self.selenium_scraper = SeleniumScraper(
-                headless=self.headless,
-                progress_callback=self.progress_callback,
-                log_callback=self.log_callback
-            )
+        with self._scrapers_lock:
+            if not self.selenium_scraper:
+                common = dict(
+                    clearance_store=self.clearance_store,
+                    progress_callback=self.progress_callback,
+                    log_callback=self.log_callback,
+                    rate_limiter=self.rate_limiter
+                )
+                if self.config is not None:
+                    self.selenium_scraper = SeleniumScraper.from_config(self.config, self.headless, **common)
+                else:
+                    self.selenium_scraper = SeleniumScraper(headless=self.headless, **common)
+                
+                # Остальные браузеры пула запускаются в фоне, пока первый уже работает
+                threading.Thread(
+                    target=self.selenium_scraper.prelaunch,
+                    daemon=True
+                ).start()
         return self.selenium_scraper
     
+    def _get_async_scraper(self) -> AsyncScraper:
+        """Получение экземпляра асинхронного скрейпера"""
+        with self._scrapers_lock:
+            if not self.async_scraper:
+                self.async_scraper = AsyncScraper(
+                    max_concurrency=self._config_int('advanced', 'async_max_concurrency', 100),
+                    max_per_host=self._config_int('advanced', 'async_max_per_host', 20),
+                    http_cache=self.http_cache,
+                    parse_pool=self.parse_pool,
+                    html_backend=self._config_str('scraping', 'html_parser_backend', 'auto'),
+                    structured_data=self._config_bool('scraping', 'structured_data', True),
+                    circuit_breakers=self.circuit_breakers,
+                    attempt_callback=self._record_async_attempt,
+                    clearance_store=self.clearance_store,
+                    progress_callback=self.progress_callback,
+                    log_callback=self.log_callback,
+                    rate_limiter=self.rate_limiter
+                )
+        return self.async_scraper
+    
     def scrape_product(self, product_id: str, site: str) -> ScrapingResult:
-        """Скрейпинг товара с использованием гибридного подхода"""
+        """
+        Скрейпинг товара с использованием гибридного подхода.
+        Статистику не обновляет: одна пара может обрабатываться несколько раз
+        (повторы), в статистику попадает только итоговый результат iter_scrape_items.
+        """
         if self.is_stopped:
             result = ScrapingResult()
             result.status = ScrapingStatus.STOPPED
             return result
         
-        # Первая попытка с предпочтительным методом
-        if self.preferred_method == ScrapingMethod.CLOUDSCRAPER:
-            result = self._try_cloudscraper(product_id, site)
-        else:
-            result = self._try_selenium(product_id, site)
-        
-        # Fallback на другой метод при неудаче
-        if (result.status != ScrapingStatus.SUCCESS and 
-            self.use_selenium_fallback and not self.is_stopped):
+        result = None
+        attempt = 0
+        for method in self._method_order(site):
+            # Методы, заблокированные сайтом, пропускаются до окончания охлаждения
+            if not self.circuit_breakers.allow(site, method):
+                continue
             
-            self._log(f"Первичный метод неуспешен, переключаемся на fallback для {product_id}")
+            attempt += 1
+            if attempt > 1:
+                if self.is_stopped:
+                    break
+                self._log(f"Первичный метод неуспешен, переключаемся на fallback для {product_id}")
             
-            if self.preferred_method == ScrapingMethod.CLOUDSCRAPER:
-                fallback_result = self._try_selenium(product_id, site)
-            else:
-                fallback_result = self._try_cloudscraper(product_id, site)
+            attempt_result = self._try_method(method, product_id, site)
+            self._record_attempt(site, method, attempt_result)
+            
+            # Результат fallback используется, только если он успешен
+            if result is None:
+                result = attempt_result
+            elif attempt_result.status == ScrapingStatus.SUCCESS:
+                result = attempt_result
+                result.attempts = attempt
             
-            # Используем результат fallback если он успешен
-            if fallback_result.status == ScrapingStatus.SUCCESS:
-                result = fallback_result
-                result.attempts = 2
+            if result.status == ScrapingStatus.SUCCESS:
+                break
         
-        # Обновление статистики
-        self._update_stats(result)
+        if result is None:
+            # Все методы для сайта на паузе - запрос не выполнялся
+            return self._circuit_open_result(site)
         
         return result
     
+    def _configured_methods(self) -> List[ScrapingMethod]:
+        """
+        Предпочтительный и fallback методы из настроек. Гибридный режим
+        раскрывается в конкретные методы, чтобы маршрутизатор и выключатели
+        учитывали попытки под методом, который действительно выполнялся.
+        """
+        if self.preferred_method == ScrapingMethod.HYBRID:
+            return [ScrapingMethod.CLOUDSCRAPER, ScrapingMethod.SELENIUM]
+        
+        methods = [self.preferred_method]
+        if self.use_selenium_fallback:
+            if self.preferred_method in (ScrapingMethod.CLOUDSCRAPER, ScrapingMethod.ASYNC):
+                methods.append(ScrapingMethod.SELENIUM)
+            else:
+                methods.append(ScrapingMethod.CLOUDSCRAPER)
+        return methods
+    
+    def _method_order(self, site: str) -> List[ScrapingMethod]:
+        """
+        Порядок методов для сайта: методы из настроек, переупорядоченные
+        маршрутизатором по наблюдаемой эффективности
+        """
+        methods = self._configured_methods()
+        if self.method_router:
+            methods = self.method_router.order(site, methods)
+        
+        # С действующим допуском из браузера HTTP запрос снова проходит, хотя
+        # накопленная статистика говорит об обратном
+        if self.clearance_store is not None and self.clearance_store.has(site):
+            methods.sort(key=lambda method: method == ScrapingMethod.SELENIUM)
+        return methods
+    
+    def _record_attempt(self, site: str, method: ScrapingMethod, result: ScrapingResult):
+        """Учет попытки в маршрутизаторе методов и выключателях сайта"""
+        if self.method_router:
+            self.method_router.record(site, method, result)
+        
+        self._log_circuit_change(site, method, self.circuit_breakers.record(site, method, result))
+    
+    def _record_async_attempt(self, site: str, result: ScrapingResult):
+        """Учет попытки асинхронного движка (вызывается в потоке event loop)"""
+        self._record_attempt(site, ScrapingMethod.ASYNC, result)
+    
+    def _log_circuit_change(self, site: str, method: ScrapingMethod, state: Optional[CircuitState]):
+        """Сообщение о смене состояния выключателя"""
+        if state == CircuitState.OPEN:
+            cooldown = self.circuit_breakers.cooldown_of(site, method)
+            self._log(f"{site}: {method.value} блокируется сайтом, пауза {cooldown:.0f} сек", "WARNING")
+        elif state == CircuitState.CLOSED:
+            self._log(f"{site}: {method.value} снова доступен")
+    
+    def _circuit_open_result(self, site: str) -> ScrapingResult:
+        """Результат для товара, запрос которого не выполнялся из-за блокировки сайта"""
+        result = ScrapingResult()
+        result.status = ScrapingStatus.ERROR
+        result.blocked = True
+        result.error_message = f"Сайт {site} временно блокирует запросы"
+        return result
+    
+    @staticmethod
+    def _is_circuit_rejected(result: ScrapingResult) -> bool:
+        """Товар не обрабатывался: все методы для сайта были на паузе"""
+        return result.blocked and result.attempts == 0 and result.method_used is None
+    
+    def _try_method(self, method: ScrapingMethod, product_id: str, site: str) -> ScrapingResult:
+        """Попытка скрейпинга указанным методом"""
+        if method == ScrapingMethod.CLOUDSCRAPER:
+            return self._try_cloudscraper(product_id, site)
+        elif method == ScrapingMethod.ASYNC:
+            return self._try_async(product_id, site)
+        elif method == ScrapingMethod.SELENIUM:
+            return self._try_selenium(product_id, site)
+        raise ValueError(f"Метод {method.value} не выполняет запросы сам по себе")
+    
     def _try_cloudscraper(self, product_id: str, site: str) -> ScrapingResult:
         """Попытка скрейпинга через CloudScraper"""
         try:
@@ -117,7 +311,12 @@ class HybridScraper(BaseScraper):
             
             self._log(f"Попытка Selenium для {product_id} на {site}")
             scraper = self._get_selenium_scraper()
-            return scraper.scrape_product(product_id, site)
+            
+            clearance_version = self.clearance_store.version(site) if self.clearance_store else 0
+            result = scraper.scrape_product(product_id, site)
+            if self.clearance_store is not None and self.clearance_store.version(site) != clearance_version:
+                self._on_new_clearance(site)
+            return result
             
         except Exception as e:
             self._log(f"Ошибка Selenium: {e}", "ERROR")
@@ -127,8 +326,57 @@ class HybridScraper(BaseScraper):
             result.method_used = ScrapingMethod.SELENIUM
             return result
     
+    def scrape_search_page(self, product_code: str, site: str) -> ScrapingResult:
+        """
+        Поиск товара на странице поиска сайта по коду (HTTP запрос, товар берется
+        только из структурированных данных с совпадающим ID)
+        """
+        search_url = self.format_search_url(product_code, site)
+        if not search_url or self.is_stopped:
+            result = ScrapingResult()
+            result.status = ScrapingStatus.STOPPED if self.is_stopped else ScrapingStatus.ERROR
+            result.error_message = f"Поиск не поддерживается для сайта: {site}"
+            return result
+        
+        if not self.circuit_breakers.allow(site, ScrapingMethod.CLOUDSCRAPER):
+            return self._circuit_open_result(site)
+        
+        self._log(f"Поиск {product_code} на странице поиска {site}")
+        result = self._get_cloudscraper().scrape_url(product_code, site, search_url, structured_only=True)
+        self._log_circuit_change(
+            site, ScrapingMethod.CLOUDSCRAPER,
+            self.circuit_breakers.record(site, ScrapingMethod.CLOUDSCRAPER, result)
+        )
+        return result
+    
+    def _on_new_clearance(self, site: str):
+        """Браузер прошел защиту сайта: HTTP методы сразу получают пробный запрос"""
+        for method in (ScrapingMethod.CLOUDSCRAPER, ScrapingMethod.ASYNC):
+            self.circuit_breakers.expire_cooldown(site, method)
+        self._log(f"{site}: допуск браузера передан HTTP запросам")
+    
+    def _try_async(self, product_id: str, site: str) -> ScrapingResult:
+        """Попытка скрейпинга через асинхронный движок"""
+        try:
+            if self.is_stopped:
+                result = ScrapingResult()
+                result.status = ScrapingStatus.STOPPED
+                return result
+            
+            self._log(f"Попытка Async для {product_id} на {site}")
+            scraper = self._get_async_scraper()
+            return scraper.scrape_product(product_id, site)
+            
+        except Exception as e:
+            self._log(f"Ошибка Async: {e}", "ERROR")
+            result = ScrapingResult()
+            result.status = ScrapingStatus.ERROR
+            result.error_message = f"Async ошибка: {str(e)}"
+            result.method_used = ScrapingMethod.ASYNC
+            return result
+    
     def _update_stats(self, result: ScrapingResult):
-        """Обновление статистики"""
+        """Обновление статистики по итоговому результату товара"""
         if result.status == ScrapingStatus.SUCCESS:
             self.success_count += 1
             if result.method_used:
@@ -141,52 +389,307 @@ class HybridScraper(BaseScraper):
     def scrape_multiple_products(self, products: List[Tuple[str, str]], 
                                 max_workers: int = 3) -> List[ScrapingResult]:
         """Скрейпинг множества товаров с многопоточностью"""
-        results = []
-        total_products = len(products)
+        return list(self.iter_scrape(products, max_workers=max_workers))
+    
+    def iter_scrape(self, products: Iterable[Tuple[str, str]],
+                    max_workers: int = 3) -> Iterator[ScrapingResult]:
+        """
+        Скрейпинг множества товаров с выдачей каждого результата сразу по готовности.
+        Одновременно в обработке находится не более max_workers товаров
+        (для асинхронного метода - не более advanced.async_max_concurrency).
+        products может быть любым итерируемым объектом (в том числе потоком
+        строк файла): товары читаются лениво, по мере освобождения окна.
+        Повторы одного товара загружаются один раз и получают общий результат.
+        """
+        for _, _, result in self.iter_scrape_items(products, max_workers):
+            yield result
+    
+    def iter_scrape_items(self, products: Iterable[Tuple[str, str]], max_workers: int = 3,
+                          task: Optional[Callable[[str, str], ScrapingResult]] = None
+                          ) -> Iterator[Tuple[str, str, ScrapingResult]]:
+        """
+        То же, что iter_scrape, но вместе с результатом выдаются ID товара и сайт.
+        task(product_id, site) заменяет scrape_product для каждой пары (всегда
+        выполняется в пуле потоков с диспетчеризацией по сайтам).
+        """
+        total_products = len(products) if isinstance(products, Sized) else None
+        completed = 0
         
-        self._log(f"Начало скрейпинга {total_products} товаров")
+        if total_products is None:
+            self._log("Начало скрейпинга товаров из потока")
+        else:
+            self._log(f"Начало скрейпинга {total_products} товаров")
         
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Создание задач
-            future_to_product = {
-                executor.submit(self.scrape_product, product_id, site): (product_id, site)
-                for product_id, site in products
-            }
-            
-            # Обработка результатов
-            completed = 0
-            for future in as_completed(future_to_product):
-                if self.is_stopped:
-                    break
-                
-                product_id, site = future_to_product[future]
-                
-                try:
-                    result = future.result()
-                    results.append(result)
-                    
-                    completed += 1
+        coalescer = RequestCoalescer()
+        unique_products = coalescer.filter(products)
+        
+        if self.preferred_method == ScrapingMethod.ASYNC and task is None:
+            results = self._iter_scrape_async(unique_products, max_workers)
+        else:
+            results = self._iter_scrape_threaded(unique_products, max_workers, task or self.scrape_product)
+        
+        try:
+            for product_id, site, result in self._expand_coalesced(results, coalescer):
+                completed += 1
+                if total_products is None:
+                    self._update_progress(completed, 0, f"Обработано {completed} товаров")
+                else:
                     self._update_progress(
                         completed, total_products,
                         f"Обработано {completed}/{total_products} товаров"
                     )
+                
+                # Логирование результата
+                if result.status == ScrapingStatus.SUCCESS:
+                    self._log(f"✓ {product_id} ({site}): {result.product.name}")
+                else:
+                    self._log(f"✗ {product_id} ({site}): {result.error_message}")
+                
+                yield product_id, site, result
+        finally:
+            # Статистика методов по сайтам сохраняется для следующих запусков
+            if self.method_router:
+                self.method_router.save()
+            # Cookies и User-Agent сессий по сайтам тоже переживают запуск
+            if self.clearance_store is not None:
+                self.clearance_store.save()
+            # Постоянная сессия асинхронного движка не держит соединения между запусками
+            if self.async_scraper:
+                self.async_scraper.close()
+        
+        if coalescer.coalesced_count:
+            self._log(f"Повторяющихся товаров обработано без загрузки: {coalescer.coalesced_count}")
+        self._log(f"Скрейпинг завершен. Успешно: {self.success_count}, Ошибки: {self.error_count}")
+    
+    def _expand_coalesced(self, results: Iterator[Tuple[str, str, ScrapingResult]],
+                          coalescer: RequestCoalescer) -> Iterator[Tuple[str, str, ScrapingResult]]:
+        """Выдача результата ведущего запроса каждому из его дубликатов"""
+        for product_id, site, result in results:
+            # Итоговый результат товара (после всех повторов и fallback) учитывается один раз
+            self._update_stats(result)
+            yield from coalescer.complete(product_id, site, result)
+            yield from coalescer.drain_ready()
+        
+        # Дубликаты, прочитанные после завершения последнего запроса
+        yield from coalescer.drain_ready()
+    
+    def _iter_scrape_threaded(self, products: Iterable[Tuple[str, str]], max_workers: int,
+                              task: Callable[[str, str], ScrapingResult]) -> Iterator[Tuple[str, str, ScrapingResult]]:
+        """Обработка товаров в пуле потоков с диспетчеризацией по сайтам"""
+        # Очереди товаров по сайтам: воркер получает задачу только для сайта,
+        # у которого есть свободный токен, и не простаивает в ожидании лимитера.
+        # Из источника читается не больше окна товаров, поэтому память и
+        # накладные расходы планирования не зависят от длины входного списка.
+        site_queues: "OrderedDict[str, deque]" = OrderedDict()
+        source = iter(products)
+        source_exhausted = False
+        window = max(max_workers, self._config_int('advanced', 'submission_window', 200))
+        # По умолчанию сайт "паркуется", когда пауза выросла сверх базового охлаждения
+        park_limit = self._config_int('advanced', 'circuit_park_limit', 0) or self.circuit_breakers.cooldown
+        pending = 0
+        
+        # Товары, ожидающие повтора: куча (время готовности, номер, product_id, site);
+        # счетчики повторов и попыток по товарам
+        delayed = []
+        retry_state: Dict[Tuple[str, str], Tuple[int, int]] = {}
+        delayed_seq = 0
+        
+        in_flight = {}
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        
+        try:
+            while (site_queues or in_flight or delayed or not source_exhausted) and not self.is_stopped:
+                # Возврат в очереди товаров, время повтора которых наступило
+                now = time.monotonic()
+                while delayed and delayed[0][0] <= now:
+                    _, _, product_id, site = heapq.heappop(delayed)
+                    site_queues.setdefault(site.lower(), deque()).append((product_id, site))
+                
+                # Пополнение окна из источника
+                while not source_exhausted and pending < window:
+                    try:
+                        product_id, site = next(source)
+                    except StopIteration:
+                        source_exhausted = True
+                        break
+                    site_queues.setdefault(site.lower(), deque()).append((product_id, site))
+                    pending += 1
+                
+                # Выдача задач свободным воркерам
+                wait_timeout = None
+                while len(in_flight) < max_workers and site_queues:
+                    ready_site, wait_time = self._next_ready_site(site_queues)
+                    if ready_site is None:
+                        wait_timeout = wait_time
+                        break
                     
-                    # Логирование результата
-                    if result.status == ScrapingStatus.SUCCESS:
-                        self._log(f"✓ {product_id} ({site}): {result.product.name}")
+                    queue = site_queues[ready_site]
+                    product_id, site = queue.popleft()
+                    pending -= 1
+                    if queue:
+                        # Круговой обход сайтов
+                        site_queues.move_to_end(ready_site)
                     else:
-                        self._log(f"✗ {product_id} ({site}): {result.error_message}")
+                        del site_queues[ready_site]
+                    
+                    future = executor.submit(task, product_id, site)
+                    in_flight[future] = (product_id, site)
+                
+                retry_wait = delayed[0][0] - time.monotonic() if delayed else None
+                
+                if not in_flight:
+                    if site_queues and wait_timeout > park_limit:
+                        # Остались только товары сайтов с долгой паузой после
+                        # блокировки - завершаем их сразу, не дожидаясь ее окончания
+                        parked = list(self._drain_parked(site_queues, park_limit))
+                        for product_id, site in parked:
+                            pending -= 1
+                            yield product_id, site, self._circuit_open_result(site)
+                        if parked:
+                            continue
+                        # Долгое ожидание задано лимитером, а не паузой сайта - обычное ожидание
+                    
+                    # Все сайты с оставшимися товарами исчерпали лимит, на паузе
+                    # или ждут повтора
+                    timeouts = [t for t in (wait_timeout, retry_wait) if t is not None]
+                    if timeouts:
+                        self._stop_event.wait(max(0.0, min(timeouts)))
+                    continue
                 
-                except Exception as e:
-                    self._log(f"Ошибка обработки {product_id}: {e}", "ERROR")
-                    error_result = ScrapingResult()
-                    error_result.status = ScrapingStatus.ERROR
-                    error_result.error_message = str(e)
-                    results.append(error_result)
-                    completed += 1
+                # Ожидание ограничено, чтобы сигнал остановки обрабатывался без задержек
+                poll_timeout = self.STOP_POLL_INTERVAL
+                for timeout in (wait_timeout, retry_wait):
+                    if timeout is not None:
+                        poll_timeout = max(0.0, min(timeout, poll_timeout))
+                done, _ = wait(in_flight, timeout=poll_timeout, return_when=FIRST_COMPLETED)
+                
+                # Выдача готовых результатов
+                for future in done:
+                    product_id, site = in_flight.pop(future)
+                    
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        self._log(f"Ошибка обработки {product_id}: {e}", "ERROR")
+                        result = ScrapingResult()
+                        result.status = ScrapingStatus.ERROR
+                        result.error_message = str(e)
+                    
+                    # Сайт оказался на паузе к моменту выполнения - товар ждет в очереди
+                    if self._is_circuit_rejected(result) and not self.is_stopped:
+                        site_queues.setdefault(site.lower(), deque()).appendleft((product_id, site))
+                        pending += 1
+                        continue
+                    
+                    # Временная ошибка - товар возвращается в очередь после задержки,
+                    # воркер тем временем обрабатывает другие товары
+                    retries, attempts = retry_state.pop((product_id, site), (0, 0))
+                    attempts += max(result.attempts, 1)
+                    delay = None if self.is_stopped else self.retry_policy.next_delay(result, retries + 1)
+                    if delay is not None:
+                        self._log(f"Повтор {product_id} ({site}) через {delay:.1f} сек: {result.error_message}", "WARNING")
+                        retry_state[(product_id, site)] = (retries + 1, attempts)
+                        delayed_seq += 1
+                        heapq.heappush(delayed, (time.monotonic() + delay, delayed_seq, product_id, site))
+                        pending += 1
+                        continue
+                    
+                    result.attempts = attempts
+                    yield product_id, site, result
         
-        self._log(f"Скрейпинг завершен. Успешно: {self.success_count}, Ошибки: {self.error_count}")
-        return results
+        finally:
+            if in_flight or pending or not source_exhausted:
+                self._log(f"Скрейпинг прерван: отменено {len(in_flight) + pending} товаров в обработке и очереди", "WARNING")
+            
+            # Выполняющиеся задачи не дожидаемся: их ожидания прерваны сигналом
+            # остановки, а результаты отбрасываются
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _next_ready_site(self, site_queues: "OrderedDict[str, deque]") -> Tuple[Optional[str], float]:
+        """
+        Поиск сайта, готового принять запрос.
+        Возвращает (сайт, 0) или (None, время до ближайшего свободного токена).
+        """
+        methods = self._configured_methods()
+        min_wait = None
+        for site in site_queues:
+            # Сайт готов, когда есть токен лимитера и хотя бы один метод не на паузе
+            wait_time = max(
+                self.rate_limiter.peek(site),
+                self.circuit_breakers.retry_in(site, methods)
+            )
+            if wait_time <= 0:
+                return site, 0.0
+            if min_wait is None or wait_time < min_wait:
+                min_wait = wait_time
+        return None, min_wait or 0.0
+    
+    def _drain_parked(self, site_queues: "OrderedDict[str, deque]",
+                      park_limit: float) -> Iterator[Tuple[str, str]]:
+        """Извлечение товаров сайтов, пауза которых дольше park_limit"""
+        methods = self._configured_methods()
+        for site in list(site_queues):
+            if self.circuit_breakers.retry_in(site, methods) > park_limit:
+                self._log(f"{site}: блокировка не снята, оставшиеся товары сайта пропущены", "WARNING")
+                yield from site_queues.pop(site)
+    
+    def _iter_scrape_async(self, products: Iterable[Tuple[str, str]],
+                           max_workers: int) -> Iterator[Tuple[str, str, ScrapingResult]]:
+        """Обработка товаров в одном event loop с Selenium fallback в пуле потоков"""
+        fallback_futures = {}
+        # Повторы выполняет сам асинхронный движок: в этом режиме диспетчера потоков нет
+        async_results = self._get_async_scraper().iter_products(products, self.retry_policy)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        
+        try:
+            for product_id, site, result in async_results:
+                if (result.status == ScrapingStatus.SUCCESS or
+                        not self.use_selenium_fallback or self.is_stopped):
+                    yield product_id, site, result
+                    continue
+                
+                # Неуспешные товары уходят в Selenium fallback, не задерживая поток результатов
+                future = executor.submit(self._selenium_fallback, product_id, site, result)
+                fallback_futures[future] = (product_id, site)
+                
+                # Ограничение очереди fallback: при переполнении ждем, пока освободится место
+                while fallback_futures:
+                    queue_full = len(fallback_futures) >= max_workers * 2
+                    done, _ = wait(
+                        fallback_futures,
+                        timeout=self.STOP_POLL_INTERVAL if queue_full else 0,
+                        return_when=FIRST_COMPLETED
+                    )
+                    for future in done:
+                        yield (*fallback_futures.pop(future), future.result())
+                    
+                    if not queue_full or self.is_stopped:
+                        break
+            
+            for future in as_completed(list(fallback_futures)):
+                if self.is_stopped:
+                    break
+                yield (*fallback_futures.pop(future), future.result())
+        
+        finally:
+            async_results.close()
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _selenium_fallback(self, product_id: str, site: str,
+                           primary_result: ScrapingResult) -> ScrapingResult:
+        """Повторная попытка через Selenium после неуспешного асинхронного запроса"""
+        result = primary_result
+        
+        if not self.is_stopped:
+            self._log(f"Первичный метод неуспешен, переключаемся на fallback для {product_id}")
+            if self.circuit_breakers.allow(site, ScrapingMethod.SELENIUM):
+                fallback_result = self._try_selenium(product_id, site)
+                self._record_attempt(site, ScrapingMethod.SELENIUM, fallback_result)
+                if fallback_result.status == ScrapingStatus.SUCCESS:
+                    result = fallback_result
+                    result.attempts = 2
+        
+        return result
     
     def get_statistics(self) -> Dict:
         """Получение статистики скрейпинга"""
@@ -197,7 +700,9 @@ class HybridScraper(BaseScraper):
             "success_count": self.success_count,
             "error_count": self.error_count,
             "success_rate": (self.success_count / total_attempts * 100) if total_attempts > 0 else 0,
-            "method_stats": {}
+            "method_stats": {},
+            "site_method_stats": self.method_router.snapshot() if self.method_router else {},
+            "circuit_states": self.circuit_breakers.snapshot()
         }
         
         for method, data in self.method_stats.items():
@@ -220,12 +725,22 @@ class HybridScraper(BaseScraper):
         
         if self.selenium_scraper:
             self.selenium_scraper.stop()
+        
+        if self.async_scraper:
+            self.async_scraper.stop()
     
     def __del__(self):
         """Деструктор - очистка ресурсов"""
         try:
+            # Внешний Selenium скрейпер нужен следующим запускам - его не останавливаем
+            if self._external_selenium:
+                self.selenium_scraper = None
+            
             self.stop()
             
+            if self.async_scraper:
+                self.async_scraper.close()
+            
             # Закрытие Selenium драйвера если есть
             if self.selenium_scraper:
                 del self.selenium_scraper
@@ -0,0 +1,253 @@
+"""
+Извлечение данных товара из структурированных данных страницы
+Разметка schema.org Product (JSON-LD) и состояние приложения, сериализованное
+в <script type="application/json"> (__NEXT_DATA__, rz-client-state и т.п.),
+находятся регулярным выражением без построения DOM дерева.
+"""
+
+import re
+import json
+import html as html_lib
+from typing import Any, Dict, Iterator, List, Optional
+
+from scraper.base_scraper import BaseScraper, ProductInfo
+
+# Содержимое <script> с JSON (атрибуты в любом порядке)
+_SCRIPT_PATTERN = re.compile(
+    r'<script\b[^>]*\btype\s*=\s*["\']?application/(ld\+json|json)["\']?[^>]*>(.*?)</script\s*>',
+    re.IGNORECASE | re.DOTALL
+)
+
+# Экранирование Angular TransferState (&q; вместо кавычки и т.д.)
+_TRANSFER_STATE_ESCAPES = (('&q;', '"'), ('&s;', "'"), ('&l;', '<'), ('&g;', '>'), ('&a;', '&'))
+
+# Экранирование URL в состоянии Rozetka ($hs$rozetka$dt$com$dt$ua$sh$...)
+_URL_ESCAPES = (('$hs$', 'https://'), ('$ht$', 'http://'), ('$dt$', '.'), ('$sh$', '/'),
+                ('$qr$', '?'), ('$ad$', '&'))
+
+# Ограничение глубины обхода вложенных JSON объектов
+MAX_DEPTH = 12
+
+_AVAILABILITY = {
+    'instock': "В наличии",
+    'in_stock': "В наличии",
+    'available': "В наличии",
+    'limitedavailability': "В наличии",
+    'onlineonly': "В наличии",
+    'preorder': "Предзаказ",
+    'presale': "Предзаказ",
+    'backorder': "Под заказ",
+    'outofstock': "Нет в наличии",
+    'out_of_stock': "Нет в наличии",
+    'unavailable': "Нет в наличии",
+    'soldout': "Нет в наличии",
+    'discontinued': "Нет в наличии"
+}
+
+def iter_json_scripts(html_content: str) -> Iterator[tuple]:
+    """Перебор JSON блоков страницы: (тип 'ld+json' или 'json', данные)"""
+    for match in _SCRIPT_PATTERN.finditer(html_content):
+        kind, body = match.groups()
+        body = body.strip()
+        if not body:
+            continue
+
+        if body.startswith('{&q;'):
+            for escaped, char in _TRANSFER_STATE_ESCAPES:
+                body = body.replace(escaped, char)
+
+        try:
+            data = json.loads(body)
+        except ValueError:
+            # Некоторые сайты экранируют JSON как HTML
+            try:
+                data = json.loads(html_lib.unescape(body))
+            except ValueError:
+                continue
+
+        yield kind.lower(), data
+
+def _walk(node: Any, depth: int = 0) -> Iterator[Dict]:
+    """Обход всех словарей вложенной структуры (строки с JSON раскрываются)"""
+    if depth > MAX_DEPTH:
+        return
+    if isinstance(node, dict):
+        yield node
+        for value in node.values():
+            yield from _walk(value, depth + 1)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk(item, depth + 1)
+    elif isinstance(node, str) and len(node) > 2 and node[0] in '{[' and node[-1] in '}]':
+        # Кэш ответов API (например rz-client-state) хранит тела строками
+        try:
+            yield from _walk(json.loads(node), depth + 1)
+        except ValueError:
+            return
+
+def _first(value: Any) -> Any:
+    """Первый элемент списка или само значение"""
+    if isinstance(value, list):
+        return value[0] if value else None
+    return value
+
+def _to_price(value: Any) -> Optional[float]:
+    """Цена из числа или строки"""
+    if isinstance(value, bool) or value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if value > 0 else None
+    if isinstance(value, str):
+        price = BaseScraper.parse_price(value)
+        return price if price else None
+    return None
+
+def _to_image(value: Any) -> str:
+    """URL изображения из строки, списка или объекта ImageObject"""
+    value = _first(value)
+    if isinstance(value, dict):
+        value = value.get('url') or value.get('contentUrl') or value.get('original') or value.get('big')
+        value = _first(value)
+    if not isinstance(value, str):
+        return ''
+    if '$' in value:
+        for escaped, char in _URL_ESCAPES:
+            value = value.replace(escaped, char)
+    return value
+
+def _to_availability(value: Any) -> Optional[str]:
+    """Доступность из schema.org URL или кода состояния"""
+    if isinstance(value, bool):
+        return "В наличии" if value else "Нет в наличии"
+    if not isinstance(value, str) or not value:
+        return None
+    key = value.rsplit('/', 1)[-1].replace('-', '_').lower()
+    return _AVAILABILITY.get(key) or _AVAILABILITY.get(key.replace('_', ''))
+
+def _is_type(node: Dict, type_name: str) -> bool:
+    """Проверка @type (строка или список типов)"""
+    node_type = node.get('@type')
+    if isinstance(node_type, list):
+        return type_name in node_type
+    return node_type == type_name
+
+def _product_from_json_ld(node: Dict, product_id: str, site: str, url: str) -> Optional[ProductInfo]:
+    """ProductInfo из объекта schema.org Product"""
+    name = BaseScraper.clean_text(node.get('name') if isinstance(node.get('name'), str) else '')
+    if not name:
+        return None
+
+    product = ProductInfo(id=product_id, name=name, url=url, site=site)
+    product.image_url = _to_image(node.get('image'))
+    if isinstance(node.get('description'), str):
+        product.description = BaseScraper.clean_text(node['description'])
+
+    offers = node.get('offers')
+    offers = offers if isinstance(offers, list) else [offers]
+    for offer in offers:
+        if not isinstance(offer, dict):
+            continue
+
+        price = _to_price(offer.get('price'))
+        if price is None:
+            price = _to_price(offer.get('lowPrice'))
+
+        # Старая цена передается как priceSpecification с типом StrikethroughPrice
+        specifications = offer.get('priceSpecification')
+        specifications = specifications if isinstance(specifications, list) else [specifications]
+        for specification in specifications:
+            if not isinstance(specification, dict):
+                continue
+            price_type = str(specification.get('priceType', ''))
+            if 'Strikethrough' in price_type or 'ListPrice' in price_type:
+                product.old_price = _to_price(specification.get('price'))
+            elif price is None:
+                price = _to_price(specification.get('price'))
+
+        if price is not None:
+            product.price = price
+            availability = _to_availability(offer.get('availability'))
+            if availability:
+                product.availability = availability
+            break
+
+    return product
+
+def _product_from_state(node: Dict, product_id: str, site: str, url: str) -> Optional[ProductInfo]:
+    """ProductInfo из объекта товара в состоянии приложения"""
+    name = node.get('title') or node.get('name')
+    price = _to_price(node.get('price'))
+    if not isinstance(name, str) or price is None:
+        return None
+
+    product = ProductInfo(id=product_id, name=BaseScraper.clean_text(name), price=price, url=url, site=site)
+    product.old_price = _to_price(node.get('old_price') or node.get('oldPrice'))
+
+    for key in ('sell_status', 'availability', 'status', 'is_available', 'in_stock'):
+        availability = _to_availability(node.get(key))
+        if availability:
+            product.availability = availability
+            break
+
+    image = node.get('image_main') or node.get('image') or node.get('images')
+    if isinstance(image, dict) and 'main' in image:
+        image = image['main']
+    product.image_url = _to_image(image)
+    return product
+
+def _matches_id(node: Dict, product_id: str) -> bool:
+    """Относится ли объект состояния или JSON-LD к искомому товару"""
+    for key in ('id', 'goods_id', 'product_id', 'productId', 'productID', 'sku', 'mpn'):
+        if str(node.get(key, '')) == product_id:
+            return True
+    return False
+
+def extract_structured_product(html_content: str, product_id: str, site: str,
+                               url: str, require_id_match: bool = False) -> Optional[ProductInfo]:
+    """
+    Данные товара из JSON-LD или встроенного состояния.
+    None, если страница не содержит подходящих структурированных данных.
+    require_id_match=True - JSON-LD тоже должен относиться к product_id
+    (страницы поиска и каталога содержат разметку многих товаров).
+    Страница товара тоже может содержать разметку рекомендуемых товаров,
+    поэтому объект с совпадающим ID предпочитается первому объекту с ценой.
+    """
+    if not html_content:
+        return None
+
+    # Кандидаты по убыванию приоритета: с совпадающим ID, первый с ценой, первый вообще
+    matched: Optional[ProductInfo] = None
+    first_priced: Optional[ProductInfo] = None
+    best: Optional[ProductInfo] = None
+    states: List[Any] = []
+
+    for kind, data in iter_json_scripts(html_content):
+        if kind != 'ld+json':
+            states.append(data)
+            continue
+        for node in _walk(data):
+            if not _is_type(node, 'Product'):
+                continue
+            is_match = _matches_id(node, product_id)
+            if require_id_match and not is_match:
+                continue
+            product = _product_from_json_ld(node, product_id, site, url)
+            if product is None:
+                continue
+            if is_match:
+                if product.price is not None:
+                    return product
+                matched = matched or product
+            elif product.price is not None:
+                first_priced = first_priced or product
+            best = best or product
+
+    # Состояние приложения проверяется, если JSON-LD искомого товара не дал цены
+    for data in states:
+        for node in _walk(data):
+            if _matches_id(node, product_id):
+                product = _product_from_state(node, product_id, site, url)
+                if product:
+                    return product
+
+    return matched or first_priced or best
@@ -0,0 +1,84 @@
+"""
+Общие фикстуры тестов: локальный HTTP сервер вместо сайтов магазинов
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from scraper.base_scraper import BaseScraper
+
+PRODUCT_PAGE = """<html><head><title>Товар</title>
+<script type="application/ld+json">
+{"@type": "Product", "name": "Товар %(code)s", "sku": "%(code)s",
+ "offers": {"price": "%(price)s", "availability": "https://schema.org/InStock"}}
+</script></head><body><h1>Товар %(code)s</h1></body></html>"""
+
+class SiteServer:
+    """
+    Состояние локального сервера: status и body задают ответ,
+    requests - число полученных запросов. Если задан etag, он отдается
+    в заголовке ETag, а запрос с совпадающим If-None-Match получает 304.
+    """
+
+    def __init__(self):
+        self.url = ''
+        self.status = 200
+        self.body = None
+        self.delay = 0.02
+        self.requests = 0
+        self.etag = None
+        # Заголовки последнего запроса
+        self.request_headers = {}
+        # Адреса клиентов (по одному на TCP соединение)
+        self.peers = set()
+
+    def page(self, path: str) -> str:
+        if self.body is not None:
+            return self.body
+        code = ''.join(char for char in path if char.isdigit())
+        return PRODUCT_PAGE % {'code': code, 'price': 100}
+
+@pytest.fixture
+def site_server(monkeypatch):
+    """Локальный aiohttp сервер, на который направлены все сайты"""
+    web = pytest.importorskip("aiohttp.web")
+    server = SiteServer()
+    started = threading.Event()
+    state = {}
+
+    async def handle(request):
+        server.requests += 1
+        server.peers.add(request.transport.get_extra_info('peername'))
+        server.request_headers = dict(request.headers)
+        await asyncio.sleep(server.delay)
+        if server.etag is not None:
+            headers = {'ETag': server.etag}
+            if request.headers.get('If-None-Match') == server.etag:
+                return web.Response(status=304, headers=headers)
+            return web.Response(text=server.page(request.path), status=server.status,
+                                content_type='text/html', headers=headers)
+        return web.Response(text=server.page(request.path), status=server.status, content_type='text/html')
+
+    async def serve():
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', handle)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        server.url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        state['stop'] = asyncio.Event()
+        state['loop'] = asyncio.get_running_loop()
+        started.set()
+        await state['stop'].wait()
+        await runner.cleanup()
+
+    thread = threading.Thread(target=lambda: asyncio.run(serve()), daemon=True)
+    thread.start()
+    assert started.wait(10)
+    monkeypatch.setattr(BaseScraper, 'get_site_base_url', lambda self, site: server.url)
+    yield server
+    state['loop'].call_soon_threadsafe(state['stop'].set)
+    thread.join(10)
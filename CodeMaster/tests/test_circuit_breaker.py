@@ -0,0 +1,148 @@
+"""
+Тесты выключателей (scraper.circuit_breaker): состояния CLOSED/OPEN/HALF_OPEN
+и рост охлаждения, в том числе через HybridScraper.scrape_product с асинхронным методом
+"""
+
+import pytest
+
+import scraper.circuit_breaker as circuit_breaker
+from scraper.base_scraper import ScrapingMethod, ScrapingResult, ScrapingStatus
+from scraper.circuit_breaker import CircuitBreaker, CircuitState, SiteCircuitBreakers
+
+class FakeClock:
+    """Управляемые часы вместо time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', fake)
+    return fake
+
+def blocked_result() -> ScrapingResult:
+    return ScrapingResult(status=ScrapingStatus.ERROR, blocked=True)
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60.0)
+
+    assert breaker.record(True) is None
+    assert breaker.record(True) is None
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.record(True) == CircuitState.OPEN
+
+    assert not breaker.allow()
+    assert breaker.retry_in() == pytest.approx(60.0)
+
+def test_breaker_success_resets_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60.0)
+
+    breaker.record(True)
+    breaker.record(False)
+    breaker.record(True)
+
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.failures == 1
+
+def test_breaker_lets_single_probe_after_cooldown(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60.0)
+    breaker.record(True)
+
+    clock.now += 59.0
+    assert not breaker.allow()
+
+    clock.now += 1.0
+    assert breaker.allow()
+    assert breaker.state == CircuitState.HALF_OPEN
+    # Пока пробный запрос не завершен, остальные ждут
+    assert not breaker.allow()
+
+    assert breaker.record(False) == CircuitState.CLOSED
+    assert breaker.allow()
+
+def test_breaker_failed_probe_doubles_cooldown_up_to_max(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=60.0, max_cooldown=200.0)
+    breaker.record(True)
+
+    cooldowns = []
+    for _ in range(3):
+        clock.now += breaker.cooldown
+        assert breaker.allow()
+        assert breaker.record(True) == CircuitState.OPEN
+        cooldowns.append(breaker.cooldown)
+
+    assert cooldowns == [120.0, 200.0, 200.0]
+
+    # Успешный пробный запрос возвращает исходное охлаждение
+    clock.now += breaker.cooldown
+    breaker.allow()
+    breaker.record(False)
+    assert breaker.cooldown == 60.0
+
+def test_breaker_abandoned_probe_is_retried(clock):
+    breakers = SiteCircuitBreakers(failure_threshold=1, cooldown=60.0)
+    breakers.record('rozetka', ScrapingMethod.CLOUDSCRAPER, blocked_result())
+    clock.now += 60.0
+    assert breakers.allow('rozetka', ScrapingMethod.CLOUDSCRAPER)
+
+    # Остановленная попытка не считается ни успехом, ни блокировкой
+    stopped = ScrapingResult(status=ScrapingStatus.STOPPED)
+    assert breakers.record('rozetka', ScrapingMethod.CLOUDSCRAPER, stopped) is None
+    assert breakers.snapshot() == {'rozetka': {'cloudscraper': 'open'}}
+    assert breakers.allow('rozetka', ScrapingMethod.CLOUDSCRAPER)
+
+def test_site_breakers_are_isolated_by_site_and_method(clock):
+    breakers = SiteCircuitBreakers(failure_threshold=1, cooldown=60.0)
+    breakers.record('Rozetka', ScrapingMethod.CLOUDSCRAPER, blocked_result())
+
+    assert not breakers.allow('rozetka', ScrapingMethod.CLOUDSCRAPER)
+    assert breakers.allow('rozetka', ScrapingMethod.SELENIUM)
+    assert breakers.allow('allo', ScrapingMethod.CLOUDSCRAPER)
+    assert breakers.retry_in('rozetka', [ScrapingMethod.CLOUDSCRAPER, ScrapingMethod.SELENIUM]) == 0.0
+
+    breakers.expire_cooldown('rozetka', ScrapingMethod.CLOUDSCRAPER)
+    assert breakers.allow('rozetka', ScrapingMethod.CLOUDSCRAPER)
+
+def test_hybrid_async_breaker_cycle(site_server):
+    pytest.importorskip("aiohttp")
+    from scraper.rate_limiter import SiteRateLimiter
+    from scraper.site_scrapers import HybridScraper
+
+    scraper = HybridScraper(
+        preferred_method=ScrapingMethod.ASYNC,
+        use_selenium_fallback=False,
+        rate_limiter=SiteRateLimiter(default_rate=1000.0, default_burst=100)
+    )
+    breakers = scraper.circuit_breakers = SiteCircuitBreakers(failure_threshold=2, cooldown=60.0)
+    try:
+        site_server.status = 403
+        for _ in range(2):
+            assert scraper.scrape_product('123456', 'rozetka').blocked
+        assert breakers.snapshot()['rozetka']['async'] == 'open'
+        assert site_server.requests == 2
+
+        # Во время охлаждения запрос к сайту не выполняется
+        result = scraper.scrape_product('123456', 'rozetka')
+        assert result.blocked and result.method_used is None
+        assert site_server.requests == 2
+
+        # Неудачный пробный запрос удваивает охлаждение
+        breakers.expire_cooldown('rozetka', ScrapingMethod.ASYNC)
+        scraper.scrape_product('123456', 'rozetka')
+        assert site_server.requests == 3
+        assert breakers.cooldown_of('rozetka', ScrapingMethod.ASYNC) == 120.0
+
+        # Успешный пробный запрос закрывает выключатель
+        site_server.status = 200
+        breakers.expire_cooldown('rozetka', ScrapingMethod.ASYNC)
+        result = scraper.scrape_product('123456', 'rozetka')
+        assert result.status == ScrapingStatus.SUCCESS, result.error_message
+        assert breakers.snapshot()['rozetka']['async'] == 'closed'
+        assert breakers.cooldown_of('rozetka', ScrapingMethod.ASYNC) == 60.0
+    finally:
+        scraper.stop()
+        scraper.async_scraper.close()
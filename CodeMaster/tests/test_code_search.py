@@ -0,0 +1,102 @@
+"""
+Тесты поиска по коду (scraper.code_search) с асинхронным методом
+Сайты подменяются локальным aiohttp сервером.
+"""
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from scraper.base_scraper import ScrapingMethod, ScrapingStatus
+from scraper.code_search import CodeSearch, SOURCE_PRODUCT_PAGE
+from scraper.rate_limiter import SiteRateLimiter
+from scraper.retry import RetryPolicy
+from scraper.site_scrapers import HybridScraper
+
+@pytest.fixture
+def async_scraper(site_server):
+    """HybridScraper с асинхронным методом, направленный на локальный сервер"""
+    scraper = HybridScraper(
+        preferred_method=ScrapingMethod.ASYNC,
+        use_selenium_fallback=False,
+        rate_limiter=SiteRateLimiter(default_rate=1000.0, default_burst=100)
+    )
+    yield scraper
+    scraper.stop()
+
+def test_code_search_async_finds_every_pair(async_scraper):
+    codes = [str(100000 + i) for i in range(10)]
+    sites = ['rozetka', 'allo', 'comfy', 'epicentr']
+
+    hits = list(CodeSearch(async_scraper).iter_search(codes, sites))
+
+    assert sorted((hit.code, hit.site) for hit in hits) == sorted(
+        (code, site) for code in codes for site in sites
+    )
+    for hit in hits:
+        assert hit.found, hit.result.error_message
+        assert hit.source == SOURCE_PRODUCT_PAGE
+        assert hit.product.name == f"Товар {hit.code}"
+        assert hit.result.method_used == ScrapingMethod.ASYNC
+
+def test_code_search_async_stop_returns_results(async_scraper):
+    search = CodeSearch(async_scraper)
+    hits = []
+    for hit in search.iter_search([str(200000 + i) for i in range(50)], ['rozetka', 'allo']):
+        hits.append(hit)
+        if len(hits) == 5:
+            async_scraper.stop()
+
+    assert len(hits) >= 5
+    assert all(hit.result is not None for hit in hits)
+    assert all(hit.result.status in (ScrapingStatus.SUCCESS, ScrapingStatus.STOPPED) for hit in hits)
+
+def test_code_search_async_records_each_attempt_once(async_scraper, site_server):
+    site_server.status = 403
+
+    hits = CodeSearch(async_scraper, search_pages=False).search_by_code('123456', ['rozetka'])
+
+    assert not hits[0].found
+    assert site_server.requests == 1
+    breaker = async_scraper.circuit_breakers._breaker('rozetka', ScrapingMethod.ASYNC)
+    assert breaker.failures == 1
+
+def test_code_search_async_probe_closes_breaker(async_scraper, site_server):
+    breakers = async_scraper.circuit_breakers
+    breakers.failure_threshold = 1
+    site_server.status = 403
+    CodeSearch(async_scraper, search_pages=False).search_by_code('123456', ['rozetka'])
+    assert breakers.snapshot()['rozetka']['async'] == 'open'
+
+    # Пробный запрос после охлаждения выполняется и закрывает выключатель
+    site_server.status = 200
+    breakers.expire_cooldown('rozetka', ScrapingMethod.ASYNC)
+    hits = CodeSearch(async_scraper, search_pages=False).search_by_code('123456', ['rozetka'])
+
+    assert hits[0].found, hits[0].result.error_message
+    assert site_server.requests == 2
+    assert breakers.snapshot()['rozetka']['async'] == 'closed'
+
+def test_code_search_async_retries_in_one_layer(async_scraper, site_server):
+    site_server.status = 503
+    async_scraper.retry_policy = RetryPolicy(max_retries=2, base_delay=0.01)
+
+    hits = CodeSearch(async_scraper, search_pages=False).search_by_code('123456', ['rozetka'])
+
+    # Первая попытка и два повтора диспетчера, без повторов внутри AsyncScraper
+    assert site_server.requests == 3
+    assert hits[0].result.attempts == 3
+
+def test_async_single_products_share_connections(async_scraper, site_server):
+    scraper = async_scraper._get_async_scraper()
+
+    results = [scraper.scrape_product(str(300000 + i), 'rozetka') for i in range(5)]
+    scraper.close()
+
+    assert all(result.status == ScrapingStatus.SUCCESS for result in results)
+    # Последовательные товары идут через одно keep-alive соединение
+    assert len(site_server.peers) == 1
+
+    # После закрытия скрейпер снова работает
+    assert scraper.scrape_product('300100', 'rozetka').status == ScrapingStatus.SUCCESS
+    scraper.close()
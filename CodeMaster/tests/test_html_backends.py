@@ -0,0 +1,61 @@
+"""
+Тесты движков разбора HTML: все движки извлекают те же данные, что html.parser
+Страницы товаров - tests/fixtures/product_<сайт>_<id>.html
+"""
+
+import glob
+import os
+from dataclasses import asdict
+
+import pytest
+
+from scraper.html_backends import BACKENDS, is_available, parse_document
+from scraper.html_parser import HtmlProductParser
+
+pytest.importorskip("bs4")
+
+FIXTURES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'fixtures', 'product_*.html')))
+FAST_BACKENDS = [backend for backend in BACKENDS if backend != 'html.parser']
+
+def load_fixture(file_path: str):
+    """(сайт, ID товара, HTML) страницы из имени product_<сайт>_<id>.html"""
+    _, site, product_id = os.path.splitext(os.path.basename(file_path))[0].split('_')
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return site, product_id, f.read()
+
+def parse_with(backend: str, file_path: str):
+    site, product_id, html = load_fixture(file_path)
+    product = HtmlProductParser(backend, structured_data=False).parse(product_id, site, file_path, html)
+    return asdict(product) if product else None
+
+@pytest.mark.parametrize('file_path', FIXTURES, ids=os.path.basename)
+def test_fixture_produces_full_product(file_path):
+    product = parse_with('html.parser', file_path)
+
+    assert product is not None
+    assert product['name'] and product['price'] is not None
+    # Содержимое script/style внутри элементов не попадает в данные
+    assert 'dataLayer' not in product['name'] and '{' not in product['name']
+
+@pytest.mark.parametrize('backend', FAST_BACKENDS)
+@pytest.mark.parametrize('file_path', FIXTURES, ids=os.path.basename)
+def test_backend_matches_html_parser(backend, file_path):
+    if not is_available(backend):
+        pytest.skip(f"{backend} не установлен")
+
+    assert parse_with(backend, file_path) == parse_with('html.parser', file_path)
+
+@pytest.mark.parametrize('backend', FAST_BACKENDS)
+def test_get_text_skips_script_and_style(backend):
+    if not is_available(backend):
+        pytest.skip(f"{backend} не установлен")
+    html = ('<html><body><div id="a">Foo <b>Bar</b><script>var x=1</script>'
+            '<style>.a{}</style><!-- c -->tail<noscript>N</noscript></div></body></html>')
+
+    expected = parse_document(html, 'html.parser').select_one('#a').get_text()
+    document = parse_document(html, backend)
+
+    assert expected == 'Foo BartailN'
+    assert document.select_one('#a').get_text() == expected
+    # Сам script возвращает свой текст, как в BeautifulSoup
+    assert document.select_one('script').get_text() == 'var x=1'
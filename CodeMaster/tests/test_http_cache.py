@@ -0,0 +1,105 @@
+"""
+Тесты дискового кэша страниц (scraper.http_cache): перепроверка по ETag/Last-Modified,
+продление записи после 304 и вытеснение давно не читавшихся записей
+"""
+
+import os
+import secrets
+
+import pytest
+
+from scraper.base_scraper import ScrapingMethod, ScrapingStatus
+from scraper.http_cache import HttpCache
+
+URL = 'https://rozetka.com.ua/ua/123456/p123456/'
+
+@pytest.fixture
+def cache(tmp_path):
+    return HttpCache(directory=str(tmp_path / 'cache'), ttl=3600)
+
+def test_store_and_get_roundtrip(cache):
+    assert cache.get(URL) is None
+
+    assert cache.store(URL, '<html>Товар</html>', {'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+    entry = cache.get(URL)
+
+    assert entry.body == '<html>Товар</html>'
+    assert entry.etag == '"v1"'
+    assert cache.is_fresh(entry)
+
+def test_conditional_headers(cache):
+    assert cache.conditional_headers(None) == {}
+
+    cache.store(URL, 'a', {'ETag': '"v1"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+    assert cache.conditional_headers(cache.get(URL)) == {
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Wed, 21 Oct 2015 07:28:00 GMT'
+    }
+
+    # Без валидаторов перепроверка невозможна - запрос безусловный
+    cache.store(URL, 'b')
+    assert cache.conditional_headers(cache.get(URL)) == {}
+
+def test_stale_entry_is_kept_for_revalidation(cache):
+    cache.store(URL, 'a', {'ETag': '"v1"'})
+    entry = cache.get(URL)
+    entry.stored_at -= cache.ttl + 1
+
+    assert not cache.is_fresh(entry)
+
+def test_refresh_after_304_extends_entry(cache):
+    cache.store(URL, 'тело', {'ETag': '"v1"'})
+    entry = cache.get(URL)
+    entry.stored_at -= cache.ttl + 1
+
+    cache.refresh(URL, entry, {'ETag': '"v2"'})
+
+    refreshed = cache.get(URL)
+    assert cache.is_fresh(refreshed)
+    assert refreshed.body == 'тело'
+    assert refreshed.etag == '"v2"'
+
+def test_eviction_removes_least_recently_read(cache):
+    urls = [f'https://allo.ua/ua/products/{i}.html' for i in range(4)]
+    # Случайное содержимое сжимается одинаково, размеры записей близки
+    bodies = [secrets.token_hex(2000) for _ in urls]
+
+    for i, url in enumerate(urls[:3]):
+        cache.store(url, bodies[i])
+        body_path, _ = cache._paths(url)
+        os.utime(body_path, (1000 + i, 1000 + i))
+    cache.max_size = int(sum(cache._file_size(cache._paths(url)[0]) for url in urls[:3]) * 1.2)
+
+    # Чтение обновляет время доступа: первая запись становится самой свежей
+    assert cache.get(urls[0]) is not None
+    cache.store(urls[3], bodies[3])
+
+    assert cache.get(urls[1]) is None
+    assert [cache.get(url).body for url in (urls[0], urls[2], urls[3])] == [bodies[0], bodies[2], bodies[3]]
+
+def test_async_scraper_revalidates_with_etag(tmp_path, site_server):
+    pytest.importorskip("aiohttp")
+    from scraper.rate_limiter import SiteRateLimiter
+    from scraper.site_scrapers import HybridScraper
+
+    scraper = HybridScraper(
+        preferred_method=ScrapingMethod.ASYNC,
+        use_selenium_fallback=False,
+        rate_limiter=SiteRateLimiter(default_rate=1000.0, default_burst=100)
+    )
+    # Нулевой TTL: каждая запись устарела и перепроверяется условным запросом
+    scraper.http_cache = HttpCache(directory=str(tmp_path / 'cache'), ttl=0)
+    site_server.etag = '"v1"'
+    try:
+        first = scraper.scrape_product('123456', 'rozetka')
+        assert first.status == ScrapingStatus.SUCCESS, first.error_message
+        assert 'If-None-Match' not in site_server.request_headers
+
+        second = scraper.scrape_product('123456', 'rozetka')
+        assert site_server.request_headers.get('If-None-Match') == '"v1"'
+        assert second.status == ScrapingStatus.SUCCESS, second.error_message
+        assert second.product.name == first.product.name
+        assert site_server.requests == 2
+    finally:
+        scraper.stop()
+        scraper.async_scraper.close()
@@ -0,0 +1,54 @@
+"""
+Тесты выбора и учета методов HybridScraper (без сетевых запросов)
+"""
+
+from scraper.base_scraper import ProductInfo, ScrapingMethod, ScrapingResult, ScrapingStatus
+from scraper.site_scrapers import HybridScraper
+
+def make_result(method: ScrapingMethod, success: bool, blocked: bool = False) -> ScrapingResult:
+    result = ScrapingResult(method_used=method, blocked=blocked)
+    if success:
+        result.status = ScrapingStatus.SUCCESS
+        result.product = ProductInfo(id='123456', name='Товар')
+    else:
+        result.status = ScrapingStatus.ERROR
+    return result
+
+def hybrid_scraper(monkeypatch, outcomes):
+    """HybridScraper в гибридном режиме; outcomes - успех каждого метода"""
+    scraper = HybridScraper(preferred_method=ScrapingMethod.HYBRID)
+    calls = []
+
+    def attempt(method):
+        def run(product_id, site):
+            calls.append(method)
+            return make_result(method, outcomes[method], blocked=not outcomes[method])
+        return run
+
+    monkeypatch.setattr(scraper, '_try_cloudscraper', attempt(ScrapingMethod.CLOUDSCRAPER))
+    monkeypatch.setattr(scraper, '_try_selenium', attempt(ScrapingMethod.SELENIUM))
+    return scraper, calls
+
+def test_hybrid_runs_concrete_methods(monkeypatch):
+    scraper, calls = hybrid_scraper(monkeypatch, {
+        ScrapingMethod.CLOUDSCRAPER: False, ScrapingMethod.SELENIUM: True
+    })
+
+    result = scraper.scrape_product('123456', 'rozetka')
+
+    assert calls == [ScrapingMethod.CLOUDSCRAPER, ScrapingMethod.SELENIUM]
+    assert result.method_used == ScrapingMethod.SELENIUM
+    # Попытки учтены под выполнявшимися методами, а не под HYBRID
+    assert set(scraper.circuit_breakers.snapshot()['rozetka']) == {'cloudscraper', 'selenium'}
+
+def test_hybrid_with_clearance_tries_http_first(monkeypatch):
+    scraper, calls = hybrid_scraper(monkeypatch, {
+        ScrapingMethod.CLOUDSCRAPER: True, ScrapingMethod.SELENIUM: True
+    })
+    scraper.clearance_store.update(
+        'rozetka', [{'name': 'cf_clearance', 'value': 'x', 'domain': '.rozetka.com.ua'}], 'UA'
+    )
+
+    scraper.scrape_product('123456', 'rozetka')
+
+    assert calls == [ScrapingMethod.CLOUDSCRAPER]
@@ -0,0 +1,90 @@
+"""
+Тесты ограничения частоты запросов (scraper.rate_limiter): запас токенов,
+пополнение, независимость сайтов и прерывание ожидания при остановке
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+import scraper.rate_limiter as rate_limiter
+from scraper.rate_limiter import SiteRateLimiter, TokenBucket
+
+class FakeClock:
+    """Управляемые часы вместо time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', fake)
+    return fake
+
+def test_bucket_allows_burst_then_waits(clock):
+    bucket = TokenBucket(rate=2.0, burst=3)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    assert bucket.peek() == pytest.approx(0.5)
+
+def test_bucket_refills_at_rate_up_to_burst(clock):
+    bucket = TokenBucket(rate=2.0, burst=3)
+    for _ in range(3):
+        bucket.try_acquire()
+
+    clock.now += 0.25
+    assert bucket.try_acquire() == pytest.approx(0.25)
+    clock.now += 0.25
+    assert bucket.try_acquire() == 0.0
+
+    # За долгий простой накапливается не больше burst токенов
+    clock.now += 100.0
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() > 0
+
+def test_peek_does_not_consume(clock):
+    bucket = TokenBucket(rate=1.0, burst=1)
+
+    assert bucket.peek() == 0.0
+    assert bucket.peek() == 0.0
+    assert bucket.try_acquire() == 0.0
+    assert bucket.peek() == pytest.approx(1.0)
+
+def test_sites_have_separate_buckets(clock):
+    limiter = SiteRateLimiter(default_rate=1.0, default_burst=1, site_limits={'Allo': (10.0, 2)})
+
+    assert limiter.try_acquire('rozetka') == 0.0
+    assert limiter.try_acquire('ROZETKA') == pytest.approx(1.0)
+
+    # Другой сайт не затронут, лимиты сайта задаются без учета регистра
+    assert limiter.try_acquire('comfy') == 0.0
+    assert limiter.try_acquire('allo') == 0.0
+    assert limiter.try_acquire('allo') == 0.0
+    assert limiter.try_acquire('allo') == pytest.approx(0.1)
+
+def test_acquire_wakes_on_stop():
+    limiter = SiteRateLimiter(default_rate=0.01, default_burst=1)
+    assert limiter.acquire('rozetka')
+
+    stop_event = threading.Event()
+    threading.Timer(0.1, stop_event.set).start()
+
+    start = time.monotonic()
+    assert limiter.acquire('rozetka', stop_event) is False
+    assert time.monotonic() - start < 5.0
+
+def test_acquire_async_respects_stop():
+    limiter = SiteRateLimiter(default_rate=1000.0, default_burst=1)
+    stop_event = threading.Event()
+
+    assert asyncio.run(limiter.acquire_async('rozetka', stop_event)) is True
+
+    stop_event.set()
+    assert asyncio.run(limiter.acquire_async('rozetka', stop_event)) is False
@@ -0,0 +1,79 @@
+"""
+Тесты политики повторов (scraper.retry): разбор Retry-After
+и классификация статусов на временные и окончательные
+"""
+
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from scraper.base_scraper import ScrapingResult, ScrapingStatus
+from scraper.retry import RETRYABLE_STATUS_CODES, RetryPolicy, parse_retry_after
+
+def error_result(**kwargs) -> ScrapingResult:
+    return ScrapingResult(status=ScrapingStatus.ERROR, **kwargs)
+
+@pytest.mark.parametrize("value, expected", [
+    ("120", 120.0),
+    (" 5 ", 5.0),
+    ("0", 0.0),
+    ("-10", 0.0),
+    ("1.5", 1.5),
+])
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+def test_parse_retry_after_http_date():
+    retry_at = datetime.now(timezone.utc) + timedelta(seconds=90)
+
+    delay = parse_retry_after(format_datetime(retry_at, usegmt=True))
+
+    # HTTP дата с точностью до секунды
+    assert 88.0 <= delay <= 90.0
+
+def test_parse_retry_after_past_date_is_zero():
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+@pytest.mark.parametrize("value", [None, "", "soon", "Wed, 99 Foo 2015"])
+def test_parse_retry_after_invalid(value):
+    assert parse_retry_after(value) is None
+
+@pytest.mark.parametrize("status", RETRYABLE_STATUS_CODES)
+def test_retryable_statuses(status):
+    assert RetryPolicy().is_retryable(error_result(http_status=status))
+
+@pytest.mark.parametrize("status", [400, 401, 403, 404, 410, 451])
+def test_terminal_statuses(status):
+    assert not RetryPolicy().is_retryable(error_result(http_status=status))
+
+def test_transient_error_is_retryable():
+    assert RetryPolicy().is_retryable(error_result(transient=True))
+
+def test_only_errors_are_retried():
+    policy = RetryPolicy()
+
+    assert not policy.is_retryable(ScrapingResult(status=ScrapingStatus.SUCCESS, http_status=503))
+    assert not policy.is_retryable(ScrapingResult(status=ScrapingStatus.STOPPED, transient=True))
+
+def test_too_long_retry_after_is_terminal():
+    policy = RetryPolicy(max_retry_after=300.0)
+
+    assert policy.is_retryable(error_result(http_status=429, retry_after=300.0))
+    assert not policy.is_retryable(error_result(http_status=429, retry_after=301.0))
+
+def test_next_delay_grows_and_stops_after_max_retries():
+    policy = RetryPolicy(max_retries=3, base_delay=2.0, max_delay=5.0)
+    result = error_result(http_status=503)
+
+    for retry_number, full_delay in [(1, 2.0), (2, 4.0), (3, 5.0)]:
+        delay = policy.next_delay(result, retry_number)
+        assert full_delay / 2 <= delay <= full_delay
+
+    assert policy.next_delay(result, 4) is None
+    assert policy.next_delay(error_result(http_status=404), 1) is None
+
+def test_next_delay_honours_retry_after():
+    policy = RetryPolicy(base_delay=1.0)
+
+    assert policy.next_delay(error_result(http_status=429, retry_after=30.0), 1) == 30.0
@@ -0,0 +1,53 @@
+"""
+Тесты извлечения товара из структурированных данных (JSON-LD)
+"""
+
+import json
+
+from scraper.structured_data import extract_structured_product
+
+def ld_json(*nodes) -> str:
+    return ''.join(
+        f'<script type="application/ld+json">{json.dumps(node, ensure_ascii=False)}</script>'
+        for node in nodes
+    )
+
+def product_node(sku: str, name: str, price=None) -> dict:
+    node = {"@type": "Product", "name": name, "sku": sku}
+    if price is not None:
+        node["offers"] = {"@type": "Offer", "price": str(price)}
+    return node
+
+def test_prefers_node_matching_product_id():
+    html = ld_json(
+        product_node('111', 'Рекомендуемый товар', 499),
+        product_node('222', 'Искомый товар', 18999)
+    )
+
+    product = extract_structured_product(html, '222', 'rozetka', 'https://example.com/222')
+
+    assert product.name == 'Искомый товар'
+    assert product.price == 18999
+
+def test_matching_node_without_price_beats_other_priced_node():
+    html = ld_json(product_node('111', 'Рекомендуемый товар', 499), product_node('222', 'Искомый товар'))
+
+    product = extract_structured_product(html, '222', 'rozetka', 'https://example.com/222')
+
+    # Цена дополняется из DOM, а не берется у чужого товара
+    assert product.name == 'Искомый товар'
+    assert product.price is None
+
+def test_falls_back_to_first_priced_node_without_match():
+    html = ld_json(product_node('', 'Без ID'), product_node('', 'Товар страницы', 100))
+
+    product = extract_structured_product(html, '222', 'rozetka', 'https://example.com/222')
+
+    assert product.name == 'Товар страницы'
+    assert product.price == 100
+
+def test_search_page_requires_id_match():
+    html = ld_json(product_node('111', 'Другой товар', 499))
+
+    assert extract_structured_product(html, '222', 'rozetka', 'https://example.com/search',
+                                      require_id_match=True) is None
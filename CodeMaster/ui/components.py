@@ -5,11 +5,14 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
 import customtkinter as ctk
-from typing import List, Dict, Tuple, Optional, Callable
+from collections import deque
+from itertools import islice
+from typing import List, Dict, Iterable, Tuple, Optional, Callable
 from datetime import datetime
 import threading
 
 from scraper.base_scraper import ScrapingMethod, ScrapingResult, ScrapingStatus
+from utils.products_io import iter_products_file
 
 class ModernFrame(ctk.CTkFrame):
     """Модернизированная рамка с дополнительными возможностями"""
@@ -322,7 +325,7 @@ class LogFrame(ModernFrame):
 class ResultsFrame(ModernFrame):
     """Панель результатов с таблицей"""
     
-    def __init__(self, parent):
+    def __init__(self, parent, max_rows: int = 10000):
         super().__init__(parent, title="Результаты скрейпинга")
         
         # Панель управления
@@ -359,8 +362,13 @@ class ResultsFrame(ModernFrame):
         # Таблица результатов
         self._create_results_table()
         
-        # Данные
-        self.results_data = []
+        # Данные: в памяти и в таблице только последние max_rows результатов
+        self.max_rows = max(1, max_rows)
+        self.results_data = deque(maxlen=self.max_rows)
+        # Строки таблицы (результат, id строки) в порядке добавления
+        self._rows = deque()
+        self.total_count = 0
+        self.success_count = 0
     
     def _create_results_table(self):
         """Создание таблицы результатов"""
@@ -455,57 +463,91 @@ class ResultsFrame(ModernFrame):
     
     def update_results(self, results: List[ScrapingResult]):
         """Обновление таблицы результатов"""
-        self.results_data = results
+        self.results_data = deque(maxlen=self.max_rows)
+        self.total_count = 0
+        self.success_count = 0
+        for result in results:
+            self.results_data.append(result)
+            self.total_count += 1
+            if result.status == ScrapingStatus.SUCCESS:
+                self.success_count += 1
         self._refresh_table()
-        
-        # Обновление информации
-        total_count = len(results)
-        success_count = sum(1 for r in results if r.status == ScrapingStatus.SUCCESS)
-        self.info_label.configure(text=f"Результаты: {total_count} (успешно: {success_count})")
+        self._update_info()
+    
+    def add_result(self, result: ScrapingResult):
+        """Добавление одного результата без перерисовки всей таблицы"""
+        # Самый старый результат вытесняется из окна вместе со своей строкой
+        if len(self.results_data) == self.max_rows:
+            evicted = self.results_data[0]
+            if self._rows and self._rows[0][0] is evicted:
+                self.tree.delete(self._rows.popleft()[1])
+        
+        self.results_data.append(result)
+        self.total_count += 1
+        if result.status == ScrapingStatus.SUCCESS:
+            self.success_count += 1
+        
+        if self._matches_filter(result):
+            self._insert_row(result)
+        self._update_info()
+    
+    def _update_info(self):
+        """Обновление информации о количестве результатов"""
+        text = f"Результаты: {self.total_count} (успешно: {self.success_count})"
+        if self.total_count > len(self.results_data):
+            text += f", показаны последние {len(self.results_data)}"
+        self.info_label.configure(text=text)
     
     def _refresh_table(self):
         """Обновление отображения таблицы"""
         # Очистка таблицы
         for item in self.tree.get_children():
             self.tree.delete(item)
+        self._rows.clear()
         
-        # Фильтрация результатов
-        filtered_results = self._get_filtered_results()
-        
-        # Добавление данных
-        for result in filtered_results:
-            if result.product:
-                product = result.product
-                values = (
-                    product.id,
-                    product.site,
-                    product.name[:50] + "..." if len(product.name) > 50 else product.name,
-                    f"{product.price:.2f} ₴" if product.price else "N/A",
-                    "Успешно" if result.status == ScrapingStatus.SUCCESS else "Ошибка",
-                    result.method_used.value if result.method_used else "N/A",
-                    f"{result.response_time:.2f}"
-                )
-                
-                item = self.tree.insert("", "end", values=values)
-                
-                # Цвет строки в зависимости от статуса
-                if result.status == ScrapingStatus.SUCCESS:
-                    self.tree.set(item, "Статус", "✓ Успешно")
-                else:
-                    self.tree.set(item, "Статус", "✗ Ошибка")
+        # Добавление отфильтрованных данных
+        for result in self._get_filtered_results():
+            self._insert_row(result)
     
-    def _get_filtered_results(self) -> List[ScrapingResult]:
-        """Получение отфильтрованных результатов"""
+    def _insert_row(self, result: ScrapingResult):
+        """Добавление строки результата в таблицу"""
+        if not result.product:
+            return
+        
+        product = result.product
+        values = (
+            product.id,
+            product.site,
+            product.name[:50] + "..." if len(product.name) > 50 else product.name,
+            f"{product.price:.2f} ₴" if product.price else "N/A",
+            "Успешно" if result.status == ScrapingStatus.SUCCESS else "Ошибка",
+            result.method_used.value if result.method_used else "N/A",
+            f"{result.response_time:.2f}"
+        )
+        
+        item = self.tree.insert("", "end", values=values)
+        self._rows.append((result, item))
+        
+        # Цвет строки в зависимости от статуса
+        if result.status == ScrapingStatus.SUCCESS:
+            self.tree.set(item, "Статус", "✓ Успешно")
+        else:
+            self.tree.set(item, "Статус", "✗ Ошибка")
+    
+    def _matches_filter(self, result: ScrapingResult) -> bool:
+        """Проверка результата на соответствие фильтру статуса"""
         filter_status = self.status_var.get()
         
-        if filter_status == "Все":
-            return self.results_data
-        elif filter_status == "Успешно":
-            return [r for r in self.results_data if r.status == ScrapingStatus.SUCCESS]
+        if filter_status == "Успешно":
+            return result.status == ScrapingStatus.SUCCESS
         elif filter_status == "Ошибка":
-            return [r for r in self.results_data if r.status != ScrapingStatus.SUCCESS]
+            return result.status != ScrapingStatus.SUCCESS
         
-        return self.results_data
+        return True
+    
+    def _get_filtered_results(self) -> List[ScrapingResult]:
+        """Получение отфильтрованных результатов"""
+        return [r for r in self.results_data if self._matches_filter(r)]
     
     def _filter_results(self, selected_status: str):
         """Фильтрация результатов"""
@@ -514,6 +556,9 @@ class ResultsFrame(ModernFrame):
     def clear_results(self):
         """Очистка результатов"""
         self.results_data.clear()
+        self._rows.clear()
+        self.total_count = 0
+        self.success_count = 0
         for item in self.tree.get_children():
             self.tree.delete(item)
         self.info_label.configure(text="Результаты: 0")
@@ -521,9 +566,16 @@ class ResultsFrame(ModernFrame):
 class SettingsFrame(ModernFrame):
     """Панель настроек скрейпинга"""
     
+    # Сколько товаров загруженного файла показывать в списке
+    PRODUCTS_PREVIEW_LIMIT = 1000
+    
     def __init__(self, parent):
         super().__init__(parent, title="Настройки скрейпинга")
         
+        # Загруженный файл товаров: читается при запуске лениво, в списке только начало
+        self.products_file: Optional[str] = None
+        self.products_file_count = 0
+        
         # Основной контейнер с двумя колонками
         self.content_frame = ctk.CTkFrame(self)
         self.content_frame.pack(fill="both", expand=True, padx=10, pady=5)
@@ -557,7 +609,7 @@ class SettingsFrame(ModernFrame):
         self.method_var = ctk.StringVar(value="cloudscraper")
         self.method_combo = ctk.CTkComboBox(
             method_frame,
-            values=["cloudscraper", "selenium", "hybrid"],
+            values=["cloudscraper", "selenium", "hybrid", "async"],
             variable=self.method_var,
             command=self._on_method_change
         )
@@ -702,6 +754,7 @@ class SettingsFrame(ModernFrame):
         result = dialog.get_input()
         
         if result and ',' in result:
+            self._detach_products_file()
             self.products_text.insert(tk.END, result + '\n')
             self._update_products_count()
     
@@ -712,6 +765,7 @@ class SettingsFrame(ModernFrame):
             current_line = self.products_text.index(tk.INSERT).split('.')[0]
             line_start = f"{current_line}.0"
             line_end = f"{current_line}.end+1c"
+            self._detach_products_file()
             self.products_text.delete(line_start, line_end)
             self._update_products_count()
         except:
@@ -719,11 +773,30 @@ class SettingsFrame(ModernFrame):
     
     def _clear_products(self):
         """Очистка списка товаров"""
+        self.products_file = None
         self.products_text.delete(1.0, tk.END)
         self._update_products_count()
     
+    def _detach_products_file(self):
+        """
+        Список редактируется вручную: дальше используется содержимое поля,
+        а не файл (в поле только начало файла)
+        """
+        self.products_file = None
+    
     def _update_products_count(self, event=None):
         """Обновление счетчика товаров"""
+        # Ввод текста или удаление (но не перемещение курсора) отключает файл
+        if event is not None and (event.char or event.keysym in ('BackSpace', 'Delete')):
+            self._detach_products_file()
+        
+        if self.products_file:
+            shown = min(self.products_file_count, self.PRODUCTS_PREVIEW_LIMIT)
+            self.count_label.configure(
+                text=f"Товаров: {self.products_file_count} (из файла, показано {shown})"
+            )
+            return
+        
         content = self.products_text.get(1.0, tk.END).strip()
         lines = [line.strip() for line in content.split('\n') if line.strip()]
         valid_lines = [line for line in lines if ',' in line]
@@ -735,7 +808,8 @@ class SettingsFrame(ModernFrame):
         method_map = {
             "cloudscraper": ScrapingMethod.CLOUDSCRAPER,
             "selenium": ScrapingMethod.SELENIUM,
-            "hybrid": ScrapingMethod.HYBRID
+            "hybrid": ScrapingMethod.HYBRID,
+            "async": ScrapingMethod.ASYNC
         }
         
         return {
@@ -764,8 +838,35 @@ class SettingsFrame(ModernFrame):
         
         return products
     
+    def get_products_source(self) -> Tuple[Iterable[Tuple[str, str]], int]:
+        """
+        Товары для запуска и их количество. Загруженный файл читается
+        построчно во время скрейпинга, а не целиком в память.
+        """
+        if self.products_file:
+            return iter_products_file(self.products_file), self.products_file_count
+        products = self.get_products_list()
+        return products, len(products)
+    
+    def set_products_file(self, file_path: str) -> int:
+        """
+        Загрузка файла товаров: в поле показываются первые PRODUCTS_PREVIEW_LIMIT
+        строк, остальные только подсчитываются. Возвращает количество товаров.
+        """
+        products = iter_products_file(file_path)
+        preview = list(islice(products, self.PRODUCTS_PREVIEW_LIMIT))
+        total = len(preview) + sum(1 for _ in products)
+        
+        self.set_products_list(preview)
+        if total:
+            self.products_file = file_path
+            self.products_file_count = total
+            self._update_products_count()
+        return total
+    
     def set_products_list(self, products: List[Tuple[str, str]]):
         """Установка списка товаров"""
+        self.products_file = None
         self.products_text.delete(1.0, tk.END)
         
         for product_id, site in products:
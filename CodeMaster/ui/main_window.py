@@ -8,8 +8,8 @@ import customtkinter as ctk
 import threading
 import time
 import json
-import csv
-from typing import List, Dict, Optional, Tuple
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
 from datetime import datetime
 
 from ui.components import (
@@ -19,6 +19,8 @@ from ui.components import (
 from ui.dialogs import SettingsDialog, AboutDialog, ExportDialog
 from ui.themes import ThemeManager
 from scraper.site_scrapers import HybridScraper
+from scraper.selenium_scraper import SeleniumScraper
+from scraper.extraction import SITE_SPECS
 from scraper.base_scraper import ScrapingMethod, ScrapingStatus
 from utils.config import Config
 from utils.logger import setup_logger
@@ -44,8 +46,12 @@ class MainWindow(ctk.CTk):
         # Состояние приложения
         self.scraper = None
         self.scraper_thread = None
+        # Долгоживущий Selenium скрейпер с заранее запущенными браузерами (advanced.browser_warmup)
+        self.selenium_scraper = None
         self.is_scraping = False
-        self.results = []
+        # Последние результаты для экспорта; полная запись - автосохранение JSONL
+        self.results_window = max(1, self.config.getint('advanced', 'results_window', 10000))
+        self.results = deque(maxlen=self.results_window)
         
         # Настройка темы
         self._setup_theme()
@@ -58,6 +64,10 @@ class MainWindow(ctk.CTk):
         # Загрузка настроек
         self.load_settings()
         
+        # Браузеры запускаются в фоне, пока пользователь вводит список товаров
+        if self.config.getboolean('advanced', 'browser_warmup', False):
+            self._start_browser_warmup(self.settings_frame.get_settings()['headless'])
+        
         self.logger.info("Главное окно инициализировано")
     
     def _setup_theme(self):
@@ -89,7 +99,7 @@ class MainWindow(ctk.CTk):
         self.log_frame = LogFrame(self.main_container)
         
         # Панель результатов
-        self.results_frame = ResultsFrame(self.main_container)
+        self.results_frame = ResultsFrame(self.main_container, max_rows=self.results_window)
         
         # Статус бар
         self.status_bar = StatusBar(self)
@@ -223,7 +233,7 @@ class MainWindow(ctk.CTk):
         self.right_panel.add("Логи")
         
         # Размещение компонентов в вкладках
-        self.results_frame = ResultsFrame(self.right_panel.tab("Результаты"))
+        self.results_frame = ResultsFrame(self.right_panel.tab("Результаты"), max_rows=self.results_window)
         self.results_frame.pack(fill="both", expand=True)
         
         self.log_frame = LogFrame(self.right_panel.tab("Логи"))
@@ -252,16 +262,16 @@ class MainWindow(ctk.CTk):
             self.logger.warning("Скрейпинг уже запущен")
             return
         
-        # Получение списка товаров
-        products = self.settings_frame.get_products_list()
-        if not products:
+        # Получение списка товаров (загруженный файл читается лениво)
+        products, total_count = self.settings_frame.get_products_source()
+        if not total_count:
             messagebox.showwarning("Предупреждение", "Список товаров пуст!")
             return
         
         # Получение настроек
         settings = self.settings_frame.get_settings()
         
-        self.logger.info(f"Начало скрейпинга {len(products)} товаров")
+        self.logger.info(f"Начало скрейпинга {total_count} товаров")
         
         # Обновление интерфейса
         self.is_scraping = True
@@ -274,6 +284,8 @@ class MainWindow(ctk.CTk):
             preferred_method=settings['method'],
             use_selenium_fallback=settings['use_fallback'],
             headless=settings['headless'],
+            config=self.config,
+            selenium_scraper=self._get_warm_selenium_scraper(settings['headless']),
             progress_callback=self.progress_frame.update_progress,
             log_callback=self.log_frame.add_log
         )
@@ -281,11 +293,45 @@ class MainWindow(ctk.CTk):
         # Запуск в отдельном потоке
         self.scraper_thread = threading.Thread(
             target=self._scraping_worker,
-            args=(products, settings),
+            args=(products, total_count, settings),
             daemon=True
         )
         self.scraper_thread.start()
     
+    def _start_browser_warmup(self, headless: bool):
+        """Создание Selenium скрейпера и фоновый запуск его браузеров"""
+        self.selenium_scraper = SeleniumScraper.from_config(
+            self.config, headless, log_callback=self.log_frame.add_log
+        )
+        
+        # Стартовые страницы включенных сайтов
+        start_urls = {}
+        for site in SITE_SPECS:
+            site_config = self.config.get_site_config(site)
+            if site_config.get('enabled'):
+                start_urls[site] = site_config['base_url']
+        
+        threading.Thread(
+            target=self.selenium_scraper.warm_up,
+            args=(start_urls, self.config.getint('advanced', 'warmup_browsers', 1)),
+            daemon=True
+        ).start()
+        self.logger.info("Запущен фоновый прогрев браузеров")
+    
+    def _get_warm_selenium_scraper(self, headless: bool) -> Optional[SeleniumScraper]:
+        """Прогретый Selenium скрейпер для запуска (None, если прогрев выключен)"""
+        if not self.config.getboolean('advanced', 'browser_warmup', False):
+            return None
+        
+        # Режим headless изменился - прогретые браузеры не подходят
+        if self.selenium_scraper is not None and self.selenium_scraper.headless != headless:
+            threading.Thread(target=self.selenium_scraper.close, daemon=True).start()
+            self.selenium_scraper = None
+        
+        if self.selenium_scraper is None:
+            self._start_browser_warmup(headless)
+        return self.selenium_scraper
+    
     def stop_scraping(self):
         """Остановка скрейпинга"""
         if not self.is_scraping:
@@ -300,29 +346,33 @@ class MainWindow(ctk.CTk):
         
         # Обновление интерфейса будет в _scraping_worker при завершении
     
-    def _scraping_worker(self, products: List[Tuple[str, str]], settings: Dict):
+    def _scraping_worker(self, products: Iterable[Tuple[str, str]], total_count: int, settings: Dict):
         """Рабочая функция скрейпинга"""
         try:
             # Очистка предыдущих результатов
-            self.results.clear()
-            self.results_frame.clear_results()
+            self.results = deque(maxlen=self.results_window)
+            self.after(0, self.results_frame.clear_results)
             
-            # Скрейпинг
-            results = self.scraper.scrape_multiple_products(
+            # Скрейпинг: результаты поступают по мере готовности
+            results = self.scraper.iter_scrape(
                 products, 
                 max_workers=settings.get('max_workers', 3)
             )
             
-            # Сохранение результатов
-            self.results = results
+            # Автосохранение результатов в JSON Lines по ходу работы
+            if self.config.getboolean('advanced', 'auto_save_results', True):
+                autosave_path = self.export_manager.output_dir / (
+                    f"autosave_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+                )
+                results = self.export_manager.stream_to_jsonl(results, str(autosave_path))
             
-            # Обновление таблицы результатов
-            self.after(0, self._update_results_table)
+            for result in results:
+                self.results.append(result)
+                self.after(0, self.results_frame.add_result, result)
             
             # Статистика
             stats = self.scraper.get_statistics()
             success_count = stats['success_count']
-            total_count = len(products)
             
             # Обновление интерфейса
             self.after(0, lambda: self._scraping_finished(success_count, total_count))
@@ -355,10 +405,6 @@ class MainWindow(ctk.CTk):
         self.status_bar.set_status(f"Ошибка скрейпинга: {error_message}")
         messagebox.showerror("Ошибка", f"Ошибка при скрейпинге:\n{error_message}")
     
-    def _update_results_table(self):
-        """Обновление таблицы результатов"""
-        self.results_frame.update_results(self.results)
-    
     def load_products_file(self):
         """Загрузка списка товаров из файла"""
         file_path = filedialog.askopenfilename(
@@ -372,27 +418,12 @@ class MainWindow(ctk.CTk):
         
         if file_path:
             try:
-                products = []
+                # В поле попадает только начало файла, товары читаются при запуске
+                total = self.settings_frame.set_products_file(file_path)
                 
-                if file_path.endswith('.csv'):
-                    with open(file_path, 'r', encoding='utf-8') as file:
-                        reader = csv.reader(file)
-                        for row in reader:
-                            if len(row) >= 2:
-                                products.append((row[0].strip(), row[1].strip()))
-                else:
-                    with open(file_path, 'r', encoding='utf-8') as file:
-                        for line in file:
-                            line = line.strip()
-                            if line and ',' in line:
-                                parts = line.split(',', 1)
-                                if len(parts) == 2:
-                                    products.append((parts[0].strip(), parts[1].strip()))
-                
-                if products:
-                    self.settings_frame.set_products_list(products)
-                    self.status_bar.set_status(f"Загружено {len(products)} товаров")
-                    self.logger.info(f"Загружен список из {len(products)} товаров")
+                if total:
+                    self.status_bar.set_status(f"Загружено {total} товаров")
+                    self.logger.info(f"Загружен список из {total} товаров: {file_path}")
                 else:
                     messagebox.showwarning("Предупреждение", "Файл не содержит валидных данных")
                     
@@ -419,9 +450,9 @@ class MainWindow(ctk.CTk):
         if file_path:
             try:
                 if file_path.endswith('.csv'):
-                    self.export_manager.export_to_csv(self.results, file_path)
+                    self.export_manager.export_to_csv(list(self.results), file_path)
                 else:
-                    self.export_manager.export_to_json(self.results, file_path)
+                    self.export_manager.export_to_json(list(self.results), file_path)
                 
                 self.status_bar.set_status(f"Результаты сохранены: {file_path}")
                 self.logger.info(f"Результаты сохранены в {file_path}")
@@ -446,7 +477,7 @@ class MainWindow(ctk.CTk):
             
             if file_path:
                 try:
-                    self.export_manager.export_to_csv(self.results, file_path, dialog.result)
+                    self.export_manager.export_to_csv(list(self.results), file_path, dialog.result)
                     self.status_bar.set_status(f"Экспорт в CSV завершен: {file_path}")
                     self.logger.info(f"Данные экспортированы в CSV: {file_path}")
                 except Exception as e:
@@ -466,7 +497,7 @@ class MainWindow(ctk.CTk):
         
         if file_path:
             try:
-                self.export_manager.export_to_json(self.results, file_path)
+                self.export_manager.export_to_json(list(self.results), file_path)
                 self.status_bar.set_status(f"Экспорт в JSON завершен: {file_path}")
                 self.logger.info(f"Данные экспортированы в JSON: {file_path}")
             except Exception as e:
@@ -585,5 +616,9 @@ Ctrl+, - Открыть настройки
         # Сохранение настроек
         self.save_settings()
         
+        # Закрытие прогретых браузеров
+        if self.selenium_scraper is not None:
+            self.selenium_scraper.close()
+        
         # Закрытие приложения
         self.destroy()
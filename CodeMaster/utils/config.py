@@ -42,6 +42,13 @@ class Config:
                 'page_timeout': '30',
                 'element_timeout': '10',
                 'max_retries': '3',
+                'html_parser_backend': 'auto',
+                'structured_data': 'true',
+                'retry_base_delay': '2.0',
+                'retry_max_delay': '60',
+                'retry_max_retry_after': '300',
+                'requests_per_second': '1.0',
+                'burst': '2',
                 'disable_images': 'true',
                 'disable_javascript': 'false'
             },
@@ -74,14 +81,61 @@ class Config:
                 'rozetka_enabled': 'true',
                 'allo_enabled': 'true',
                 'comfy_enabled': 'true',
-                'epicentr_enabled': 'true'
+                'epicentr_enabled': 'true',
+                # Пустое значение - используются scraping.requests_per_second / scraping.burst
+                'rozetka_requests_per_second': '',
+                'rozetka_burst': '',
+                'allo_requests_per_second': '',
+                'allo_burst': '',
+                'comfy_requests_per_second': '',
+                'comfy_burst': '',
+                'epicentr_requests_per_second': '',
+                'epicentr_burst': ''
             },
             'advanced': {
                 'selenium_pool_size': '2',
+                # Фоновый запуск браузеров при старте приложения
+                'browser_warmup': 'false',
+                'warmup_browsers': '1',
+                # Замена браузера после N страниц или при превышении памяти (МБ, нужен psutil); 0 - без ограничения
+                'driver_max_pages': '200',
+                'driver_max_memory_mb': '1500',
+                # Сколько секунд ждать ответа браузера, прежде чем завершить его принудительно
+                'driver_hang_timeout': '5',
                 'cloudscraper_pool_size': '5',
+                'async_max_concurrency': '100',
+                'async_max_per_host': '20',
+                'submission_window': '200',
+                'parse_in_processes': 'true',
+                'parse_workers': '0',
+                'adaptive_routing': 'true',
+                'routing_probe_rate': '0.05',
+                'routing_state_file': 'method_routing.json',
+                'circuit_failure_threshold': '3',
+                'circuit_cooldown': '60',
+                'circuit_max_cooldown': '600',
+                # Пауза сайта (сек), после которой его оставшиеся товары пропускаются; 0 - равна circuit_cooldown
+                'circuit_park_limit': '0',
+                # Передача cookies допуска (Cloudflare/Incapsula) из браузера HTTP скрейперам
+                'clearance_handoff': 'true',
+                'clearance_ttl': '1800',
+                # Файл с cookies и User-Agent сессий по сайтам (пусто - не сохранять между запусками)
+                'session_state_file': 'session_state.json',
+                # Сколько секунд хранить cookies HTTP сессии сайта после последнего успешного запроса
+                'session_ttl': '86400',
+                # Блокировка ресурсов в браузере (изображения - scraping.disable_images)
+                'block_resource_types': 'font,media',
+                'block_trackers': 'true',
+                'block_url_patterns': '',
+                # JSON: {"сайт": ["шаблон или домен", ...]} - ресурсы, нужные для отрисовки
+                'resource_allowlist': '',
                 'cache_enabled': 'false',
                 'cache_ttl': '3600',
+                'cache_directory': 'cache',
+                'cache_max_size_mb': '500',
                 'auto_save_results': 'true',
+                # Сколько последних результатов держать в окне (полная запись - автосохранение JSONL)
+                'results_window': '10000',
                 'backup_enabled': 'true'
             }
         }
@@ -355,6 +409,7 @@ class Config:
         float_checks = [
             ('scraping', 'delay_min', 0.1, 10.0),
             ('scraping', 'delay_max', 0.1, 10.0),
+            ('scraping', 'requests_per_second', 0.01, 100.0),
             ('appearance', 'ui_scale', 0.5, 2.0)
         ]
         
@@ -393,45 +448,30 @@ class Config:
     
     def get_site_config(self, site: str) -> Dict[str, Any]:
         """Получение конфигурации для конкретного сайта"""
-        site_configs = {
-            'rozetka': {
-                'enabled': self.getboolean('sites', 'rozetka_enabled'),
-                'base_url': 'https://rozetka.com.ua',
-                'selectors': {
-                    'title': "h1[data-testid='product-title']",
-                    'price': "[data-testid='price'] .price__value",
-                    'old_price': ".price__old",
-                    'availability': ".status-label"
-                }
-            },
-            'allo': {
-                'enabled': self.getboolean('sites', 'allo_enabled'),
-                'base_url': 'https://allo.ua',
-                'selectors': {
-                    'title': "h1.p-view__title",
-                    'price': ".p-view__price .sum",
-                    'availability': ".p-view__status"
-                }
-            },
-            'comfy': {
-                'enabled': self.getboolean('sites', 'comfy_enabled'),
-                'base_url': 'https://comfy.ua',
-                'selectors': {
-                    'title': ".product-title",
-                    'price': ".price-current"
-                }
-            },
-            'epicentr': {
-                'enabled': self.getboolean('sites', 'epicentr_enabled'),
-                'base_url': 'https://epicentrk.ua',
-                'selectors': {
-                    'title': "h1",
-                    'price': "[class*='price']"
-                }
-            }
+        # Селекторы берутся из единых правил извлечения (импорт здесь - во избежание цикла)
+        from scraper.extraction import primary_selectors, selector_chains
+        
+        base_urls = {
+            'rozetka': 'https://rozetka.com.ua',
+            'allo': 'https://allo.ua',
+            'comfy': 'https://comfy.ua',
+            'epicentr': 'https://epicentrk.ua'
         }
         
-        return site_configs.get(site.lower(), {})
+        site = site.lower()
+        if site not in base_urls:
+            return {}
+        
+        selectors = primary_selectors(site)
+        if 'name' in selectors:
+            selectors['title'] = selectors.pop('name')
+        
+        return {
+            'enabled': self.getboolean('sites', f'{site}_enabled'),
+            'base_url': base_urls[site],
+            'selectors': selectors,
+            'selector_chains': selector_chains(site)
+        }
     
     def __str__(self) -> str:
         """Строковое представление конфигурации"""
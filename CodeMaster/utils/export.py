@@ -7,7 +7,7 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Iterable, Iterator, Optional, Any
 import logging
 
 try:
@@ -126,6 +126,24 @@ class ExportManager:
             self.logger.error(f"Ошибка экспорта в JSON: {e}")
             return False
     
+    def stream_to_jsonl(self, results: Iterable[ScrapingResult], file_path: str,
+                        fields: Optional[List[str]] = None) -> Iterator[ScrapingResult]:
+        """
+        Запись результатов в JSON Lines по мере их поступления.
+        Результаты передаются дальше без изменений, что позволяет сохранять
+        поток и одновременно отображать его.
+        """
+        if fields is None:
+            fields = ['id', 'site', 'name', 'price', 'old_price', 'availability', 'url',
+                      'method_used', 'response_time', 'status', 'error_message', 'attempts']
+        
+        with open(file_path, 'a', encoding='utf-8') as jsonlfile:
+            for result in results:
+                data = self._extract_result_data(result, fields)
+                jsonlfile.write(json.dumps(data, ensure_ascii=False) + '\n')
+                jsonlfile.flush()
+                yield result
+    
     def export_to_excel(self, results: List[ScrapingResult], file_path: str,
                        options: Optional[Dict] = None) -> bool:
         """Экспорт в Excel формат"""
@@ -0,0 +1,27 @@
+"""
+Чтение списков товаров из файлов
+"""
+
+import csv
+from typing import Iterator, Tuple
+
+def iter_products_file(file_path: str, encoding: str = 'utf-8') -> Iterator[Tuple[str, str]]:
+    """
+    Ленивое чтение пар (ID товара, сайт) из CSV или текстового файла.
+    Файл читается построчно, поэтому размер списка не ограничен памятью.
+    """
+    with open(file_path, 'r', encoding=encoding, newline='') as file:
+        if file_path.endswith('.csv'):
+            for row in csv.reader(file):
+                if len(row) >= 2:
+                    product_id, site = row[0].strip(), row[1].strip()
+                    if product_id and site:
+                        yield product_id, site
+        else:
+            for line in file:
+                line = line.strip()
+                if line and ',' in line:
+                    parts = line.split(',', 1)
+                    product_id, site = parts[0].strip(), parts[1].strip()
+                    if product_id and site:
+                        yield product_id, site